@@ -3,6 +3,7 @@ import time
 import structlog
 from fastapi import FastAPI, Request, status
 from fastapi.responses import HTMLResponse, JSONResponse
+from prometheus_client import Gauge
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from api import article, channel, locale, publisher
@@ -29,6 +30,13 @@ metric_collector = (
     .expose(app)
 )
 
+DB_POOL_CONNECTIONS_METRIC = Gauge(
+    "today_DataAPI_db_pool_connections",
+    "Connections of the database pool by state",
+    labelnames=["state"],
+    multiprocess_mode="livesum",
+)
+
 app.include_router(article.router, tags=["article"])
 app.include_router(channel.router, tags=["channel"])
 app.include_router(locale.router, tags=["locale"])
@@ -46,6 +54,10 @@ async def add_process_time_header(request: Request, call_next):
     response = await call_next(request)
     process_time = time.time() - start_time
     response.headers["X-Process-Time"] = str(process_time)
+
+    for state, value in config.db_pool_stats(async_engine=True).items():
+        DB_POOL_CONNECTIONS_METRIC.labels(state).set(value)
+
     return response
 
 
@@ -2,11 +2,18 @@ import re
 from datetime import datetime, timedelta
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, status
-from pydantic import BaseModel
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
 from api.utils import ep_err_msg, request_auth
-from db_crud import get_articles_with_locale
+from db_crud import article_fields, decode_article_cursor
+from db_crud_async import (
+    get_articles,
+    get_articles_with_locale,
+    stream_articles_with_locale,
+)
 
 router = APIRouter(
     responses={status.HTTP_404_NOT_FOUND: {"Description": ep_err_msg}},
@@ -15,39 +22,102 @@ router = APIRouter(
 
 
 @router.get("/api/articles", response_model=List[dict])
-async def get_articles(
+async def read_articles(
+    response: Response,
     start_datetime: datetime = Query(..., description="Start date for the articles"),
     end_datetime: Optional[datetime] = Query(
         None, description="End date for the articles"
     ),
-    locale: Optional[str] = Query(None, description="Locale for the articles"),
+    locale: Optional[str] = Query(
+        None,
+        max_length=5,
+        min_length=5,
+        description="Locale for the articles",
+        regex="[a-z]{2}_[A-Z]{2}",
+    ),
     cache_hits: Optional[bool] = Query(
         None, description="Filter articles based on cache hits"
     ),
     external_channels: Optional[bool] = Query(
         None, description="Filter articles from external channels"
     ),
+    fields: Optional[List[str]] = Query(
+        None, description="Fields of the articles to return, all of them by default"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor of the next page, from the X-Next-Cursor header"
+    ),
+    page_size: int = Query(100, ge=1, le=1000, description="Number of articles"),
 ):
-    articles = None
+    fields = fields or list(article_fields)
+    unknown_fields = set(fields) - set(article_fields)
+    if unknown_fields:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown_fields))}",
+        )
+
+    _check_cursor(cursor)
+
+    articles, next_cursor = await get_articles(
+        fields,
+        start_datetime,
+        end_datetime,
+        locale,
+        cache_hits,
+        external_channels,
+        cursor,
+        page_size,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
     return articles
 
 
+def _check_cursor(cursor):
+    if cursor:
+        try:
+            decode_article_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 class ArticleRequestCS(BaseModel):
     start_datetime: str = (datetime.utcnow() - timedelta(days=7)).strftime(
         "%Y-%m-%d %H:%M:%S"
     )
     locale: str
-    page: int = 1
-    page_size: int = 100
+    cursor: Optional[str] = None
+    page_size: int = Field(100, ge=1, le=1000)
+    stream: bool = False
+
+
+async def _ndjson(articles):
+    async for article in articles:
+        yield orjson.dumps(article) + b"\n"
 
 
 @router.post("/api/articles_with_locale", response_model=List[dict])
-async def read_articles_with_locale(request: ArticleRequestCS):
+async def read_articles_with_locale(request: ArticleRequestCS, response: Response):
     locale = request.locale
     if not re.match(r"[a-z]{2}_[A-Z]{2}", locale) or len(locale) != 5:
         raise ValueError(
             "Locale must be in the format 'xx_XX' and exactly 5 characters long."
         )
 
-    articles = get_articles_with_locale(locale, request.start_datetime)
+    if request.stream:
+        return StreamingResponse(
+            _ndjson(stream_articles_with_locale(locale, request.start_datetime)),
+            media_type="application/x-ndjson",
+        )
+
+    _check_cursor(request.cursor)
+
+    articles, next_cursor = await get_articles_with_locale(
+        locale, request.start_datetime, request.cursor, request.page_size
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
     return articles
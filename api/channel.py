@@ -1,9 +1,10 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+import orjson
+from fastapi import APIRouter, Depends, Response, status
 
-from api.utils import ep_err_msg, request_auth
-from db_crud import get_channels
+from api.utils import ep_err_msg, publisher_cache, request_auth
+from db_crud_async import get_channels
 
 router = APIRouter(
     responses={status.HTTP_404_NOT_FOUND: {"Description": ep_err_msg}},
@@ -11,7 +12,12 @@ router = APIRouter(
 )
 
 
+async def _channels_response():
+    channels = await get_channels()
+    return orjson.dumps(channels) if channels else None
+
+
 @router.get("/api/channels", response_model=List)
 async def get_channels_from_db():
-    channels = get_channels()
-    return channels
+    channels = await publisher_cache.get_or_set(("channels",), _channels_response)
+    return Response(content=channels or b"[]", media_type="application/json")
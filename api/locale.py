@@ -3,7 +3,7 @@ from typing import List
 from fastapi import APIRouter, Depends, status
 
 from api.utils import ep_err_msg, request_auth
-from db_crud import get_locales
+from db_crud_async import get_locales
 
 router = APIRouter(
     responses={status.HTTP_404_NOT_FOUND: {"Description": ep_err_msg}},
@@ -13,5 +13,5 @@ router = APIRouter(
 
 @router.get("/api/locales", response_model=List)
 async def read_locales():
-    locales = get_locales()
+    locales = await get_locales()
     return locales
@@ -1,11 +1,13 @@
 import re
+from functools import partial
 from typing import List
 
-from fastapi import APIRouter, Depends, Query, status
+import orjson
+from fastapi import APIRouter, Depends, Query, Response, status
 from pydantic import BaseModel
 
-from api.utils import ep_err_msg, request_auth
-from db_crud import get_publisher_with_locale, get_publishers_based_on_locale
+from api.utils import ep_err_msg, publisher_cache, request_auth
+from db_crud_async import get_publisher_with_locale, get_publishers_based_on_locale
 
 router = APIRouter(
     responses={status.HTTP_404_NOT_FOUND: {"Description": ep_err_msg}},
@@ -13,11 +15,16 @@ router = APIRouter(
 )
 
 
+async def _publishers_response(locale):
+    publishers = await get_publishers_based_on_locale(locale)
+    return orjson.dumps(publishers) if publishers else None
+
+
 @router.post("/api/publisher", response_model=List[dict])
 async def read_publisher(
     publisher_url: str = Query(..., description="Publisher URL"),
 ):
-    publisher = get_publisher_with_locale(publisher_url)
+    publisher = await get_publisher_with_locale(publisher_url)
     return publisher
 
 
@@ -31,8 +38,10 @@ async def read_publisher_with_locale(
         regex="[a-z]{2}_[A-Z]{2}",
     )
 ):
-    publishers = get_publishers_based_on_locale(locale)
-    return publishers
+    publishers = await publisher_cache.get_or_set(
+        ("publishers_with_locale", locale), partial(_publishers_response, locale)
+    )
+    return Response(content=publishers or b"[]", media_type="application/json")
 
 
 class PublisherRequest(BaseModel):
@@ -53,7 +62,9 @@ async def read_publisher_id_with_locale(request: PublisherRequest):
     channels_to_include = request.channels_to_include
 
     relevant_publishers = []
-    publishers = get_publishers_based_on_locale(locale)
+    publishers = await publisher_cache.get_or_set(
+        ("publishers", locale), partial(get_publishers_based_on_locale, locale)
+    )
     for source in publishers:
         if source["publisher_name"] in publisher_blocklist:
             continue
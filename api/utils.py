@@ -1,9 +1,14 @@
 from fastapi import HTTPException, Request, status
 
 from config import get_config
+from utils import ResponseCache
 
 config = get_config()
 
+# Responses built from the publishers and channels. The import of the publishers runs in another process,
+# so the workers serve its changes once the cached responses expire, after at most `api_cache_ttl` seconds.
+publisher_cache = ResponseCache(config.api_cache_ttl)
+
 ep_err_msg = (
     "Requested endpoint not found. The endpoint you are accessing is not available. "
     "Please check your API request."
@@ -5,6 +5,7 @@
 
 import logging
 import os
+import threading
 from datetime import tzinfo
 from functools import lru_cache
 from multiprocessing import cpu_count
@@ -13,14 +14,23 @@ from typing import Optional
 
 import structlog
 from google.cloud import language_v1
-from pydantic import Field, field_validator
+from pydantic import Field, PrivateAttr, field_validator
 from pydantic_settings import BaseSettings
 from pytz import timezone
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
 logger = structlog.getLogger(__name__)
 
+_db_engine_lock = threading.Lock()
+_gcp_client_lock = threading.Lock()
+
 
 class Configuration(BaseSettings):
     default_headers: dict = {
@@ -30,6 +40,8 @@ class Configuration(BaseSettings):
     tz: tzinfo = timezone("UTC")
     request_timeout: float = 30.0
     max_content_size: int = 10000000
+    # Size of the chunks the response bodies are read in, the size limits are enforced after each chunk.
+    download_chunk_size: int = 65536
     db_connections_created: int = 0
 
     output_feed_path: Path = Field(default=Path(__file__).parent / "output/feed")
@@ -45,6 +57,45 @@ class Configuration(BaseSettings):
     concurrency: int = cpu_count() - 1
     thread_pool_size: int = cpu_count() * 5
     rate_limit: int = 25
+    rate_limit_burst: int = 1
+    # Budgets of the rate limited APIs, "popularity", "nu_api" and "gcp_language", and of the hosts, e.g.
+    # {"popularity": {"rate": 50, "burst": 10, "shared": true}}. A shared budget is shared by the worker
+    # processes. The keys without a budget get rate_limit calls per second with a burst of rate_limit_burst.
+    rate_limits: dict = {}
+
+    # Connection pools of the shared HTTP session, the number of hosts to keep pools for and their size.
+    http_pool_connections: int = 100
+    http_pool_maxsize: int = cpu_count() * 5
+    # Pool size overrides for hosts that serve many of the feeds and images, e.g. {"cdn.example.com": 50}
+    http_host_pool_sizes: dict = {}
+
+    # Limits of the async fetch engine, the number of requests in flight and the number of requests per host.
+    fetch_max_concurrency: int = 1000
+    fetch_per_host_concurrency: int = 10
+
+    # Stream every feed and article through the aggregation stages instead of running the stages one after
+    # the other, with at most pipeline_queue_size items waiting between two stages.
+    streaming_pipeline: bool = False
+    pipeline_queue_size: int = 1000
+
+    # Send the stored ETag/Last-Modified validators of each feed and skip the feeds that were not modified.
+    conditional_feed_fetch: bool = True
+
+    # Parse the well-formed RSS 2.0 and Atom feeds with the lxml based parser, falling back to feedparser.
+    fast_feed_parser: bool = False
+
+    # The directory of the profanity wordlists of the locales, the words of <locale>.txt are filtered from the
+    # titles in addition to the default wordlist.
+    profanity_wordlists_dir: Optional[Path] = None
+
+    # Seconds the final URL of an article link is reused instead of following the redirects of the link again,
+    # and seconds a link that failed to resolve is skipped.
+    unshortened_url_ttl: int = 7 * 24 * 3600
+    unshortened_url_failure_ttl: int = 3600
+    # Links looked up per query in the cache of the final URLs, and seconds the streaming pipeline waits for more
+    # articles before sending a partial batch.
+    unshortened_url_batch_size: int = 100
+    unshortened_url_batch_delay: float = 0.05
 
     # Disable uploads and downloads to S3. Useful when running locally or in CI.
     no_upload: Optional[int] = None
@@ -102,6 +153,15 @@ class Configuration(BaseSettings):
     pop_score_cutoff: int = 300
     pop_score_exponent: float = 2 / 3
     pop_score_range: int = 100
+    # Whether to score the URLs with `bs_pop_batch_endpoint` instead of a request per URL. Off by default, the
+    # batch contract of the popularity API is assumed, see `PopularityClient._fetch_batch`.
+    pop_score_batch_enabled: bool = False
+    bs_pop_batch_endpoint: Optional[str] = None
+    pop_score_batch_size: int = 100
+    # Seconds the streaming pipeline waits for more articles before sending a partial batch.
+    pop_score_batch_delay: float = 0.05
+    # Seconds the popularity score of an article is reused instead of requested again.
+    pop_score_cache_ttl: int = 3600
 
     nu_api_url: str = ""
     nu_api_token: str = ""
@@ -115,6 +175,14 @@ class Configuration(BaseSettings):
     ]
     nu_confidence_threshold: float = 0.9
     nu_excluded_channels: list = ["Crime"]
+    # Articles sent per request to the NU-API, and seconds the streaming pipeline waits for more articles before
+    # sending a partial batch.
+    nu_batch_size: int = 50
+    nu_batch_delay: float = 0.05
+    # Times the articles of a failed request, or missing from the results, are sent again.
+    nu_max_retries: int = 2
+    # Seconds the category predicted for an article is reused instead of predicted again.
+    nu_prediction_cache_ttl: int = 30 * 24 * 3600
 
     news_data_api_token: Optional[str] = "test"
 
@@ -141,18 +209,120 @@ class Configuration(BaseSettings):
     database_url: Optional[str] = "postgres://localhost:5432"
     schema_name: Optional[str] = "news"
 
-    def gcp_client(self):
-        return language_v1.LanguageServiceClient(
-            client_options={"api_key": self.google_api_key}
-        )
+    # Seconds the API caches the publishers and channels, it bounds how long the changes of the publishers import take
+    # to be served: the import runs in another process and does not invalidate the cache of the API workers.
+    api_cache_ttl: int = 300
+
+    # Connection pool of the database engine shared by all the sessions of a process.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_pre_ping: bool = True
+    db_pool_recycle: int = 1800
+
+    _db_engine: Optional[Engine] = PrivateAttr(default=None)
+    _db_engine_pid: Optional[int] = PrivateAttr(default=None)
+    _db_session_factory: Optional[sessionmaker] = PrivateAttr(default=None)
+    _async_db_engine: Optional[AsyncEngine] = PrivateAttr(default=None)
+    _async_db_engine_pid: Optional[int] = PrivateAttr(default=None)
+    _async_db_session_factory: Optional[async_sessionmaker] = PrivateAttr(default=None)
+    _gcp_client: Optional[language_v1.LanguageServiceClient] = PrivateAttr(default=None)
+    _gcp_client_pid: Optional[int] = PrivateAttr(default=None)
+
+    def gcp_client(self) -> language_v1.LanguageServiceClient:
+        """
+        Get the Natural Language client of the current process, created on first use and shared by its threads.
+
+        A forked worker process creates its own client, the gRPC channel of the parent process is not fork safe.
+        """
+        with _gcp_client_lock:
+            if self._gcp_client is None or self._gcp_client_pid != os.getpid():
+                self._gcp_client = language_v1.LanguageServiceClient(
+                    client_options={"api_key": self.google_api_key}
+                )
+                self._gcp_client_pid = os.getpid()
+            return self._gcp_client
+
+    def get_db_engine(self) -> Engine:
+        """
+        Get the database engine of the current process, created on first use.
+
+        A forked worker process creates its own engine, the pooled connections of the parent process are never
+        shared with it.
+        """
+        with _db_engine_lock:
+            if self._db_engine is None or self._db_engine_pid != os.getpid():
+                if self._db_engine is not None:
+                    # Inherited from the parent process, drop its pool without closing the parent connections.
+                    self._db_engine.dispose(close=False)
+
+                self._db_engine = create_engine(
+                    self.database_url,
+                    pool_size=self.db_pool_size,
+                    max_overflow=self.db_max_overflow,
+                    pool_pre_ping=self.db_pool_pre_ping,
+                    pool_recycle=self.db_pool_recycle,
+                )
+                self._db_engine_pid = os.getpid()
+                self._db_session_factory = sessionmaker(bind=self._db_engine)
+
+            return self._db_engine
 
     def get_db_session(self) -> Session:
         """
         Get a database session
         """
         self.db_connections_created += 1
-        engine = create_engine(self.database_url)
-        return sessionmaker(bind=engine)()
+        self.get_db_engine()
+        return self._db_session_factory()
+
+    def get_async_db_engine(self) -> AsyncEngine:
+        """
+        Get the asyncio database engine (asyncpg driver) of the current process, created on first use.
+        """
+        with _db_engine_lock:
+            if (
+                self._async_db_engine is None
+                or self._async_db_engine_pid != os.getpid()
+            ):
+                if self._async_db_engine is not None:
+                    self._async_db_engine.sync_engine.dispose(close=False)
+
+                self._async_db_engine = create_async_engine(
+                    make_url(self.database_url).set(drivername="postgresql+asyncpg"),
+                    pool_size=self.db_pool_size,
+                    max_overflow=self.db_max_overflow,
+                    pool_pre_ping=self.db_pool_pre_ping,
+                    pool_recycle=self.db_pool_recycle,
+                )
+                self._async_db_engine_pid = os.getpid()
+                self._async_db_session_factory = async_sessionmaker(
+                    bind=self._async_db_engine, expire_on_commit=False
+                )
+
+            return self._async_db_engine
+
+    def get_async_db_session(self) -> AsyncSession:
+        """
+        Get an asyncio database session
+        """
+        self.get_async_db_engine()
+        return self._async_db_session_factory()
+
+    def db_pool_stats(self, async_engine: bool = False) -> dict:
+        """
+        Get the statistics of the database connection pool of the current process, of the asyncio engine when
+        `async_engine` is set.
+        """
+        if async_engine:
+            pool = self.get_async_db_engine().pool
+        else:
+            pool = self.get_db_engine().pool
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        }
 
     @field_validator("img_cache_path")
     def create_img_cache_path(cls, v: Path) -> Path:
@@ -0,0 +1,40 @@
+"""feed_update_record validators
+
+Revision ID: 5e2f8c1d4a7b
+Revises: 9604c954b73b
+Create Date: 2026-10-18 09:15:41.204518+00:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e2f8c1d4a7b"
+down_revision = "9604c954b73b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "feed_update_record",
+        sa.Column("etag", sa.String, nullable=True),
+        schema="news",
+    )
+    op.add_column(
+        "feed_update_record",
+        sa.Column("last_modified", sa.String, nullable=True),
+        schema="news",
+    )
+    op.add_column(
+        "feed_update_record",
+        sa.Column("content_hash", sa.String, nullable=True),
+        schema="news",
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("feed_update_record", "content_hash", schema="news")
+    op.drop_column("feed_update_record", "last_modified", schema="news")
+    op.drop_column("feed_update_record", "etag", schema="news")
@@ -0,0 +1,32 @@
+"""article created id index
+
+Revision ID: 7c3d9a2e5b61
+Revises: 5e2f8c1d4a7b
+Create Date: 2026-10-18 10:30:12.481307+00:00
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c3d9a2e5b61"
+down_revision = "5e2f8c1d4a7b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "article_idx_created_id",
+        "article",
+        ["created", "id"],
+        unique=False,
+        schema="news",
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "article_idx_created_id", table_name="article", schema="news", if_exists=True
+    )
@@ -0,0 +1,49 @@
+"""article query indexes
+
+Revision ID: a4e1b7c93d20
+Revises: 7c3d9a2e5b61
+Create Date: 2026-10-18 11:15:37.902114+00:00
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4e1b7c93d20"
+down_revision = "7c3d9a2e5b61"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "article_idx_feed_id_created",
+        "article",
+        ["feed_id", "created"],
+        unique=False,
+        schema="news",
+        if_not_exists=True,
+    )
+    op.create_index(
+        "article_cache_record_idx_locale_id_cache_hit",
+        "article_cache_record",
+        ["locale_id", "cache_hit"],
+        unique=False,
+        schema="news",
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "article_cache_record_idx_locale_id_cache_hit",
+        table_name="article_cache_record",
+        schema="news",
+        if_exists=True,
+    )
+    op.drop_index(
+        "article_idx_feed_id_created",
+        table_name="article",
+        schema="news",
+        if_exists=True,
+    )
@@ -0,0 +1,88 @@
+"""create cache_hit_stats table
+
+Revision ID: b81f4d6a2c95
+Revises: a4e1b7c93d20
+Create Date: 2026-10-18 12:00:48.315720+00:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b81f4d6a2c95"
+down_revision = "a4e1b7c93d20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cache_hit_stats",
+        sa.Column(
+            "id",
+            sa.BigInteger,
+            primary_key=True,
+            nullable=False,
+            server_default=sa.text("id_gen()"),
+        ),
+        sa.Column(
+            "locale_id", sa.BigInteger, sa.ForeignKey("locale.id"), nullable=False
+        ),
+        sa.Column("day", sa.Date, nullable=False),
+        sa.Column("article_count", sa.BigInteger, nullable=False, default=0),
+        sa.Column("stored_article_count", sa.BigInteger, nullable=False, default=0),
+        sa.Column("cache_hit_count", sa.BigInteger, nullable=False, default=0),
+        sa.Column(
+            "created",
+            sa.DateTime,
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "modified",
+            sa.DateTime,
+            server_onupdate=sa.func.now(),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.UniqueConstraint("locale_id", "day"),
+        schema="news",
+    )
+    op.create_index(
+        "cache_hit_stats_idx_day",
+        "cache_hit_stats",
+        ["day"],
+        unique=False,
+        schema="news",
+        if_not_exists=True,
+    )
+
+    # Backfill the stats of the articles already stored.
+    op.execute(
+        """
+        INSERT INTO news.cache_hit_stats
+            (locale_id, day, article_count, stored_article_count, cache_hit_count)
+        SELECT feed_locale.locale_id,
+               article.created::date,
+               count(*),
+               count(*) FILTER (WHERE cache_record.locale_id = feed_locale.locale_id),
+               count(*) FILTER (WHERE cache_record.locale_id = feed_locale.locale_id)
+        FROM news.article
+        JOIN (SELECT DISTINCT feed_id, locale_id FROM news.feed_locale) AS feed_locale
+            ON feed_locale.feed_id = article.feed_id
+        LEFT JOIN news.article_cache_record AS cache_record
+            ON cache_record.article_id = article.id
+        GROUP BY feed_locale.locale_id, article.created::date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "cache_hit_stats_idx_day",
+        table_name="cache_hit_stats",
+        schema="news",
+        if_exists=True,
+    )
+    op.drop_table("cache_hit_stats", schema="news")
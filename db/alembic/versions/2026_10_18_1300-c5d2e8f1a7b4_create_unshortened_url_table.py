@@ -0,0 +1,65 @@
+"""create unshortened_url table
+
+Revision ID: c5d2e8f1a7b4
+Revises: b81f4d6a2c95
+Create Date: 2026-10-18 13:00:12.504318+00:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d2e8f1a7b4"
+down_revision = "b81f4d6a2c95"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "unshortened_url",
+        sa.Column(
+            "id",
+            sa.BigInteger,
+            primary_key=True,
+            nullable=False,
+            server_default=sa.text("id_gen()"),
+        ),
+        sa.Column("link", sa.String, nullable=False, unique=True),
+        sa.Column("url", sa.String, nullable=True),
+        sa.Column("url_hash", sa.String, nullable=True),
+        sa.Column("resolved_at", sa.DateTime, nullable=False),
+        sa.Column(
+            "created",
+            sa.DateTime,
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "modified",
+            sa.DateTime,
+            server_onupdate=sa.func.now(),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        schema="news",
+    )
+    op.create_index(
+        "unshortened_url_idx_resolved_at",
+        "unshortened_url",
+        ["resolved_at"],
+        unique=False,
+        schema="news",
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "unshortened_url_idx_resolved_at",
+        table_name="unshortened_url",
+        schema="news",
+        if_exists=True,
+    )
+    op.drop_table("unshortened_url", schema="news")
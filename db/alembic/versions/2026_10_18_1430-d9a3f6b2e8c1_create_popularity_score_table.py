@@ -0,0 +1,64 @@
+"""create popularity_score table
+
+Revision ID: d9a3f6b2e8c1
+Revises: c5d2e8f1a7b4
+Create Date: 2026-10-18 14:30:41.218904+00:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d9a3f6b2e8c1"
+down_revision = "c5d2e8f1a7b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "popularity_score",
+        sa.Column(
+            "id",
+            sa.BigInteger,
+            primary_key=True,
+            nullable=False,
+            server_default=sa.text("id_gen()"),
+        ),
+        sa.Column("url_hash", sa.String, nullable=False, unique=True),
+        sa.Column("pop_score", sa.Float, nullable=False),
+        sa.Column("fetched_at", sa.DateTime, nullable=False),
+        sa.Column(
+            "created",
+            sa.DateTime,
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "modified",
+            sa.DateTime,
+            server_onupdate=sa.func.now(),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        schema="news",
+    )
+    op.create_index(
+        "popularity_score_idx_fetched_at",
+        "popularity_score",
+        ["fetched_at"],
+        unique=False,
+        schema="news",
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "popularity_score_idx_fetched_at",
+        table_name="popularity_score",
+        schema="news",
+        if_exists=True,
+    )
+    op.drop_table("popularity_score", schema="news")
@@ -0,0 +1,65 @@
+"""create channel_prediction table
+
+Revision ID: e4b7c1d9f2a6
+Revises: d9a3f6b2e8c1
+Create Date: 2026-10-18 15:45:07.631572+00:00
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b7c1d9f2a6"
+down_revision = "d9a3f6b2e8c1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "channel_prediction",
+        sa.Column(
+            "id",
+            sa.BigInteger,
+            primary_key=True,
+            nullable=False,
+            server_default=sa.text("id_gen()"),
+        ),
+        sa.Column("url_hash", sa.String, nullable=False, unique=True),
+        sa.Column("category", sa.String, nullable=True),
+        sa.Column("confidence", sa.Float, nullable=True),
+        sa.Column("predicted_at", sa.DateTime, nullable=False),
+        sa.Column(
+            "created",
+            sa.DateTime,
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "modified",
+            sa.DateTime,
+            server_onupdate=sa.func.now(),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        schema="news",
+    )
+    op.create_index(
+        "channel_prediction_idx_predicted_at",
+        "channel_prediction",
+        ["predicted_at"],
+        unique=False,
+        schema="news",
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "channel_prediction_idx_predicted_at",
+        table_name="channel_prediction",
+        schema="news",
+        if_exists=True,
+    )
+    op.drop_table("channel_prediction", schema="news")
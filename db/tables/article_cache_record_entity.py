@@ -1,4 +1,14 @@
-from sqlalchemy import UUID, BigInteger, Column, DateTime, ForeignKey, Integer, func
+from sqlalchemy import (
+    UUID,
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import relationship
 
 from db.tables.base import Base
@@ -6,11 +16,15 @@ from db.tables.base import Base
 
 class ArticleCacheRecordEntity(Base):
     __tablename__ = "article_cache_record"
-    __table_args__ = {"schema": "news"}
+    __table_args__ = (
+        UniqueConstraint("article_id", "locale_id", name="uq_arc_locale"),
+        Index("article_cache_record_idx_locale_id_cache_hit", "locale_id", "cache_hit"),
+        {"schema": "news"},
+    )
 
     id = Column(BigInteger, primary_key=True, server_default=func.id_gen())
     article_id = Column(
-        BigInteger, ForeignKey("article.id"), nullable=False, index=True, unique=True
+        BigInteger, ForeignKey("article.id"), nullable=False, index=True
     )
     cache_hit = Column(Integer, nullable=False, default=0)
     locale_id = Column(BigInteger, ForeignKey("locale.id"), nullable=False)
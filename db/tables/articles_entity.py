@@ -5,6 +5,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     String,
     func,
 )
@@ -15,7 +16,11 @@ from db.tables.base import Base
 
 class ArticleEntity(Base):
     __tablename__ = "article"
-    __table_args__ = {"schema": "news"}
+    __table_args__ = (
+        Index("article_idx_created_id", "created", "id"),
+        Index("article_idx_feed_id_created", "feed_id", "created"),
+        {"schema": "news"},
+    )
 
     id = Column(BigInteger, primary_key=True, server_default=func.id_gen())
     title = Column(String, nullable=False)
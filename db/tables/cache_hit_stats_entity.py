@@ -0,0 +1,56 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.orm import relationship
+
+from db.tables.base import Base
+
+
+class CacheHitStatsEntity(Base):
+    __tablename__ = "cache_hit_stats"
+    __table_args__ = (
+        UniqueConstraint("locale_id", "day"),
+        Index("cache_hit_stats_idx_day", "day"),
+        {"schema": "news"},
+    )
+
+    id = Column(BigInteger, primary_key=True, server_default=func.id_gen())
+    locale_id = Column(BigInteger, ForeignKey("locale.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    # Articles created that day in the feeds of the locale.
+    article_count = Column(BigInteger, nullable=False, default=0)
+    # Articles created that day by the aggregations of the locale.
+    stored_article_count = Column(BigInteger, nullable=False, default=0)
+    # Articles created that day with a cache record for the locale.
+    cache_hit_count = Column(BigInteger, nullable=False, default=0)
+    created = Column(DateTime, nullable=False, server_default=func.now())
+    modified = Column(
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    locale = relationship("LocaleEntity")
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "locale_id": self.locale_id,
+            "day": self.day,
+            "article_count": self.article_count,
+            "stored_article_count": self.stored_article_count,
+            "cache_hit_count": self.cache_hit_count,
+            "created": self.created,
+            "modified": self.modified,
+        }
+
+    def __str__(self):
+        return f"cache_hit_stats_entity(locale_id={self.locale_id!r}, day={self.day!r})"
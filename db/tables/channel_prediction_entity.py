@@ -0,0 +1,39 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, Index, String, func
+
+from db.tables.base import Base
+
+
+class ChannelPredictionEntity(Base):
+    __tablename__ = "channel_prediction"
+    __table_args__ = (
+        Index("channel_prediction_idx_predicted_at", "predicted_at"),
+        {"schema": "news"},
+    )
+
+    id = Column(BigInteger, primary_key=True, server_default=func.id_gen())
+    url_hash = Column(String, nullable=False, unique=True)
+    # The most confident category predicted by the NU-API, null if it predicted none.
+    category = Column(String, nullable=True)
+    confidence = Column(Float, nullable=True)
+    predicted_at = Column(DateTime, nullable=False)
+    created = Column(DateTime, nullable=False, server_default=func.now())
+    modified = Column(
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "url_hash": self.url_hash,
+            "category": self.category,
+            "confidence": self.confidence,
+            "predicted_at": self.predicted_at,
+            "created": self.created,
+            "modified": self.modified,
+        }
+
+    def __str__(self):
+        return f"channel_prediction_entity(url_hash={self.url_hash!r}, category={self.category!r})"
@@ -1,4 +1,4 @@
-from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, func
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, String, func
 from sqlalchemy.orm import relationship
 
 from db.tables.base import Base
@@ -14,6 +14,9 @@ class FeedUpdateRecordEntity(Base):
     )
     last_build_time = Column(DateTime, nullable=False)
     last_build_timedelta = Column(DateTime, server_default=func.now(), nullable=False)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)
     created = Column(DateTime, server_default=func.now(), nullable=False)
 
     modified = Column(
@@ -31,6 +34,9 @@ class FeedUpdateRecordEntity(Base):
             "feed_id": self.feed_id,
             "last_build_timedate": self.last_build_timedate,
             "last_build_timedelta": self.last_build_timedelta,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "content_hash": self.content_hash,
             "created": self.created,
             "modified": self.modified,
         }
@@ -40,6 +46,9 @@ class FeedUpdateRecordEntity(Base):
             "feed_id": self.feed_id,
             "last_build_timedate": self.last_build_timedate,
             "last_build_timedelta": self.last_build_timedelta,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "content_hash": self.content_hash,
         }
 
     def __str__(self) -> str:
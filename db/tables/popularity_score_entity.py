@@ -0,0 +1,37 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, Index, String, func
+
+from db.tables.base import Base
+
+
+class PopularityScoreEntity(Base):
+    __tablename__ = "popularity_score"
+    __table_args__ = (
+        Index("popularity_score_idx_fetched_at", "fetched_at"),
+        {"schema": "news"},
+    )
+
+    id = Column(BigInteger, primary_key=True, server_default=func.id_gen())
+    url_hash = Column(String, nullable=False, unique=True)
+    # The popularity score of the article before it is normalized across the articles of the aggregation.
+    pop_score = Column(Float, nullable=False)
+    fetched_at = Column(DateTime, nullable=False)
+    created = Column(DateTime, nullable=False, server_default=func.now())
+    modified = Column(
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "url_hash": self.url_hash,
+            "pop_score": self.pop_score,
+            "fetched_at": self.fetched_at,
+            "created": self.created,
+            "modified": self.modified,
+        }
+
+    def __str__(self):
+        return f"popularity_score_entity(url_hash={self.url_hash!r}, pop_score={self.pop_score!r})"
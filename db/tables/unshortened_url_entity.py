@@ -0,0 +1,39 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, String, func
+
+from db.tables.base import Base
+
+
+class UnshortenedUrlEntity(Base):
+    __tablename__ = "unshortened_url"
+    __table_args__ = (
+        Index("unshortened_url_idx_resolved_at", "resolved_at"),
+        {"schema": "news"},
+    )
+
+    id = Column(BigInteger, primary_key=True, server_default=func.id_gen())
+    link = Column(String, nullable=False, unique=True)
+    # The final URL of the link and its hash, null if the link failed to resolve.
+    url = Column(String, nullable=True)
+    url_hash = Column(String, nullable=True)
+    resolved_at = Column(DateTime, nullable=False)
+    created = Column(DateTime, nullable=False, server_default=func.now())
+    modified = Column(
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "link": self.link,
+            "url": self.url,
+            "url_hash": self.url_hash,
+            "resolved_at": self.resolved_at,
+            "created": self.created,
+            "modified": self.modified,
+        }
+
+    def __str__(self):
+        return f"unshortened_url_entity(link={self.link!r}, url={self.url!r})"
@@ -1,41 +1,97 @@
+import asyncio
 import datetime
 import time
 import uuid
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
-from multiprocessing import Pool as ProcessPool
-from multiprocessing.pool import ThreadPool
 from pathlib import Path
 
+import bleach
 import orjson
 import structlog
 
+from aggregator.batcher import Batcher
+from aggregator.channel_predictor import ChannelPredictor
+from aggregator.date_parser import format_publish_time, parse_date
 from aggregator.external_services import (
+    external_classification_hash,
+    external_classification_text,
     get_external_channels_for_article,
-    get_popularity_score,
-    get_predicted_channels,
+    get_external_predicted_channels,
+    skip_external_classification,
 )
+from aggregator.fetch_engine import FetchEngine
+from aggregator.html_extractor import html_to_text
 from aggregator.image_fetcher import (
     check_images_in_item,
     check_small_image,
     process_image,
 )
-from aggregator.image_processor_sandboxed import get_image_with_max_size
-from aggregator.parser import download_feed, parse_rss, score_entries
-from aggregator.processor import process_articles, scrub_html, unshorten_url
+from aggregator.image_processor_sandboxed import get_image_with_max_size_async
+from aggregator.parser import download_feed_async, feed_urls, parse_rss, score_entries
+from aggregator.pipeline import Pipeline
+from aggregator.popularity_client import PopularityClient
+from aggregator.processor import (
+    is_publisher_link,
+    process_articles,
+    profanity_matcher,
+    scrub_html,
+    set_article_url,
+    unshorten_url,
+)
 from config import get_config
 from db_crud import (
+    bulk_upsert_articles,
     get_article,
+    get_articles_by_url_hashes,
+    get_classified_url_hashes,
+    get_feed_validators,
+    get_latest_articles_for_feeds,
+    get_unshortened_urls,
     insert_aggregation_stats,
     insert_external_channels,
     update_aggregation_stats,
-    update_or_insert_article,
+    update_feed_validators,
+    update_unshortened_urls,
 )
 
 config = get_config()
 logger = structlog.get_logger()
 
 
+def init_worker():
+    """
+    Warms up the modules used by the CPU stages in a worker of the process pool, so that the first tasks of the
+    worker do not pay for loading their data.
+    """
+    html_to_text("<p>warm up</p>")
+    parse_date("Mon, 01 Jan 2024 00:00:00 GMT")
+    bleach.clean("<p>warm up</p>", strip=True)
+    profanity_matcher.contains_profanity("warm up")
+
+
+def process_feed_entry(feed_entry):
+    """
+    Processes an entry of a feed, see `process_articles`.
+
+    Args:
+        feed_entry (tuple): The key of the feed, its publisher, its feed info and the entry.
+
+    Returns:
+        tuple: The key of the feed and the processed article, None if the entry was skipped.
+    """
+    key, publisher, feed_info, entry = feed_entry
+    return key, process_articles(entry, _publisher=publisher, feed_info=feed_info)
+
+
+def _destination_domains(publisher):
+    domains = publisher.get("destination_domains") or []
+    if isinstance(domains, str):
+        domains = domains.split(";")
+    return [domain.strip().lower() for domain in domains if domain.strip()]
+
+
 class Aggregator:
     def __init__(self, _publishers: dict, _output_path: Path):
         self.report = defaultdict(dict)  # holds reports and stats of all actions
@@ -45,12 +101,67 @@ class Aggregator:
         self.start_time = datetime.datetime.now()
         self.locale_name = str(config.sources_file).replace("sources.", "")
         self.aggregation_id = uuid.uuid4()
+        self.feed_validators = {}
+        self.unchanged_feed_articles = {}
+        self.destination_domains = {
+            domain
+            for publisher in _publishers.values()
+            for domain in _destination_domains(publisher)
+        }
+        self.unshortened_urls = {}
+        self._unshortened_url_batcher = Batcher(
+            self._lookup_unshortened_urls,
+            config.unshortened_url_batch_size,
+            config.unshortened_url_batch_delay,
+        )
+        self.fetch_engine = FetchEngine()
+        self.popularity_client = PopularityClient(self.fetch_engine, self.locale_name)
+        self.channel_predictor = ChannelPredictor(self.fetch_engine)
+        self._process_pool = None
         logger.info(
             f"{self.start_time} - Starting aggregation with id {self.aggregation_id} for locale {self.locale_name}"
         )
-        logger.info(f"Thread pool size: {config.thread_pool_size}")
+        logger.info(
+            f"Fetch engine concurrency: {config.fetch_max_concurrency}, "
+            f"per host: {config.fetch_per_host_concurrency}"
+        )
         insert_aggregation_stats(self.aggregation_id, self.start_time, self.locale_name)
 
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """
+        The worker pool of all the CPU stages, started on first use and kept for the whole aggregation.
+        """
+        if self._process_pool is None:
+            logger.info(f"Starting a process pool of {config.concurrency} workers...")
+            self._process_pool = ProcessPoolExecutor(
+                config.concurrency, initializer=init_worker
+            )
+        return self._process_pool
+
+    def process_map(self, func, items):
+        """
+        Runs the function on all the items in the process pool, sending the items to the workers in chunks.
+
+        Args:
+            func (Callable): The function to run, it must be picklable.
+            items (list): The items to run the function on.
+
+        Returns:
+            Iterator: The results, in the order of the items.
+        """
+        chunksize = max(1, len(items) // (config.concurrency * 4))
+        return self.process_pool.map(func, items, chunksize=chunksize)
+
+    def close(self):
+        """
+        Stops the process pool and closes the fetch engine.
+        """
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
+        self.fetch_engine.close()
+
     def check_images(self, items):
         """
         Checks the images for the given items.
@@ -64,70 +175,227 @@ class Aggregator:
         result = []
         out_items = []
         logger.info(f"Checking images for padding from {len(items)} items...")
-        with ThreadPool(config.thread_pool_size) as pool:
-            for item, content, is_large in pool.imap_unordered(
-                get_image_with_max_size, items
-            ):
-                result.append((item, content, is_large))
+        for fetched in self.fetch_engine.map(get_image_with_max_size_async, items):
+            if fetched:
+                result.append(fetched)
 
         logger.info(f"Checking images for {len(items)} items...")
-        with ProcessPool(config.concurrency) as pool:
-            for item in pool.imap_unordered(check_small_image, result):
-                out_items.append(item)
+        for item in self.process_map(check_small_image, result):
+            out_items.append(item)
 
         result.clear()
 
-        with ThreadPool(config.thread_pool_size) as pool:
-            for item in pool.imap_unordered(
-                partial(check_images_in_item, _publishers=self.feeds), out_items
-            ):
-                result.append(item)
+        for item in self.fetch_engine.map_sync(
+            partial(check_images_in_item, _publishers=self.feeds), out_items
+        ):
+            result.append(item)
 
         out_items.clear()
 
         padded_result = [(item[0], item[1]) for item in result if item[2] is True]
         out_items = [item[0] for item in result if item[2] is False]
         logger.info(f"Caching images for items...")
-        with ProcessPool(config.concurrency) as pool:
-            for item in pool.imap_unordered(process_image, padded_result):
-                out_items.append(item)
+        for item in self.process_map(process_image, padded_result):
+            out_items.append(item)
 
         return out_items
 
+    def _feed_urls(self, key):
+        return feed_urls(key, self.publishers[key].get("original_feed"))
+
+    async def _download_feed(self, key, engine, conditional=True):
+        validators = None
+        if conditional:
+            validators = self.feed_validators.get(self.publishers[key]["publisher_id"])
+        return await download_feed_async(
+            key, engine, validators=validators, urls=self._feed_urls(key)
+        )
+
+    async def _parse_with_fallback(self, downloaded_feed, engine):
+        """
+        Parses a downloaded feed in the process pool. When the feed has no entries, or fails to parse, it is
+        downloaded again from the next URLs of the feed until one of them parses, so that the parsing never
+        sends requests.
+
+        Returns:
+            tuple: The parsed feed (None if no URL of the feed parsed) and the last download of the feed.
+        """
+        result = await self._run_in_process(parse_rss, downloaded_feed)
+        urls = self._feed_urls(downloaded_feed["key"])
+        while result is None and downloaded_feed.get("url") in urls:
+            urls = urls[urls.index(downloaded_feed["url"]) + 1 :]
+            if not urls:
+                break
+
+            fallback = await download_feed_async(
+                downloaded_feed["key"], engine, urls=urls
+            )
+            if not fallback:
+                break
+
+            downloaded_feed = fallback
+            result = await self._run_in_process(parse_rss, downloaded_feed)
+
+        return result, downloaded_feed
+
+    async def _parse_feed(self, downloaded_feed, engine):
+        """
+        Parses a downloaded feed in the process pool as soon as it is downloaded, so that the body of the feed is
+        only held until it is parsed instead of until all the feeds are downloaded.
+
+        Returns:
+            dict: The key and the validators of the feed, with the parsed feed as `parsed` (None if the feed
+            failed to parse). The feeds that were not modified are returned as downloaded.
+        """
+        if not downloaded_feed or downloaded_feed.get("not_modified"):
+            return downloaded_feed
+
+        parsed, downloaded_feed = await self._parse_with_fallback(
+            downloaded_feed, engine
+        )
+        return {
+            "key": downloaded_feed["key"],
+            "validators": downloaded_feed["validators"],
+            "parsed": parsed,
+        }
+
+    async def _download_and_parse_feed(self, key, engine):
+        return await self._parse_feed(await self._download_feed(key, engine), engine)
+
+    async def _redownload_and_parse_feed(self, key, engine):
+        return await self._parse_feed(
+            await self._download_feed(key, engine, conditional=False), engine
+        )
+
+    def _unshorten_url(self, article, cached_urls):
+        """
+        Resolves the final URL of an article from the cached URLs of the links, then from its link when it is a
+        publisher link, and only then by following the redirects of the link. The links resolved by following
+        their redirects are added to `unshortened_urls`, to be stored at the end of the aggregation.
+
+        Returns:
+            dict: The article with its final URL, None if its link failed to resolve.
+        """
+        link = article["link"]
+        cached = cached_urls.get(link)
+        if cached:
+            if not cached["url"]:
+                return None  # skip (the link failed to resolve recently)
+            article.pop("link", None)
+            article["url"] = cached["url"]
+            article["url_hash"] = cached["url_hash"]
+            return article
+
+        if is_publisher_link(link, self.destination_domains):
+            return set_article_url(article, link)
+
+        article = unshorten_url(article)
+        self.unshortened_urls[link] = {
+            "url": article["url"] if article else None,
+            "url_hash": article["url_hash"] if article else None,
+        }
+        return article
+
+    def reuse_unchanged_feeds(self, unchanged_feeds):
+        """
+        Loads the latest stored articles of the feeds that were not modified since the last aggregation.
+
+        Args:
+            unchanged_feeds (list): The keys of the feeds that were not modified.
+
+        Returns:
+            list: The keys of the feeds without stored articles, they can not be skipped and have to be
+            downloaded again without their validators.
+        """
+        if not unchanged_feeds:
+            return []
+
+        self.unchanged_feed_articles = get_latest_articles_for_feeds(
+            [self.publishers[key]["publisher_id"] for key in unchanged_feeds],
+            self.locale_name,
+        )
+
+        missing_feeds = []
+        for key in unchanged_feeds:
+            publisher = self.publishers[key]
+            if publisher["publisher_id"] not in self.unchanged_feed_articles:
+                missing_feeds.append(key)
+                continue
+
+            article_count = len(self.unchanged_feed_articles[publisher["publisher_id"]])
+            self.report["feed_stats"][key] = {
+                "size_after_get": article_count,
+                "size_after_insert": article_count,
+                "not_modified": True,
+            }
+            self.feeds[publisher["publisher_id"]] = publisher
+
+        logger.info(
+            f"Skipping {len(unchanged_feeds) - len(missing_feeds)} not modified feeds..."
+        )
+        return missing_feeds
+
     def download_feeds(self):
         """
         Downloads feeds from the publishers and parses them.
 
+        Feeds that were not modified since the last aggregation are not parsed, their latest stored articles
+        are kept in `self.unchanged_feed_articles` instead.
+
         Returns:
             feed_cache (dict): A dictionary containing the parsed feeds, with the publisher's key as the key and
             the parsed feed as the value.
         """
-        downloaded_feeds = []
+        parsed_feeds = []
+        unchanged_feeds = []
         feed_cache = {}
+        feed_validators = {}
+
+        if config.conditional_feed_fetch:
+            self.feed_validators = get_feed_validators(
+                [self.publishers[key]["publisher_id"] for key in self.publishers]
+            )
+
         logger.info(f"Downloading {len(self.publishers)} feeds...")
-        with ThreadPool(config.thread_pool_size) as pool:
-            for result in pool.imap_unordered(
-                download_feed,
-                [self.publishers[key]["feed_url"] for key in self.publishers],
-            ):
-                if not result:
-                    continue
-                downloaded_feeds.append(result)
+        for result in self.fetch_engine.map(
+            self._download_and_parse_feed, self.publishers
+        ):
+            if not result:
+                continue
+            if result.get("not_modified"):
+                unchanged_feeds.append(result["key"])
+                continue
+            parsed_feeds.append(result)
+
+        # Feeds without stored articles can not be skipped, download them again.
+        for result in self.fetch_engine.map(
+            self._redownload_and_parse_feed, self.reuse_unchanged_feeds(unchanged_feeds)
+        ):
+            if result:
+                parsed_feeds.append(result)
+
         # Update the aggregation_stats with the number of feeds downloaded
         update_aggregation_stats(
-            id=self.aggregation_id, feed_count=len(downloaded_feeds)
+            id=self.aggregation_id,
+            feed_count=len(parsed_feeds) + len(self.unchanged_feed_articles),
         )
 
-        with ProcessPool(config.concurrency) as pool:
-            for result in pool.imap_unordered(parse_rss, downloaded_feeds):
-                if not result:
-                    continue
+        for parsed_feed in parsed_feeds:
+            result = parsed_feed["parsed"]
+            if not result:
+                continue
 
-                self.report["feed_stats"][result["key"]] = result["report"]
-                feed_cache[result["key"]] = result["feed_cache"]
-                self.feeds[
-                    self.publishers[result["key"]]["publisher_id"]
-                ] = self.publishers[result["key"]]
+            self.report["feed_stats"][result["key"]] = result["report"]
+            feed_cache[result["key"]] = result["feed_cache"]
+            self.feeds[
+                self.publishers[result["key"]]["publisher_id"]
+            ] = self.publishers[result["key"]]
+            feed_validators[
+                self.publishers[result["key"]]["publisher_id"]
+            ] = parsed_feed["validators"]
+
+        if config.conditional_feed_fetch and feed_validators:
+            update_feed_validators(feed_validators)
 
         return feed_cache
 
@@ -165,25 +433,22 @@ class Aggregator:
         logger.info(
             f"Fixing up and extracting the data for the items in {len(feed_cache)} feeds..."
         )
-        for key in feed_cache:
-            logger.debug(f"processing: {key}")
-            start_time = time.time()
-            with ProcessPool(config.concurrency) as pool:
-                for out_item in pool.imap_unordered(
-                    partial(
-                        process_articles,
-                        _publisher=self.publishers[key],
-                        feed_info=feed_cache[key]["feed"],
-                    ),
-                    feed_cache[key]["entries"][: self.publishers[key]["max_entries"]],
-                ):
-                    if out_item:
-                        raw_entries.append(out_item)
-                    self.report["feed_stats"][key]["size_after_insert"] += 1
-            end_time = time.time()
-            logger.debug(
-                f"processed {key} in {round((end_time - start_time) * 1000)} ms"
-            )
+        # All the entries of all the feeds are processed as one flat batch.
+        feed_entries = [
+            (key, self.publishers[key], feed_cache[key]["feed"], entry)
+            for key in feed_cache
+            for entry in feed_cache[key]["entries"][
+                : self.publishers[key]["max_entries"]
+            ]
+        ]
+        start_time = time.time()
+        for key, out_item in self.process_map(process_feed_entry, feed_entries):
+            if out_item:
+                raw_entries.append(out_item)
+            self.report["feed_stats"][key]["size_after_insert"] += 1
+        logger.debug(
+            f"processed {len(feed_entries)} entries in {round((time.time() - start_time) * 1000)} ms"
+        )
         update_aggregation_stats(
             id=self.aggregation_id, start_article_count=len(raw_entries)
         )
@@ -191,25 +456,29 @@ class Aggregator:
         logger.info(f"Un-shorten the URL of {len(raw_entries)}")
         articles = []
         existing_articles = []
-        with ThreadPool(config.thread_pool_size) as pool:
-            for article in pool.imap_unordered(unshorten_url, raw_entries):
-                if article is not None:
-                    articles.append(article)
+        cached_urls = get_unshortened_urls(
+            list({article["link"] for article in raw_entries})
+        )
+        for article in self.fetch_engine.map_sync(
+            partial(self._unshorten_url, cached_urls=cached_urls), raw_entries
+        ):
+            if article is not None:
+                articles.append(article)
+        update_unshortened_urls(self.unshortened_urls)
 
         new_articles = []
-        existing_articles = []
-        db_session = config.get_db_session()
+        stored_articles = get_articles_by_url_hashes(
+            [article["url_hash"] for article in articles], self.locale_name
+        )
+        existing_articles = list(stored_articles.values())
         for article in articles:
-            existing = get_article(
-                article["url_hash"],
-                str(config.sources_file).replace("sources.", ""),
-                db_session,
-            )
-            if existing:
-                existing_articles.append(existing)
-            else:
+            if article["url_hash"] not in stored_articles:
                 new_articles.append(article)
 
+        # Articles of the feeds that were not modified since the last aggregation
+        for feed_articles in self.unchanged_feed_articles.values():
+            existing_articles.extend(feed_articles)
+
         update_aggregation_stats(
             id=self.aggregation_id, cache_hit_count=len(existing_articles)
         )
@@ -218,11 +487,11 @@ class Aggregator:
         logger.info(
             f"Getting the Popularity score of new article the URL of {len(new_articles)}"
         )
-        with ThreadPool(config.thread_pool_size) as pool:
-            for result in pool.imap_unordered(get_popularity_score, new_articles):
-                if not result:
-                    continue
-                raw_entries.append(result)
+        raw_entries.extend(
+            self.fetch_engine.loop.run_until_complete(
+                self.popularity_client.score_articles(new_articles)
+            )
+        )
 
         if raw_entries:
             self.normalize_pop_score(raw_entries)
@@ -230,51 +499,364 @@ class Aggregator:
         logger.info(
             f"Getting the Popularity score of old article the URL of {len(existing_articles)}"
         )
-        processed_articles = []
-        with ThreadPool(config.thread_pool_size) as pool:
-            for result in pool.imap_unordered(get_popularity_score, existing_articles):
-                if not result:
-                    continue
-                processed_articles.append(result)
+        processed_articles = self.fetch_engine.loop.run_until_complete(
+            self.popularity_client.score_articles(existing_articles)
+        )
+        self.popularity_client.save()
 
         if processed_articles:
             self.normalize_pop_score(processed_articles)
 
         if str(config.sources_file) == "sources.en_US":
-            new_articles.clear()
             logger.info(f"Getting the Predicted Channel the API of {len(raw_entries)}")
-            with ThreadPool(config.thread_pool_size) as pool:
-                for result in pool.imap_unordered(get_predicted_channels, raw_entries):
-                    if not result:
-                        continue
-                    new_articles.append(result)
+            new_articles = self.fetch_engine.loop.run_until_complete(
+                self.channel_predictor.predict_articles(raw_entries)
+            )
+            self.channel_predictor.save()
             return new_articles, processed_articles
 
         return raw_entries, processed_articles
 
+    def get_fixed_rss(self):
+        """
+        Retrieves the RSS feed data with `get_rss` and checks the images of the new entries.
+
+        Returns:
+            tuple: The new entries with their images checked, and the already processed articles.
+        """
+        entries, processed_articles = self.get_rss()
+
+        logger.info(f"Getting images for {len(entries)} items...")
+        fixed_entries = self.check_images(entries)
+        entries.clear()
+
+        return fixed_entries, processed_articles
+
+    def _article_pipeline(self, conditional=True):
+        """
+        Builds the streaming pipeline of `stream_rss`, from the feed download to the scrubbed article. The feeds
+        are downloaded with their validators if `conditional`.
+        """
+        pipeline = Pipeline(config.pipeline_queue_size)
+        pipeline.add_stage(
+            "download",
+            partial(self._stream_download, conditional=conditional),
+            config.fetch_max_concurrency,
+        )
+        pipeline.add_stage(
+            "parse",
+            self._stream_parse,
+            config.concurrency,
+            fan_out=True,
+        )
+        pipeline.add_stage(
+            "process",
+            self._stream_process,
+            config.concurrency,
+        )
+        pipeline.add_stage(
+            "unshorten_lookup",
+            self._stream_unshorten_lookup,
+            config.fetch_max_concurrency,
+        )
+        pipeline.add_stage(
+            "unshorten",
+            self._stream_unshorten,
+            config.thread_pool_size,
+        )
+        # A single worker, the database session of the stage is used by one thread at a time.
+        pipeline.add_stage("cache_lookup", self._stream_cache_lookup, 1)
+        pipeline.add_stage(
+            "popularity",
+            self.popularity_client.score_article,
+            config.fetch_max_concurrency,
+        )
+        if str(config.sources_file) == "sources.en_US":
+            pipeline.add_stage(
+                "predicted_channels",
+                self.channel_predictor.predict_article,
+                config.fetch_max_concurrency,
+            )
+        pipeline.add_stage(
+            "image_download",
+            partial(get_image_with_max_size_async, engine=self.fetch_engine),
+            config.fetch_max_concurrency,
+        )
+        pipeline.add_stage(
+            "image_check",
+            partial(self._run_in_process, check_small_image),
+            config.concurrency,
+        )
+        pipeline.add_stage(
+            "og_image",
+            partial(
+                self.fetch_engine.run_sync,
+                partial(check_images_in_item, _publishers=self.feeds),
+            ),
+            config.thread_pool_size,
+        )
+        pipeline.add_stage(
+            "image_cache",
+            self._stream_cache_image,
+            config.concurrency,
+        )
+        pipeline.add_stage(
+            "scrub",
+            partial(self._run_in_process, scrub_html),
+            config.concurrency,
+        )
+        return pipeline
+
+    async def _run_in_process(self, func, *args):
+        return await self.fetch_engine.loop.run_in_executor(
+            self.process_pool, partial(func, *args)
+        )
+
+    async def _stream_download(self, key, conditional=True):
+        result = await self._download_feed(
+            key, engine=self.fetch_engine, conditional=conditional
+        )
+        if result and result.get("not_modified"):
+            self.stream_state["unchanged_feeds"].append(result["key"])
+            return None
+        return result
+
+    async def _stream_parse(self, downloaded_feed):
+        result, downloaded_feed = await self._parse_with_fallback(
+            downloaded_feed, self.fetch_engine
+        )
+        if not result:
+            return None
+
+        key = result["key"]
+        publisher = self.publishers[key]
+        self.report["feed_stats"][key] = result["report"]
+        self.feeds[publisher["publisher_id"]] = publisher
+        self.stream_state["feed_count"] += 1
+        self.stream_state["feed_validators"][
+            publisher["publisher_id"]
+        ] = downloaded_feed["validators"]
+
+        feed_info = result["feed_cache"]["feed"]
+        return [
+            (key, feed_info, entry)
+            for entry in result["feed_cache"]["entries"][: publisher["max_entries"]]
+        ]
+
+    async def _stream_process(self, feed_entry):
+        key, feed_info, entry = feed_entry
+        out_item = await self._run_in_process(
+            partial(
+                process_articles, _publisher=self.publishers[key], feed_info=feed_info
+            ),
+            entry,
+        )
+        self.report["feed_stats"][key]["size_after_insert"] += 1
+        if out_item:
+            self.stream_state["start_article_count"] += 1
+        return out_item
+
+    async def _lookup_unshortened_urls(self, articles):
+        # Every batch opens its own database session, the batches can be looked up concurrently.
+        cached_urls = await self.fetch_engine.run_sync(
+            get_unshortened_urls, list({article["link"] for article in articles})
+        )
+        return [(article, cached_urls) for article in articles]
+
+    async def _stream_unshorten_lookup(self, article):
+        return await self._unshortened_url_batcher.submit(article)
+
+    async def _stream_unshorten(self, article_with_cached_urls):
+        return await self.fetch_engine.run_sync(
+            self._unshorten_url, *article_with_cached_urls
+        )
+
+    async def _stream_cache_lookup(self, article):
+        existing = await self.fetch_engine.run_sync(
+            partial(get_article, db_session=self.stream_state["cache_lookup_session"]),
+            article["url_hash"],
+            self.locale_name,
+        )
+        if not existing:
+            return article
+
+        # Already processed articles only need their popularity score, get it alongside the pipeline.
+        self.stream_state["existing_articles"].append(
+            asyncio.ensure_future(self.popularity_client.score_article(existing))
+        )
+        return None
+
+    async def _stream_cache_image(self, article_with_detail):
+        article, content, is_large = article_with_detail
+        if is_large is True:
+            return await self._run_in_process(process_image, (article, content))
+        return article
+
+    async def _stream(self, items, pipeline):
+        articles = await pipeline.run(items)
+        existing_articles = await asyncio.gather(
+            *self.stream_state["existing_articles"]
+        )
+        self.stream_state["existing_articles"].clear()
+        return articles, existing_articles
+
+    def stream_rss(self):
+        """
+        Streaming version of `get_rss`, including the image checks and the scrubbing of `aggregate_rss`.
+
+        Every feed and article flows through the stages independently via bounded queues, so a slow feed or
+        a slow image does not hold back the other articles. The popularity scores are normalized once every
+        article has its score.
+
+        Returns:
+            tuple: The new articles, checked and scrubbed, and the already processed articles.
+        """
+        self.report["feed_stats"] = {}
+        self.stream_state = {
+            "unchanged_feeds": [],
+            "feed_validators": {},
+            "feed_count": 0,
+            "start_article_count": 0,
+            "existing_articles": [],
+            "cache_lookup_session": config.get_db_session(),
+        }
+
+        if config.conditional_feed_fetch:
+            self.feed_validators = get_feed_validators(
+                [self.publishers[key]["publisher_id"] for key in self.publishers]
+            )
+
+        logger.info(f"Streaming {len(self.publishers)} feeds through the pipeline...")
+        articles, processed_articles = self.fetch_engine.loop.run_until_complete(
+            self._stream(self.publishers, self._article_pipeline())
+        )
+
+        if self.stream_state["unchanged_feeds"]:
+            missing_feeds = self.reuse_unchanged_feeds(
+                self.stream_state["unchanged_feeds"]
+            )
+            (
+                more_articles,
+                more_processed_articles,
+            ) = self.fetch_engine.loop.run_until_complete(
+                self._stream(missing_feeds, self._article_pipeline(conditional=False))
+            )
+            articles.extend(more_articles)
+            processed_articles.extend(more_processed_articles)
+
+        # Articles of the feeds that were not modified since the last aggregation
+        unchanged_articles = [
+            article
+            for feed_articles in self.unchanged_feed_articles.values()
+            for article in feed_articles
+        ]
+        processed_articles.extend(
+            self.fetch_engine.loop.run_until_complete(
+                self.popularity_client.score_articles(unchanged_articles)
+            )
+        )
+        processed_articles = [article for article in processed_articles if article]
+
+        update_aggregation_stats(
+            id=self.aggregation_id,
+            feed_count=self.stream_state["feed_count"]
+            + len(self.unchanged_feed_articles),
+            start_article_count=self.stream_state["start_article_count"],
+            cache_hit_count=len(processed_articles),
+        )
+        if config.conditional_feed_fetch and self.stream_state["feed_validators"]:
+            update_feed_validators(self.stream_state["feed_validators"])
+        update_unshortened_urls(self.unshortened_urls)
+        self.popularity_client.save()
+        self.channel_predictor.save()
+
+        if articles:
+            self.normalize_pop_score(articles)
+        if processed_articles:
+            self.normalize_pop_score(processed_articles)
+
+        return articles, processed_articles
+
+    def classify_articles(self, articles, db_session):
+        """
+        Stores the external channels of the articles, from their Natural Language classification.
+
+        The articles that already have external channels are skipped, and the articles with the same title and
+        description are classified once. The articles whose classification failed are not stored, they are
+        classified again by the next aggregation.
+
+        Args:
+            articles (list): The articles.
+            db_session (Session): The database session to store the external channels with.
+        """
+        classified_url_hashes = get_classified_url_hashes(
+            [article["url_hash"] for article in articles], db_session
+        )
+        articles = [
+            article
+            for article in articles
+            if article["url_hash"] not in classified_url_hashes
+        ]
+        logger.info(
+            f"Skipped {len(classified_url_hashes)} articles with external channels"
+        )
+
+        texts = {
+            external_classification_hash(article): external_classification_text(article)
+            for article in articles
+            if not skip_external_classification(article)
+        }
+        # The GCP client is blocking, classify the texts in the executor of the engine
+        categories = dict(
+            zip(
+                texts,
+                self.fetch_engine.map_sync(
+                    get_external_predicted_channels, list(texts.values())
+                ),
+            )
+        )
+
+        for article in articles:
+            external_categories = None
+            if not skip_external_classification(article):
+                external_categories = categories[external_classification_hash(article)]
+                if external_categories is None:
+                    continue
+
+            article, ext_channels, api_raw_data = get_external_channels_for_article(
+                article, external_categories
+            )
+            insert_external_channels(
+                article["url_hash"],
+                ext_channels,
+                api_raw_data,
+                db_session,
+            )
+
     def aggregate_rss(self):
         """
         Aggregates RSS entries by performing the following steps:
 
         1. Retrieves RSS entries using the `get_rss` method.
         2. Checks and fixes images for each entry using the `check_images` method.
-        3. Scrubs HTML content in parallel using a `ProcessPool` and the `scrub_html` function.
+        3. Scrubs HTML content in parallel using the process pool and the `scrub_html` function.
         4. Removes duplicate entries based on the `url_hash` field.
         5. Sorts the entries based on the `publish_time` field in descending order.
         6. Calculates scores for each entry using the `score_entries` function.
+        7. Formats the publish time of each entry for the feed file.
+
+        With `config.streaming_pipeline`, steps 1 to 3 run as a single streaming pipeline, see `stream_rss`.
 
         Returns a list of filtered entries.
         """
         filtered_entries = []
-        entries, processed_articles = self.get_rss()
-
-        logger.info(f"Getting images for {len(entries)} items...")
-        fixed_entries = self.check_images(entries)
-        entries.clear()
-
-        logger.info(f"Scrubbing {len(fixed_entries)} items...")
-        with ProcessPool(config.concurrency) as pool:
-            for result in pool.imap_unordered(scrub_html, fixed_entries):
+        if config.streaming_pipeline:
+            fixed_entries, processed_articles = self.stream_rss()
+            filtered_entries.extend(fixed_entries)
+        else:
+            fixed_entries, processed_articles = self.get_fixed_rss()
+            logger.info(f"Scrubbing {len(fixed_entries)} items...")
+            for result in self.process_map(scrub_html, fixed_entries):
                 filtered_entries.append(result)
 
         # Add already processed articles
@@ -289,16 +871,13 @@ class Aggregator:
 
         filtered_entries = score_entries(sorted_entries)
 
-        locale_name = str(config.sources_file).replace("sources.", "")
         db_session = config.get_db_session()
-
-        for entry in filtered_entries:
-            update_or_insert_article(
-                entry,
-                locale=locale_name,
-                aggregation_id=self.aggregation_id,
-                db_session=db_session,
-            )
+        bulk_upsert_articles(
+            filtered_entries,
+            self.locale_name,
+            self.aggregation_id,
+            db_session=db_session,
+        )
 
         # Getting external channels for articles
         if str(config.sources_file) == "sources.en_US":
@@ -306,22 +885,10 @@ class Aggregator:
                 f"Getting the External Predicted Channel the API of {len(fixed_entries)}"
             )
 
-            results = []
-            # Using ThreadPool to fetch external channels concurrently
-            with ThreadPool(config.thread_pool_size) as pool:
-                results = list(
-                    pool.imap_unordered(
-                        get_external_channels_for_article, fixed_entries
-                    )
-                )
+            self.classify_articles(fixed_entries, db_session)
 
-            for article, ext_channels, api_raw_data in results:
-                insert_external_channels(
-                    article["url_hash"],
-                    ext_channels,
-                    api_raw_data,
-                    db_session,
-                )
+        for entry in filtered_entries:
+            entry["publish_time"] = format_publish_time(entry["publish_time"])
 
         return filtered_entries
 
@@ -329,6 +896,9 @@ class Aggregator:
         """
         Aggregates the RSS feeds and writes the result to the output file.
         """
-        with open(self.output_path, "wb") as _f:
-            feeds = self.aggregate_rss()
-            _f.write(orjson.dumps(feeds))
+        try:
+            with open(self.output_path, "wb") as _f:
+                feeds = self.aggregate_rss()
+                _f.write(orjson.dumps(feeds))
+        finally:
+            self.close()
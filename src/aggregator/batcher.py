@@ -0,0 +1,72 @@
+# Copyright (c) 2023 The Brave Authors. All rights reserved.
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://mozilla.org/MPL/2.0/. */
+
+import asyncio
+from typing import Any, Awaitable, Callable, List
+
+
+class Batcher:
+    """
+    Groups the items submitted one at a time by concurrent coroutines into batches, for the streaming pipeline.
+
+    A batch is sent to the coroutine function when `batch_size` items are waiting, or `delay` seconds after its
+    first item was submitted.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[List[Any]], Awaitable[List[Any]]],
+        batch_size: int,
+        delay: float,
+    ):
+        self.func = func
+        self.batch_size = batch_size
+        self.delay = delay
+        self._pending = []
+        self._flush_handle = None
+        self._tasks = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Adds an item to the next batch and waits for its result.
+
+        Args:
+            item (Any): The item.
+
+        Returns:
+            Any: The result of the item, at the index of the item in the results of the batch.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(pending))
+        # The event loop only keeps weak references to the tasks.
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending):
+        try:
+            results = await self.func([item for item, _ in pending])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
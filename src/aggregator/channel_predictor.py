@@ -0,0 +1,173 @@
+# Copyright (c) 2023 The Brave Authors. All rights reserved.
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://mozilla.org/MPL/2.0/. */
+
+import asyncio
+from typing import Dict, List, Optional
+
+import structlog
+
+from aggregator.batcher import Batcher
+from aggregator.external_services import (
+    nu_api_rate_limiter,
+    prediction_item,
+    skip_channel_prediction,
+    top_predicted_category,
+    with_predicted_category,
+)
+from aggregator.fetch_engine import FetchEngine
+from config import get_config
+from db_crud import get_channel_predictions, update_channel_predictions
+
+config = get_config()
+logger = structlog.getLogger(__name__)
+
+# The results of the articles that were not predicted, to be sent again.
+NOT_PREDICTED = object()
+
+
+def _result_category(results: list, index: int):
+    if index >= len(results) or not isinstance(results[index], dict):
+        return NOT_PREDICTED
+    if "categories" not in results[index]:
+        return NOT_PREDICTED
+    return top_predicted_category(results[index]["categories"])
+
+
+class ChannelPredictor:
+    """
+    Predicts the channels of the articles with the NU-API.
+
+    The articles of the default channels and the short articles are not predicted. The categories predicted
+    less than `config.nu_prediction_cache_ttl` seconds ago, by this aggregation or a previous one, are reused.
+    The other articles are sent in batches of `config.nu_batch_size` articles, and the articles of a failed
+    request, or missing from its results, are sent again up to `config.nu_max_retries` times.
+    """
+
+    def __init__(self, engine: FetchEngine):
+        self.engine = engine
+        self.predictions: Dict[str, Optional[dict]] = {}
+        # The categories predicted by the NU-API during this aggregation, stored in the cache by `save`.
+        self.new_predictions: Dict[str, Optional[dict]] = {}
+        self._batcher = Batcher(
+            self._predict_batch, config.nu_batch_size, config.nu_batch_delay
+        )
+
+    async def _request_predictions(self, articles: List[dict]) -> list:
+        try:
+            await nu_api_rate_limiter.acquire_async()
+            response = await self.engine.request(
+                "POST",
+                config.nu_api_url,
+                json=[prediction_item(article) for article in articles],
+                headers={"Authorization": f"Bearer {config.nu_api_token}"},
+                timeout=config.request_timeout,
+            )
+            response.raise_for_status()
+            results = response.json().get("results") or []
+        except Exception as e:
+            logger.error(
+                f"Unable to get predicted categories for {len(articles)} articles due to {e}"
+            )
+            return [NOT_PREDICTED] * len(articles)
+
+        # The results are in the order of the articles of the request.
+        return [_result_category(results, index) for index in range(len(articles))]
+
+    async def _predict(self, articles: List[dict]):
+        for _ in range(config.nu_max_retries + 1):
+            if not articles:
+                return
+
+            batches = [
+                articles[start : start + config.nu_batch_size]
+                for start in range(0, len(articles), config.nu_batch_size)
+            ]
+            results = await asyncio.gather(
+                *[self._request_predictions(batch) for batch in batches]
+            )
+
+            articles = []
+            for batch, categories in zip(batches, results):
+                for article, category in zip(batch, categories):
+                    if category is NOT_PREDICTED:
+                        articles.append(article)
+                    else:
+                        self.predictions[article["url_hash"]] = category
+                        self.new_predictions[article["url_hash"]] = category
+
+        if articles:
+            logger.error(
+                f"Unable to get predicted category for {len(articles)} articles"
+            )
+
+    async def predict_articles(self, articles: List[dict]) -> List[dict]:
+        """
+        Predicts the channels of the articles.
+
+        Args:
+            articles (List[dict]): The articles.
+
+        Returns:
+            List[dict]: The articles, with their channels updated with the predicted category.
+        """
+        if not config.nu_api_url:
+            return articles
+
+        eligible = [
+            article for article in articles if not skip_channel_prediction(article)
+        ]
+        url_hashes = {
+            article["url_hash"]
+            for article in eligible
+            if article["url_hash"] not in self.predictions
+        }
+        if url_hashes:
+            self.predictions.update(
+                await self.engine.run_sync(get_channel_predictions, list(url_hashes))
+            )
+
+        await self._predict(
+            list(
+                {
+                    article["url_hash"]: article
+                    for article in eligible
+                    if article["url_hash"] not in self.predictions
+                }.values()
+            )
+        )
+
+        for article in eligible:
+            if article["url_hash"] in self.predictions:
+                with_predicted_category(article, self.predictions[article["url_hash"]])
+        return articles
+
+    async def _predict_batch(self, articles: List[dict]) -> List[dict]:
+        try:
+            return await self.predict_articles(articles)
+        except Exception as e:
+            logger.error(
+                f"Unable to get predicted categories for {len(articles)} articles due to {e}"
+            )
+            return articles
+
+    async def predict_article(self, article: dict) -> dict:
+        """
+        Predicts the channels of an article, in a batch with the articles predicted before
+        `config.nu_batch_delay` seconds have passed or `config.nu_batch_size` articles are waiting.
+
+        Args:
+            article (dict): The article.
+
+        Returns:
+            dict: The article, with its channels updated with the predicted category.
+        """
+        return await self._batcher.submit(article)
+
+    def save(self):
+        """
+        Stores the categories predicted during the aggregation in the cache.
+        """
+        update_channel_predictions(self.new_predictions)
+        self.new_predictions = {}
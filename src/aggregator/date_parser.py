@@ -0,0 +1,84 @@
+# Copyright (c) 2023 The Brave Authors. All rights reserved.
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://mozilla.org/MPL/2.0/. */
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from time import struct_time
+from typing import Optional
+
+import dateparser
+
+PUBLISH_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _parse_rfc822(value: str) -> Optional[datetime]:
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+    if date.tzinfo is None:
+        zone = value.split()[-1]
+        # The -0000 zone is UTC without a known local time, keep it UTC like dateparser does.
+        if zone == "-0000":
+            return date.replace(tzinfo=timezone.utc)
+        # The time zone names unknown to the email module are ignored by it, leave them to dateparser.
+        if zone.isalpha():
+            return None
+    return date
+
+
+def _parse_iso8601(value: str) -> Optional[datetime]:
+    value = value.strip()
+    if value[-1:] in "zZ":
+        value = value[:-1] + "+00:00"
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def parse_date(
+    value: Optional[str], parsed: Optional[struct_time] = None
+) -> Optional[datetime]:
+    """
+    Parses the date of a feed or of an entry of a feed.
+
+    The RFC 822 dates of RSS and the ISO 8601 dates of Atom are parsed with the standard library, then the
+    date parsed by feedparser is used, and only the other dates are parsed with `dateparser`, which is much
+    slower as it detects the language of the date.
+
+    Args:
+        value (Optional[str]): The date.
+        parsed (Optional[struct_time]): The UTC date parsed by feedparser, the `<field>_parsed` of the field.
+
+    Returns:
+        Optional[datetime]: The date, aware if the date has a time zone, or None if the date can not be parsed.
+    """
+    if not value:
+        return None
+
+    date = _parse_rfc822(value) or _parse_iso8601(value)
+    if date:
+        return date
+
+    # Like the email module, feedparser ignores the time zone names it does not know.
+    if parsed and not value.split()[-1].isalpha():
+        return datetime(*parsed[:6], tzinfo=timezone.utc)
+
+    return dateparser.parse(value)
+
+
+def format_publish_time(publish_time: datetime) -> str:
+    """
+    Formats the publish time of an article for the feed files and the APIs.
+
+    Args:
+        publish_time (datetime): The UTC publish time of the article.
+
+    Returns:
+        str: The publish time as `YYYY-MM-DD HH:MM:SS`.
+    """
+    return publish_time.strftime(PUBLISH_TIME_FORMAT)
@@ -1,127 +1,105 @@
-import orjson
-import requests
+import hashlib
+from datetime import datetime
+
 import structlog
 from google.cloud import language_v1
 
+from aggregator.date_parser import format_publish_time
 from config import get_config
 from ext_article_categorization.taxonomy_mapping import get_channels_for_classification
-from utils import RateLimiter
+from utils import get_rate_limiter
 
 config = get_config()
 logger = structlog.getLogger(__name__)
 
-rate_limiter = RateLimiter(config.rate_limit)
+# Each API gets its own budget, see `config.rate_limits`.
+popularity_rate_limiter = get_rate_limiter("popularity")
+nu_api_rate_limiter = get_rate_limiter("nu_api")
+gcp_language_rate_limiter = get_rate_limiter("gcp_language")
 
 
-@rate_limiter
-def limited_request(method, url, **kwargs):
-    return requests.request(method, url, **kwargs)
+@popularity_rate_limiter
+async def limited_request_async(engine, method, url, **kwargs):
+    return await engine.request(method, url, **kwargs)
 
 
-def get_popularity_score(_article):
+def popularity_score(pop_response):
     """
-    Calculate the popularity score for an article.
+    Computes the popularity score of an article from the response of the popularity API for its URL.
 
     Parameters:
-        _article (dict): The dictionary representing the article to calculate the popularity score for.
+        pop_response (dict): The decoded response of the popularity API.
 
     Returns:
-        dict: The updated dictionary with the calculated popularity score.
+        float: The popularity score, before normalization.
     """
-    url = config.bs_pop_endpoint + _article["url"]
-
-    try:
-        response = limited_request("GET", url, timeout=config.request_timeout).content
-        pop_response = orjson.loads(response)
-        pop_score = pop_response.get("popularity", {}).get("popularity", {}) or 1.0
-        pop_score_agg = sum(pop_score.values())
-
-        if pop_score_agg <= config.pop_score_cutoff:
-            return {**_article, "pop_score": pop_score_agg}
-
-        pop_score_agg_lin = (config.pop_score_cutoff - 1) + (
-            1 + pop_score_agg - config.pop_score_cutoff
-        ) ** config.pop_score_exponent
-        return {**_article, "pop_score": pop_score_agg_lin}
-
-    except requests.RequestException as req_exc:
-        logger.error(f"Request to {url} failed with error: {req_exc}")
-        return {**_article, "pop_score": 1.0}
-    except orjson.JSONDecodeError as json_exc:
-        logger.error(
-            f"Failed to decode JSON response for {url} with error in Popularity: {json_exc}"
-        )
-        return {**_article, "pop_score": 1.0}
-    except Exception as e:
-        logger.error(f"An unexpected error occurred for {url}: {e}")
-        return {**_article, "pop_score": 1.0}
+    pop_score = pop_response.get("popularity", {}).get("popularity", {})
+    if not pop_score:
+        return 1.0
+    pop_score_agg = sum(pop_score.values())
 
+    if pop_score_agg <= config.pop_score_cutoff:
+        return pop_score_agg
 
-def get_predicted_channels(_article):
-    if config.nu_api_url is None:
-        return _article
-    """
-    Retrieves the predicted channels for an article using the NU-API.
+    return (config.pop_score_cutoff - 1) + (
+        1 + pop_score_agg - config.pop_score_cutoff
+    ) ** config.pop_score_exponent
 
-    Args:
-        _article (dict): The article to retrieve the predicted channels for.
 
-    Returns:
-        dict: The input article with updated channels.
-
-    Raises:
-        Exception: If there is an error retrieving the predicted channels.
-    """
+def skip_channel_prediction(_article):
     # Skip article if in default channels or if description + title is less than 20 characters
-    if (
+    return (
         bool(set(_article["channels"]).intersection(config.nu_default_channels))
         or len(_article.get("description") + _article.get("title")) < 20
-    ):
-        return _article
+    )
 
-    try:
-        response = requests.post(
-            url=config.nu_api_url,
-            json=[_article],
-            headers={"Authorization": f"Bearer {config.nu_api_token}"},
-            timeout=config.request_timeout,
-        )
-        response.raise_for_status()
 
-        api_response = response.json()
-        pred_channels = api_response.get("results")[0]["categories"]
-        if not pred_channels:
-            return _article
+def prediction_item(_article):
+    """
+    The item of an article in the requests to the NU-API.
+    """
+    publish_time = _article.get("publish_time")
+    if isinstance(publish_time, datetime):
+        # The publish time is sent as it is written in the feed files.
+        return {**_article, "publish_time": format_publish_time(publish_time)}
+    return _article
 
-        pred_channels = sorted(
-            pred_channels, key=lambda d: d["confidence"], reverse=True
-        )[0]
 
-        # Skip article if predicted channel is in excluded channels or if confidence is below threshold
-        if (
-            pred_channels["name"] in config.nu_excluded_channels
-            or pred_channels["confidence"] < config.nu_confidence_threshold
-        ):
-            return _article
+def top_predicted_category(categories):
+    """
+    The most confident of the categories predicted by the NU-API for an article, None if there is none.
+    """
+    if not categories:
+        return None
+    return sorted(categories, key=lambda d: d["confidence"], reverse=True)[0]
 
-        # If article in augmented channels, only replace non-augmented channels with predicted channel
-        to_augment = list(
-            set(_article["channels"]).intersection(config.nu_augment_channels)
-        )
-        if to_augment:
-            _article["channels"] = [pred_channels["name"]] + to_augment
-            return _article
 
-        # otherwise replace article channels with predicted channel
-        _article["channels"] = [pred_channels["name"]]
+def with_predicted_category(_article, pred_channels):
+    """
+    Replaces the channels of an article with its predicted category, see `top_predicted_category`.
+    """
+    if not pred_channels:
         return _article
 
-    except Exception as e:
-        logger.error(
-            f"Unable to get predicted category for {_article['url']} due to {e}"
-        )
+    # Skip article if predicted channel is in excluded channels or if confidence is below threshold
+    if (
+        pred_channels["name"] in config.nu_excluded_channels
+        or pred_channels["confidence"] < config.nu_confidence_threshold
+    ):
         return _article
 
+    # If article in augmented channels, only replace non-augmented channels with predicted channel
+    to_augment = list(
+        set(_article["channels"]).intersection(config.nu_augment_channels)
+    )
+    if to_augment:
+        _article["channels"] = [pred_channels["name"]] + to_augment
+        return _article
+
+    # otherwise replace article channels with predicted channel
+    _article["channels"] = [pred_channels["name"]]
+    return _article
+
 
 def get_external_predicted_channels(text_content, language="en"):
     """
@@ -129,6 +107,9 @@ def get_external_predicted_channels(text_content, language="en"):
 
     Args:
       text_content The text content to analyze.
+
+    Returns:
+      The categories of the text, None if the classification failed.
     """
 
     try:
@@ -141,6 +122,7 @@ def get_external_predicted_channels(text_content, language="en"):
             language_v1.ClassificationModelOptions.V2Model.ContentCategoriesVersion.V2
         )
 
+        gcp_language_rate_limiter.acquire()
         response = config.gcp_client().classify_text(
             request={
                 "document": document,
@@ -154,7 +136,7 @@ def get_external_predicted_channels(text_content, language="en"):
         )
     except Exception as e:
         logger.info(e)
-        return []
+        return None
 
     return response.categories
 
@@ -200,17 +182,48 @@ FLAT_ACTIVE_TAXONOMY = [
 ]
 
 
-def get_external_channels_for_article(article):
+def skip_external_classification(article):
     # Skip article if in default channels or if description + title is less than 20 characters
-    if (
+    return (
         bool(set(article["channels"]).intersection(EXTERNAL_DEFAULT_CHANNELS))
         or len(article.get("description") + article.get("title")) < 20
-    ):
+    )
+
+
+def external_classification_text(article):
+    return article["title"] + " " + article["description"]
+
+
+def external_classification_hash(article):
+    """
+    The hash of the text classified for an article, the articles with the same title and description share
+    their classification.
+    """
+    return hashlib.sha256(
+        external_classification_text(article).encode("utf-8")
+    ).hexdigest()
+
+
+def get_external_channels_for_article(article, external_categories=None):
+    """
+    Gets the external channels of an article from its Natural Language classification.
+
+    Args:
+        article (dict): The article.
+        external_categories (list, optional): The classification of the text of the article, classified by this
+            function if None.
+
+    Returns:
+        tuple: The article, its external channels and the categories of its classification, both "" if the
+        article is not classified.
+    """
+    if skip_external_classification(article):
         return article, "", ""
 
-    external_categories = get_external_predicted_channels(
-        article["title"] + " " + article["description"]
-    )
+    if external_categories is None:
+        external_categories = get_external_predicted_channels(
+            external_classification_text(article)
+        )
 
     active_channels = set()
 
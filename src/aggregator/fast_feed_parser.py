@@ -0,0 +1,245 @@
+# Copyright (c) 2023 The Brave Authors. All rights reserved.
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://mozilla.org/MPL/2.0/. */
+
+from copy import deepcopy
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Union
+
+# Only parsed with iterparse(..., resolve_entities=False, no_network=True), safe from XXE and entity expansion.
+from lxml import etree  # nosec B410
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+MEDIA_NS = "http://search.yahoo.com/mrss/"
+XHTML_NS = "http://www.w3.org/1999/xhtml"
+
+RSS = "rss"
+RSS_CHANNEL = "channel"
+RSS_ITEM = "item"
+ATOM_FEED = f"{{{ATOM_NS}}}feed"
+ATOM_ENTRY = f"{{{ATOM_NS}}}entry"
+XHTML_DIV = f"{{{XHTML_NS}}}div"
+
+
+def _xhtml(element: etree._Element) -> str:
+    # The markup of xhtml Atom constructs is inline in a div, keep the content of the div as html.
+    div = deepcopy(element[0] if element[0].tag == XHTML_DIV else element)
+    for child in div.iter():
+        child.tag = etree.QName(child).localname
+    etree.cleanup_namespaces(div)
+    return "".join(
+        [div.text or ""]
+        + [etree.tostring(child, encoding="unicode", with_tail=True) for child in div]
+    ).strip()
+
+
+def _text(element: Optional[etree._Element]) -> Optional[str]:
+    if element is None:
+        return None
+    if len(element) and element.get("type") == "xhtml":
+        return _xhtml(element)
+    return "".join(element.itertext()).strip()
+
+
+def _media(element: etree._Element, tag: str) -> List[Dict[str, str]]:
+    # The media elements can be grouped in media:group elements.
+    return [dict(media.attrib) for media in element.iter(f"{{{MEDIA_NS}}}{tag}")]
+
+
+def _dates(entry: Dict[str, Any], published: Optional[str], updated: Optional[str]):
+    if published:
+        entry["published"] = published
+    # Like feedparser, fall back to the published date when there is no updated date.
+    if updated or published:
+        entry["updated"] = updated or published
+
+
+def _rss_link(item: etree._Element) -> Optional[str]:
+    link = _text(item.find("link"))
+    if link:
+        return link
+
+    # Like feedparser, use the permalink guid or the alternate atom:link when there is no link.
+    guid = item.find("guid")
+    if guid is not None and guid.get("isPermaLink", "true") == "true":
+        return _text(guid)
+
+    for atom_link in item.iterfind(f"{{{ATOM_NS}}}link"):
+        if atom_link.get("rel", "alternate") == "alternate":
+            return atom_link.get("href")
+
+    return None
+
+
+def _rss_item(item: etree._Element) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {}
+
+    title = _text(item.find("title"))
+    if title is not None:
+        entry["title"] = title
+
+    link = _rss_link(item)
+    if link:
+        entry["link"] = link
+
+    description = _text(item.find("description"))
+    if description is not None:
+        entry["summary"] = entry["description"] = description
+
+    content = _text(item.find(f"{{{CONTENT_NS}}}encoded"))
+    if content is not None:
+        entry["content"] = [{"value": content}]
+
+    _dates(
+        entry,
+        _text(item.find("pubDate")),
+        _text(item.find(f"{{{DC_NS}}}date"))
+        or _text(item.find(f"{{{ATOM_NS}}}updated")),
+    )
+
+    category = _text(item.find("category"))
+    if category is not None:
+        entry["category"] = category
+
+    entry["enclosures"] = [
+        {
+            "href": enclosure.get("url"),
+            "length": enclosure.get("length"),
+            "type": enclosure.get("type"),
+        }
+        for enclosure in item.iterfind("enclosure")
+    ]
+
+    return entry
+
+
+def _atom_entry(element: etree._Element) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {}
+
+    title = _text(element.find(f"{{{ATOM_NS}}}title"))
+    if title is not None:
+        entry["title"] = title
+
+    entry["enclosures"] = []
+    for link in element.iterfind(f"{{{ATOM_NS}}}link"):
+        rel = link.get("rel", "alternate")
+        if rel == "alternate" and "link" not in entry:
+            entry["link"] = link.get("href")
+        elif rel == "enclosure":
+            entry["enclosures"].append(
+                {
+                    "href": link.get("href"),
+                    "type": link.get("type"),
+                    "length": link.get("length"),
+                }
+            )
+
+    summary = _text(element.find(f"{{{ATOM_NS}}}summary"))
+    if summary is not None:
+        entry["summary"] = entry["description"] = summary
+
+    content = _text(element.find(f"{{{ATOM_NS}}}content"))
+    if content is not None:
+        entry["content"] = [{"value": content}]
+
+    _dates(
+        entry,
+        _text(element.find(f"{{{ATOM_NS}}}published")),
+        _text(element.find(f"{{{ATOM_NS}}}updated")),
+    )
+
+    category = element.find(f"{{{ATOM_NS}}}category")
+    if category is not None and category.get("term"):
+        entry["category"] = category.get("term")
+
+    return entry
+
+
+def _feed_info(element: etree._Element, is_atom: bool) -> Dict[str, Any]:
+    feed_info = {}
+    if is_atom:
+        fields = {
+            "title": f"{{{ATOM_NS}}}title",
+            "updated": f"{{{ATOM_NS}}}updated",
+            "published": f"{{{ATOM_NS}}}published",
+        }
+    else:
+        fields = {
+            "title": "title",
+            "updated": "lastBuildDate",
+            "published": "pubDate",
+        }
+
+    for field, tag in fields.items():
+        value = _text(element.find(tag))
+        if value:
+            feed_info[field] = value
+    if not is_atom and "updated" not in feed_info:
+        updated = _text(element.find(f"{{{DC_NS}}}date"))
+        if updated:
+            feed_info["updated"] = updated
+
+    return feed_info
+
+
+def _is_atom(root: etree._Element) -> bool:
+    if root.tag not in (ATOM_FEED, RSS):
+        raise ValueError(f"Unsupported feed format: {root.tag}")
+    return root.tag == ATOM_FEED
+
+
+def _entry(element: etree._Element, is_atom: bool) -> Dict[str, Any]:
+    entry = _atom_entry(element) if is_atom else _rss_item(element)
+    for field, tag in (("media_content", "content"), ("media_thumbnail", "thumbnail")):
+        media = _media(element, tag)
+        if media:
+            entry[field] = media
+    return entry
+
+
+def parse_feed(data: Union[bytes, str]) -> Dict[str, Any]:
+    """
+    Parses a well-formed RSS 2.0 or Atom feed with an incremental XML parser.
+
+    Only the fields used by the aggregation are extracted, with the names feedparser gives them: the feed
+    `title`, `updated` and `published`, and the entry `title`, `link`, `summary`/`description`, `content`,
+    `published`, `updated`, `category`, `media_content`, `media_thumbnail` and `enclosures`. The entries are
+    released as soon as they are read, so the parsed tree does not grow with the feed.
+
+    Args:
+        data (Union[bytes, str]): The body of the feed.
+
+    Returns:
+        Dict[str, Any]: The `feed` information and the `entries` of the feed.
+
+    Raises:
+        etree.XMLSyntaxError: If the feed is not well-formed XML.
+        ValueError: If the feed is neither RSS 2.0 nor Atom.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    feed_info: Dict[str, Any] = {}
+    entries: List[Dict[str, Any]] = []
+    is_atom = None
+
+    for event, element in etree.iterparse(
+        BytesIO(data),
+        events=("start", "end"),
+        resolve_entities=False,
+        no_network=True,
+    ):
+        if is_atom is None:
+            is_atom = _is_atom(element)
+        elif event != "end":
+            continue
+        elif element.tag == (ATOM_ENTRY if is_atom else RSS_ITEM):
+            entries.append(_entry(element, is_atom))
+            element.clear(keep_tail=True)
+        elif element.tag == (ATOM_FEED if is_atom else RSS_CHANNEL):
+            feed_info = _feed_info(element, is_atom)
+
+    return {"feed": feed_info, "entries": entries}
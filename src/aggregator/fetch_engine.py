@@ -0,0 +1,170 @@
+# Copyright (c) 2023 The Brave Authors. All rights reserved.
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://mozilla.org/MPL/2.0/. */
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+import structlog
+
+from config import get_config
+
+config = get_config()
+logger = structlog.getLogger(__name__)
+
+
+class FetchEngine:
+    """
+    Runs the network stages of the aggregation on a single event loop.
+
+    All the requests share one pooled async HTTP client and are bounded by a global limit of requests in flight
+    and by a limit per host, so thousands of requests can be in flight without overloading a single publisher.
+    Stages that rely on blocking libraries run in a thread executor, bounded by the same global limit.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+    ):
+        self.max_concurrency = max_concurrency or config.fetch_max_concurrency
+        self.per_host_concurrency = (
+            per_host_concurrency or config.fetch_per_host_concurrency
+        )
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(config.thread_pool_size)
+        self._client = None
+        self._semaphore = None
+        self._host_semaphores = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=config.http_pool_connections,
+                ),
+                timeout=config.request_timeout,
+                follow_redirects=True,
+                # The client is shared by all the requests, do not carry cookies from one request to the other.
+                cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            )
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so that it is bound to the event loop of the engine.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).hostname or ""
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(
+                config.http_host_pool_sizes.get(host, self.per_host_concurrency)
+            )
+        return self._host_semaphores[host]
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Sends a request with the shared client, waiting for a free slot of the global and the per host limits.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL to send the request to.
+            **kwargs: The arguments of `httpx.AsyncClient.request`.
+
+        Returns:
+            httpx.Response: The response, with its content read.
+        """
+        async with self.semaphore, self._host_semaphore(url):
+            return await self.client.request(method, url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(
+        self, method: str, url: str, **kwargs: Any
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Sends a request like `request`, without reading the content of the response.
+
+        The slots of the limits are held until the context exits, so the content read in the context counts
+        toward the limits.
+
+        Args:
+            method (str): The HTTP method of the request.
+            url (str): The URL to send the request to.
+            **kwargs: The arguments of `httpx.AsyncClient.stream`.
+
+        Yields:
+            httpx.Response: The response, its content can be read in chunks with `aiter_bytes`.
+        """
+        async with self.semaphore, self._host_semaphore(url):
+            async with self.client.stream(method, url, **kwargs) as response:
+                yield response
+
+    async def run_sync(self, func: Callable, *args: Any) -> Any:
+        """
+        Runs a blocking function in the thread executor of the engine.
+        """
+        async with self.semaphore:
+            return await self.loop.run_in_executor(self.executor, partial(func, *args))
+
+    async def _gather(self, coroutines: List) -> List:
+        results = await asyncio.gather(*coroutines, return_exceptions=True)
+        out_results = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Fetch task failed: {result}")
+                out_results.append(None)
+            else:
+                out_results.append(result)
+        return out_results
+
+    def map(self, func: Callable, items: Iterable) -> List:
+        """
+        Runs the coroutine function on all the items concurrently.
+
+        Args:
+            func (Callable): The coroutine function, called with each item and the engine as `engine`.
+            items (Iterable): The items to run the function on.
+
+        Returns:
+            list: The results in the order of the items, None for the items that raised an exception.
+        """
+        return self.loop.run_until_complete(
+            self._gather([func(item, engine=self) for item in items])
+        )
+
+    def map_sync(self, func: Callable, items: Iterable) -> List:
+        """
+        Runs a blocking function on all the items in the thread executor of the engine.
+
+        Args:
+            func (Callable): The blocking function, called with each item.
+            items (Iterable): The items to run the function on.
+
+        Returns:
+            list: The results in the order of the items, None for the items that raised an exception.
+        """
+        return self.loop.run_until_complete(
+            self._gather([self.run_sync(func, item) for item in items])
+        )
+
+    def close(self):
+        """
+        Closes the HTTP client, the thread executor and the event loop.
+        """
+        if self._client is not None:
+            self.loop.run_until_complete(self._client.aclose())
+            self._client = None
+        self.executor.shutdown(wait=True)
+        self.loop.close()
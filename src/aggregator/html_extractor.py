@@ -0,0 +1,178 @@
+# Copyright (c) 2023 The Brave Authors. All rights reserved.
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://mozilla.org/MPL/2.0/. */
+
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+from bs4.builder import HTMLTreeBuilder
+from bs4.dammit import EntitySubstitution
+
+# The text of these tags is not part of the text of the document, like for `BeautifulSoup.get_text`.
+NON_TEXT_TAGS = set(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+PRESERVE_WHITESPACE_TAGS = HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS
+VOID_TAGS = HTMLTreeBuilder.empty_element_tags
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+def _collapse_whitespace(data: str) -> str:
+    # Like BeautifulSoup, the strings of ASCII spaces are replaced with a single newline or space.
+    if data.strip(ASCII_SPACES):
+        return data
+    return "\n" if "\n" in data else " "
+
+
+class _HtmlExtractor(HTMLParser):
+    """
+    Collects the text and the `src` of the first `<img>` of a document in a single scan, with the same result as
+    `BeautifulSoup(html, features="html.parser")` without building the tree.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.text: List[str] = []
+        self.img: Optional[str] = None
+        self.data: List[str] = []
+        self.open_tags: List[str] = []
+        self.non_text_depth = 0
+        self.preserve_whitespace_depth = 0
+
+    def _end_data(self, is_text: bool = True):
+        # The data between two tags, comments or declarations is a string of the tree of BeautifulSoup.
+        if not self.data:
+            return
+
+        data = "".join(self.data)
+        self.data = []
+        if not self.preserve_whitespace_depth:
+            data = _collapse_whitespace(data)
+        if is_text:
+            self.text.append(data)
+
+    def _push_tag(self, tag):
+        self.open_tags.append(tag)
+        self.non_text_depth += tag in NON_TEXT_TAGS
+        self.preserve_whitespace_depth += tag in PRESERVE_WHITESPACE_TAGS
+
+    def _pop_tag(self):
+        tag = self.open_tags.pop()
+        self.non_text_depth -= tag in NON_TEXT_TAGS
+        self.preserve_whitespace_depth -= tag in PRESERVE_WHITESPACE_TAGS
+        return tag
+
+    def handle_starttag(self, tag, attrs):
+        self._end_data(not self.non_text_depth)
+        if tag == "img" and self.img is None:
+            attrs = dict(attrs)
+            if "src" in attrs:
+                self.img = attrs["src"] or ""
+
+        if tag not in VOID_TAGS:
+            self._push_tag(tag)
+
+    def handle_endtag(self, tag):
+        self._end_data(not self.non_text_depth)
+        # Close the tags up to the last open tag with this name, an end tag without an open tag is ignored.
+        if tag in self.open_tags:
+            while self._pop_tag() != tag:
+                pass
+
+    def handle_data(self, data):
+        self.data.append(data)
+
+    def handle_charref(self, name):
+        if name[0] in "xX":
+            code_point = int(name[1:], 16)
+        else:
+            code_point = int(name)
+
+        data = None
+        if code_point < 256:
+            # The numeric references below 256 are often windows-1252 code points instead of unicode ones.
+            try:
+                data = bytes([code_point]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(code_point)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.handle_data(character if character is not None else f"&{name}")
+
+    def _handle_non_text(self, data):
+        self._end_data(not self.non_text_depth)
+        self.handle_data(data)
+        self._end_data(is_text=False)
+
+    handle_comment = handle_decl = handle_pi = _handle_non_text
+
+    def unknown_decl(self, data):
+        if not data.upper().startswith("CDATA["):
+            self._handle_non_text(data)
+            return
+
+        self._end_data(not self.non_text_depth)
+        self.handle_data(data[len("CDATA[") :])
+        self._end_data()
+
+    def close(self):
+        super().close()
+        self._end_data(not self.non_text_depth)
+
+
+@lru_cache(maxsize=64)
+def extract_html(html: str) -> Tuple[str, Optional[str]]:
+    """
+    Extracts the text and the first image of an HTML document in a single scan.
+
+    The documents without markup nor character references are returned as they are, without parsing. The last
+    documents are cached, so that the description and the summary of an article, usually the same document, are
+    only scanned once.
+
+    Args:
+        html (str): The HTML document.
+
+    Returns:
+        Tuple[str, Optional[str]]: The text of the document, and the `src` of its first `<img>` with a `src`
+        attribute, or None if there is none.
+    """
+    if "<" not in html and "&" not in html:
+        return _collapse_whitespace(html) if html else html, None
+
+    extractor = _HtmlExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return "".join(extractor.text), extractor.img
+
+
+def html_to_text(html: str) -> str:
+    """
+    Gets the text of an HTML document, like `BeautifulSoup(html, features="html.parser").get_text()`.
+
+    Args:
+        html (str): The HTML document.
+
+    Returns:
+        str: The text of the document.
+    """
+    return extract_html(html)[0]
+
+
+def first_img_src(html: str) -> Optional[str]:
+    """
+    Gets the `src` of the first `<img>` of an HTML document with a `src` attribute.
+
+    Args:
+        html (str): The HTML document.
+
+    Returns:
+        Optional[str]: The `src` of the image, or None if the document has no image with a `src` attribute.
+    """
+    return extract_html(html)[1]
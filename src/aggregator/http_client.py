@@ -0,0 +1,71 @@
+# Copyright (c) 2023 The Brave Authors. All rights reserved.
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://mozilla.org/MPL/2.0/. */
+
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+import structlog
+from requests.adapters import HTTPAdapter
+
+from config import get_config
+
+config = get_config()
+logger = structlog.getLogger(__name__)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _create_session() -> requests.Session:
+    """
+    Creates a session with keep-alive connection pools for every host, using the configured pool size
+    or the per host override from `config.http_host_pool_sizes`.
+    """
+    session = requests.Session()
+    # The session is shared by all the requests of the process, do not carry cookies from one request to the other.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    adapter = HTTPAdapter(
+        pool_connections=config.http_pool_connections,
+        pool_maxsize=config.http_pool_maxsize,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    for host, pool_size in config.http_host_pool_sizes.items():
+        host_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount(f"http://{host}/", host_adapter)
+        session.mount(f"https://{host}/", host_adapter)
+
+    return session
+
+
+def get_session(name: str = "default") -> requests.Session:
+    """
+    Get the long-lived pooled session of the current process.
+
+    Sessions are created once per process (they are not shared with forked workers) and reused by every
+    network call, so connections to the same host are kept alive instead of paying a new TCP + TLS handshake.
+
+    Args:
+        name (str): The name of the session. Callers that alter the session (e.g. by installing response hooks)
+        use their own named session.
+
+    Returns:
+        requests.Session: The pooled session.
+    """
+    key = (os.getpid(), name)
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                logger.debug(f"Creating pooled HTTP session {name}")
+                session = _create_session()
+                _sessions[key] = session
+
+    return session
@@ -9,11 +9,12 @@ from urllib.parse import urlparse
 
 import metadata_parser
 import structlog
-from bs4 import BeautifulSoup as BS
 from fake_useragent import UserAgent
 from PIL import Image
 
 from aggregator import image_processor_sandboxed
+from aggregator.html_extractor import first_img_src
+from aggregator.http_client import get_session
 from config import get_config
 
 ua = UserAgent(
@@ -94,22 +95,13 @@ def get_article_img(article: Dict) -> str:  # noqa: C901
                 return image_url
 
     if "summary" in article:
-        soup = BS(article["summary"], features="html.parser")
-        image_tags = soup.find_all("img")
-        for img_tag in image_tags:
-            if "src" in img_tag.attrs:
-                image_url = img_tag["src"]
-                break
+        # The summary is usually also the description, whose scan is cached by `extract_html`.
+        image_url = first_img_src(article["summary"]) or ""
         if image_url:
             return image_url
 
     if "content" in article:
-        soup = BS(article["content"][0]["value"], features="html.parser")
-        image_tags = soup.find_all("img")
-        for img_tag in image_tags:
-            if "src" in img_tag.attrs:
-                image_url = img_tag["src"]
-                break
+        image_url = first_img_src(article["content"][0]["value"]) or ""
         if image_url:
             return image_url
 
@@ -138,6 +130,8 @@ def check_images_in_item(article_with_detail, _publishers):  # noqa: C901
                 search_head_only=True,
                 strategy=["page", "meta", "og", "dc"],
                 requests_timeout=config.request_timeout,
+                # metadata_parser installs its response hooks on the session, keep it apart from the others.
+                requests_session=get_session("metadata"),
             )
             og_image = page.get_metadata_link("image") or ""
         except Exception as e:
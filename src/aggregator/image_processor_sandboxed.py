@@ -8,7 +8,6 @@ import os
 import struct
 
 import boto3
-import requests
 import structlog
 from fake_useragent import UserAgent
 from wasmer import Instance, Module, Store, engine
@@ -93,17 +92,18 @@ def resize_and_pad_image(image_bytes, width, height, size, cache_path, quality=7
         return False
 
 
-def get_image_with_max_size(item, max_bytes=1000000):
+async def get_image_with_max_size_async(item, engine, max_bytes=1000000):
     """
-    Retrieves the content of a URL and checks if it exceeds a maximum size.
+    Retrieves the content of an image URL with the fetch engine and checks if it exceeds a maximum size.
 
     Args:
         item (dict): The URL to retrieve the content from.
+        engine (FetchEngine): The fetch engine to send the request with.
         max_bytes (int, optional): The maximum size in bytes allowed for the content. Defaults to 1000000.
 
     Returns:
-        tuple: A tuple containing the content of the response as bytes and a boolean indicating if the content
-        is larger than the maximum size.
+        tuple: A tuple containing the item, the content of the response as bytes and a boolean indicating if the
+        content is larger than the maximum size.
     """
     try:
         is_large = False
@@ -111,7 +111,8 @@ def get_image_with_max_size(item, max_bytes=1000000):
         if item.get("img").endswith(config.video_extensions):
             return item, "", False
 
-        response = requests.get(
+        response = await engine.request(
+            "GET",
             item.get("img"),
             timeout=config.request_timeout,
             headers={"User-Agent": ua.random, **config.default_headers},
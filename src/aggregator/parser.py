@@ -3,24 +3,24 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this file,
 # You can obtain one at https://mozilla.org/MPL/2.0/. */
 
+import hashlib
 import logging
 import math
 import warnings
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse, urlunparse
 
-import dateparser
 import feedparser
-import requests
 import structlog
-from better_profanity import profanity
 from fake_useragent import UserAgent
 from prometheus_client import CollectorRegistry, Gauge, multiprocess
 from requests import HTTPError
 
+from aggregator.fast_feed_parser import parse_feed
+from aggregator.fetch_engine import FetchEngine
 from config import get_config
-from utils import push_metrics_to_pushgateway, retry
+from utils import async_retry, push_metrics_to_pushgateway
 
 ua = UserAgent(
     browsers=["edge", "chrome", "firefox", "safari", "opera"],
@@ -41,10 +41,6 @@ warnings.filterwarnings(
 
 logger = structlog.getLogger(__name__)
 
-# adding custom bad words for profanity check
-custom_badwords = ["vibrators", "hedonistic"]
-profanity.add_censor_words(custom_badwords)
-
 registry = CollectorRegistry()
 multiprocess.MultiProcessCollector(registry)
 
@@ -65,81 +61,220 @@ PUBLISHER_URL_ERR_ALERT_NAME_METRIC = Gauge(
 )
 
 
-@retry(retries=2, delays=[10, 20])
-def get_with_max_size(
-    url: str, max_bytes: Optional[int] = config.max_content_size
-) -> bytes:
+def _request_headers(validators: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    headers = {"User-Agent": ua.random, **config.default_headers}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def _check_response(
+    response, max_bytes: Optional[int], validators: Optional[Dict[str, str]] = None
+) -> Optional[Dict[str, Any]]:
+    if validators and response.status_code == 304:
+        return {
+            "content": None,
+            "not_modified": True,
+            "etag": response.headers.get("ETag") or validators.get("etag"),
+            "last_modified": response.headers.get("Last-Modified")
+            or validators.get("last_modified"),
+        }
+
+    response.raise_for_status()
+
+    if response.status_code != 200:
+        raise HTTPError(f"HTTP error with status code {response.status_code}")
+
+    content_length = response.headers.get("Content-Length")
+    if max_bytes is not None and content_length and int(content_length) > max_bytes:
+        raise ValueError("Content-Length too large")
+
+    return None
+
+
+def _add_chunk(chunks: List[bytes], chunk: bytes, size: int, max_bytes: Optional[int]):
+    # The limit applies to the decoded body, a compressed body or one without a Content-Length can not bypass it.
+    size += len(chunk)
+    if max_bytes is not None and size > max_bytes:
+        raise ValueError("Content too large")
+    chunks.append(chunk)
+    return size
+
+
+def _response_data(response, content: bytes) -> Dict[str, Any]:
+    return {
+        "content": content,
+        "not_modified": False,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+async def _read_response_async(
+    response, max_bytes: Optional[int], validators: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    not_modified = _check_response(response, max_bytes, validators)
+    if not_modified:
+        return not_modified
+
+    chunks, size = [], 0
+    async for chunk in response.aiter_bytes(chunk_size=config.download_chunk_size):
+        size = _add_chunk(chunks, chunk, size, max_bytes)
+
+    return _response_data(response, b"".join(chunks))
+
+
+@async_retry(retries=2, delays=[10, 20])
+async def get_with_validators_async(
+    url: str,
+    max_bytes: Optional[int] = config.max_content_size,
+    validators: Optional[Dict[str, str]] = None,
+    engine: Optional[FetchEngine] = None,
+) -> Dict[str, Any]:
     """
-    Get the content of a URL, raising an exception if the content is too large.
+    Conditionally get the content of a URL with the fetch engine, using the stored ETag/Last-Modified validators.
 
     Args:
         url (str): The URL to get the content from.
         max_bytes (Optional[int], optional): The maximum size of the content in bytes. Default is 10MB.
+        validators (Optional[Dict[str, str]], optional): The `etag` and `last_modified` of the last download.
+        engine (FetchEngine): The fetch engine to send the request with.
 
     Returns:
-        bytes: The content of the URL.
+        Dict[str, Any]: The `content` of the URL (None when `not_modified` is set on a 304 response),
+        along with the `etag` and `last_modified` validators of the response.
 
     Raises:
         HTTPError: If there is an HTTP error with the URL.
         ValueError: If the content size exceeds the maximum size.
     """
-    headers = {"User-Agent": ua.random, **config.default_headers}
+    async with engine.stream(
+        "GET", url, timeout=config.request_timeout, headers=_request_headers(validators)
+    ) as response:
+        return await _read_response_async(response, max_bytes, validators)
 
-    with requests.get(url, timeout=config.request_timeout, headers=headers) as response:
-        response.raise_for_status()
 
-        if response.status_code != 200:
-            raise HTTPError(f"HTTP error with status code {response.status_code}")
+def _feed_error(feed: str, error: Exception):
+    logger.error(f"Failed to get [{error}]: {feed}")
+    prom_label = urlparse(feed).hostname
+    prom_label = prom_label.replace(".", "_")
+    push_metrics_to_pushgateway(
+        PUBLISHER_URL_ERR_ALERT_NAME_METRIC, 1, prom_label, registry
+    )
 
-        content_length = response.headers.get("Content-Length")
-        if max_bytes is not None and content_length and int(content_length) > max_bytes:
-            raise ValueError("Content-Length too large")
 
-        return response.content
+def _http_feed_url(feed: str) -> str:
+    u = urlparse(feed)
+    u = u._replace(scheme="http")
+    return urlunparse(u)
 
 
-def download_feed(feed: str, max_feed_size: int = 10000000) -> Optional[Dict[str, str]]:
+def feed_urls(feed: str, original_feed: Optional[str] = None) -> List[str]:
     """
-    Downloads a feed from the given URL.
+    Gets the URLs a feed is downloaded from, in the order they are tried.
+
+    Args:
+        feed: The URL of the feed.
+        original_feed: The original URL of the feed from the publisher, if any.
+
+    Returns:
+        The URL of the feed, its plain HTTP variant and the original URL of the feed, without duplicates.
+    """
+    urls = [feed, _http_feed_url(feed)]
+    if original_feed:
+        urls.append(original_feed)
+    return list(dict.fromkeys(urls))
+
+
+def _downloaded_feed(
+    feed: str, response: Dict[str, Any], validators: Optional[Dict[str, str]]
+) -> Dict[str, Any]:
+    if response["not_modified"]:
+        logger.debug(f"Feed not modified: {feed}")
+        return {"key": feed, "not_modified": True, "validators": validators}
+
+    data = response["content"]
+    new_validators = {
+        "etag": response["etag"],
+        "last_modified": response["last_modified"],
+        "content_hash": hashlib.sha256(data).hexdigest(),
+    }
+    if validators and validators.get("content_hash") == new_validators["content_hash"]:
+        logger.debug(f"Feed content unchanged: {feed}")
+        return {"key": feed, "not_modified": True, "validators": new_validators}
+
+    return {"feed_cache": data, "key": feed, "validators": new_validators}
+
+
+def _downloaded_from(
+    feed: str, url: str, response: Dict[str, Any], validators: Optional[Dict[str, str]]
+) -> Dict[str, Any]:
+    logger.debug(f"Downloaded feed: {url}")
+    result = _downloaded_feed(feed, response, validators)
+    result["url"] = url
+    return result
+
+
+async def download_feed_async(
+    feed: str,
+    engine: FetchEngine,
+    max_feed_size: int = 10000000,
+    validators: Optional[Dict[str, str]] = None,
+    urls: Optional[List[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Downloads a feed from the given URL with the fetch engine, falling back to the next URL of `urls` when a
+    download fails.
 
     Args:
         feed: The URL of the feed to download.
+        engine: The fetch engine to send the requests with.
         max_feed_size: The maximum size of the feed to download. Defaults to 10000000.
+        validators: The `etag`, `last_modified` and `content_hash` stored from the last download of the feed.
+        urls: The URLs to download the feed from, in order. Defaults to `feed_urls(feed)`.
 
     Returns:
-        A dictionary containing the downloaded feed data and the key of the feed.
+        A dictionary containing the downloaded feed data, the key of the feed, the `url` it was downloaded from
+        and its new validators.
+        If the feed did not change since the last download, `not_modified` is set and no feed data is returned.
         Returns None if there is an error while downloading the feed.
-
-    Raises:
-        ReadTimeout: If the download times out.
-        HTTPError: If there is an HTTP error while downloading the feed.
     """
-    try:
-        data = get_with_max_size(feed, max_feed_size)
-        logger.debug(f"Downloaded feed: {feed}")
-    except Exception:
-        # Failed to get feed. I will try plain HTTP.
+    error = None
+    for url in urls or feed_urls(feed):
         try:
-            u = urlparse(feed)
-            u = u._replace(scheme="http")
-            feed_url = urlunparse(u)
-            data = get_with_max_size(feed_url, max_feed_size)
-        except Exception as e:
-            logger.error(f"Failed to get [{e}]: {feed}")
-            prom_label = urlparse(feed).hostname
-            prom_label = prom_label.replace(".", "_")
-            push_metrics_to_pushgateway(
-                PUBLISHER_URL_ERR_ALERT_NAME_METRIC, 1, prom_label, registry
+            response = await get_with_validators_async(
+                url, max_feed_size, validators, engine=engine
             )
-            return None
+        except Exception as e:
+            # Failed to get the feed, try the next URL.
+            error = e
+            continue
+        return _downloaded_from(feed, url, response, validators)
 
-    return {"feed_cache": data, "key": feed}
+    _feed_error(feed, error)
+    return None
+
+
+def _parse_feed(data):
+    if config.fast_feed_parser:
+        try:
+            return parse_feed(data)
+        except Exception as e:
+            logger.debug(f"Fast feed parser failed [{e}], falling back to feedparser")
+
+    return feedparser.parse(data)
 
 
 def parse_rss(downloaded_feed):
     """
     Parses the downloaded RSS feed.
 
+    No request is sent while parsing, a feed without entries is downloaded again from its other URLs by the
+    download stage of the aggregation.
+
     Parameters:
         downloaded_feed (dict): A dictionary containing the downloaded feed, with the keys "key" and "feed_cache".
 
@@ -154,11 +289,8 @@ def parse_rss(downloaded_feed):
     url, data = downloaded_feed["key"], downloaded_feed["feed_cache"]
 
     try:
-        feed_cache = feedparser.parse(data)
+        feed_cache = _parse_feed(data)
         report["size_after_get"] = len(feed_cache["entries"])
-        if len(feed_cache["entries"]) == 0:
-            feed_cache = feedparser.parse(url)
-
         if len(feed_cache["entries"]) == 0:
             logger.info(f"Read 0 articles from {url}")
             raise Exception(f"Read 0 articles from {url}")
@@ -198,9 +330,7 @@ def score_entries(entries):
     out_entries = []
     variety_by_source = {}
     for entry in entries:
-        seconds_ago = (
-            datetime.utcnow() - dateparser.parse(entry["publish_time"])
-        ).total_seconds()
+        seconds_ago = (datetime.utcnow() - entry["publish_time"]).total_seconds()
         recency = math.log(seconds_ago) if seconds_ago > 0 else 0.1
         if entry["publisher_id"] in variety_by_source:
             last_variety = variety_by_source[entry["publisher_id"]]
@@ -0,0 +1,118 @@
+# Copyright (c) 2023 The Brave Authors. All rights reserved.
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://mozilla.org/MPL/2.0/. */
+
+import asyncio
+from typing import Any, Callable, Iterable, List, NamedTuple
+
+import structlog
+
+logger = structlog.getLogger(__name__)
+
+_DONE = object()
+
+
+class Stage(NamedTuple):
+    name: str
+    func: Callable
+    workers: int
+    fan_out: bool
+
+
+class Pipeline:
+    """
+    A chain of async stages connected by bounded queues.
+
+    Every item flows through the stages on its own: a stage starts working on the first item as soon as the
+    previous stage is done with it, instead of waiting for the whole previous stage. The bounded queues cap the
+    number of items held between two stages.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.stages: List[Stage] = []
+
+    def add_stage(
+        self, name: str, func: Callable, workers: int, fan_out: bool = False
+    ) -> "Pipeline":
+        """
+        Adds a stage at the end of the pipeline.
+
+        Args:
+            name (str): The name of the stage, used in the logs.
+            func (Callable): The coroutine function of the stage, called with each item. Items for which it
+            returns None are dropped.
+            workers (int): The number of items the stage works on concurrently, at least 1: the concurrency of
+            the config is 0 on single CPU machines.
+            fan_out (bool): Whether the function returns a list of items to pass to the next stage.
+
+        Returns:
+            Pipeline: The pipeline, to chain the calls.
+        """
+        self.stages.append(Stage(name, func, max(1, workers), fan_out))
+        return self
+
+    async def _worker(self, stage: Stage, in_queue, out_queue):
+        while True:
+            item = await in_queue.get()
+            if item is _DONE:
+                return
+
+            try:
+                result = await stage.func(item)
+            except Exception as e:
+                logger.error(f"Pipeline stage {stage.name} failed: {e}")
+                continue
+
+            if result is None:
+                continue
+            for out_item in result if stage.fan_out else [result]:
+                if out_item is not None:
+                    await out_queue.put(out_item)
+
+    async def _run_stage(self, stage: Stage, in_queue, out_queue, next_workers: int):
+        await asyncio.gather(
+            *[self._worker(stage, in_queue, out_queue) for _ in range(stage.workers)]
+        )
+        for _ in range(next_workers):
+            await out_queue.put(_DONE)
+
+    async def _feed(self, items: Iterable, queue, workers: int):
+        for item in items:
+            await queue.put(item)
+        for _ in range(workers):
+            await queue.put(_DONE)
+
+    async def _collect(self, queue, results: List[Any]):
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+            results.append(item)
+
+    async def run(self, items: Iterable) -> List[Any]:
+        """
+        Runs the items through all the stages.
+
+        Args:
+            items (Iterable): The items to feed to the first stage.
+
+        Returns:
+            list: The items that left the last stage, in the order they left it.
+        """
+        queues = [asyncio.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        results = []
+
+        tasks = [self._feed(items, queues[0], self.stages[0].workers)]
+        for index, stage in enumerate(self.stages):
+            next_workers = (
+                self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+            )
+            tasks.append(
+                self._run_stage(stage, queues[index], queues[index + 1], next_workers)
+            )
+        tasks.append(self._collect(queues[-1], results))
+
+        await asyncio.gather(*tasks)
+        return results
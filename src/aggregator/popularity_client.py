@@ -0,0 +1,215 @@
+# Copyright (c) 2023 The Brave Authors. All rights reserved.
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://mozilla.org/MPL/2.0/. */
+
+import asyncio
+from typing import Dict, List, Optional
+
+import orjson
+import structlog
+from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
+
+from aggregator.batcher import Batcher
+from aggregator.external_services import limited_request_async, popularity_score
+from aggregator.fetch_engine import FetchEngine
+from config import get_config
+from db_crud import get_popularity_scores, update_popularity_scores
+
+config = get_config()
+logger = structlog.getLogger(__name__)
+
+registry = CollectorRegistry()
+
+POPULARITY_CACHE_LOOKUPS_NAME = "popularity_cache_lookups"
+POPULARITY_CACHE_LOOKUPS_METRIC = Gauge(
+    POPULARITY_CACHE_LOOKUPS_NAME,
+    POPULARITY_CACHE_LOOKUPS_NAME,
+    registry=registry,
+    labelnames=["locale", "result"],
+)
+
+POPULARITY_CACHE_HIT_RATE_NAME = "popularity_cache_hit_rate"
+POPULARITY_CACHE_HIT_RATE_METRIC = Gauge(
+    POPULARITY_CACHE_HIT_RATE_NAME,
+    POPULARITY_CACHE_HIT_RATE_NAME,
+    registry=registry,
+    labelnames=["locale"],
+)
+
+
+class PopularityClient:
+    """
+    Gets the popularity scores of the articles of an aggregation.
+
+    The scores fetched less than `config.pop_score_cache_ttl` seconds ago, by this aggregation or a previous
+    one, are reused. The other URLs are sent to the popularity API in batches of `config.pop_score_batch_size`
+    URLs when `config.pop_score_batch_enabled` is set with a `config.bs_pop_batch_endpoint`, and one by one
+    otherwise.
+    """
+
+    def __init__(self, engine: FetchEngine, locale_name: str):
+        self.engine = engine
+        self.locale_name = locale_name
+        self.scores: Dict[str, float] = {}
+        # The scores fetched from the API by this aggregation, stored in the cache by `save`.
+        self.fetched_scores: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self._batcher = Batcher(
+            self._score_batch, config.pop_score_batch_size, config.pop_score_batch_delay
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    async def _fetch_score(self, url: str) -> Optional[float]:
+        try:
+            response = await limited_request_async(
+                self.engine,
+                "GET",
+                config.bs_pop_endpoint + url,
+                timeout=config.request_timeout,
+            )
+            return popularity_score(orjson.loads(response.content))
+        except Exception as e:
+            logger.error(f"Popularity request for {url} failed with error: {e}")
+            return None
+
+    async def _fetch_one_by_one(self, urls: List[str]) -> Dict[str, Optional[float]]:
+        scores = await asyncio.gather(*[self._fetch_score(url) for url in urls])
+        return dict(zip(urls, scores))
+
+    async def _fetch_batch(self, urls: List[str]) -> Dict[str, Optional[float]]:
+        """
+        Gets the scores of the URLs with a single request to `config.bs_pop_batch_endpoint`.
+
+        The contract of the endpoint is assumed: it is sent `{"urls": [...]}` and answers with an object keyed
+        by URL, whose values have the shape of the responses of `config.bs_pop_endpoint`. The URLs are fetched
+        one by one when the request fails.
+        """
+        try:
+            response = await limited_request_async(
+                self.engine,
+                "POST",
+                config.bs_pop_batch_endpoint,
+                json={"urls": urls},
+                timeout=config.request_timeout,
+            )
+            response.raise_for_status()
+            pop_responses = orjson.loads(response.content)
+            return {
+                url: popularity_score(pop_responses[url])
+                for url in urls
+                if url in pop_responses
+            }
+        except Exception as e:
+            logger.error(
+                f"Popularity batch request for {len(urls)} URLs failed with error: {e}"
+            )
+            return await self._fetch_one_by_one(urls)
+
+    async def _fetch_scores(self, urls: List[str]) -> Dict[str, Optional[float]]:
+        if not (config.pop_score_batch_enabled and config.bs_pop_batch_endpoint):
+            return await self._fetch_one_by_one(urls)
+
+        batch_size = config.pop_score_batch_size
+        results = await asyncio.gather(
+            *[
+                self._fetch_batch(urls[start : start + batch_size])
+                for start in range(0, len(urls), batch_size)
+            ]
+        )
+        return {url: score for result in results for url, score in result.items()}
+
+    async def score_articles(self, articles: List[dict]) -> List[dict]:
+        """
+        Gets the popularity scores of the articles.
+
+        Args:
+            articles (List[dict]): The articles, with their `url` and `url_hash`.
+
+        Returns:
+            List[dict]: The articles with their `pop_score`, 1.0 for the articles whose score could not be
+            fetched.
+        """
+        url_hashes = {
+            article["url_hash"]
+            for article in articles
+            if article["url_hash"] not in self.scores
+        }
+        if url_hashes:
+            self.scores.update(
+                await self.engine.run_sync(get_popularity_scores, list(url_hashes))
+            )
+
+        urls = {
+            article["url_hash"]: article["url"]
+            for article in articles
+            if article["url_hash"] not in self.scores
+        }
+        misses = sum(article["url_hash"] in urls for article in articles)
+        self.misses += misses
+        self.hits += len(articles) - misses
+
+        if urls:
+            fetched_scores = await self._fetch_scores(list(urls.values()))
+            for url_hash, url in urls.items():
+                if fetched_scores.get(url) is not None:
+                    self.scores[url_hash] = fetched_scores[url]
+                    self.fetched_scores[url_hash] = fetched_scores[url]
+
+        return [
+            {**article, "pop_score": self.scores.get(article["url_hash"], 1.0)}
+            for article in articles
+        ]
+
+    async def _score_batch(self, articles: List[dict]) -> List[dict]:
+        try:
+            return await self.score_articles(articles)
+        except Exception as e:
+            logger.error(
+                f"Failed to get the popularity scores of {len(articles)} articles: {e}"
+            )
+            return [{**article, "pop_score": 1.0} for article in articles]
+
+    async def score_article(self, article: dict) -> dict:
+        """
+        Gets the popularity score of an article, in a batch with the articles requested before
+        `config.pop_score_batch_delay` seconds have passed or `config.pop_score_batch_size` articles are waiting.
+
+        Args:
+            article (dict): The article, with its `url` and `url_hash`.
+
+        Returns:
+            dict: The article with its `pop_score`.
+        """
+        return await self._batcher.submit(article)
+
+    def save(self):
+        """
+        Stores the scores fetched by the aggregation in the cache and reports the hit rate of the cache.
+        """
+        update_popularity_scores(self.fetched_scores)
+        self.fetched_scores = {}
+
+        logger.info(
+            f"Popularity score cache hit rate: {self.hit_rate:.1%} "
+            f"({self.hits} hits, {self.misses} misses)"
+        )
+        POPULARITY_CACHE_LOOKUPS_METRIC.labels(self.locale_name, "hit").set(self.hits)
+        POPULARITY_CACHE_LOOKUPS_METRIC.labels(self.locale_name, "miss").set(
+            self.misses
+        )
+        POPULARITY_CACHE_HIT_RATE_METRIC.labels(self.locale_name).set(self.hit_rate)
+        if config.prom_pushgateway_url:
+            try:
+                push_to_gateway(
+                    config.prom_pushgateway_url,
+                    job="news-aggregator",
+                    registry=registry,
+                )
+            except Exception as e:
+                logger.error(f"Failed to push metrics: {e}")
@@ -9,13 +9,10 @@ from datetime import datetime, timedelta
 from urllib.parse import quote, urljoin, urlparse, urlunparse
 
 import bleach
-import dateparser
 import pytz
 import requests
 import structlog
 import unshortenit
-from better_profanity import profanity
-from bs4 import BeautifulSoup as BS
 from fake_useragent import UserAgent
 from requests.exceptions import (
     ConnectTimeout,
@@ -25,7 +22,11 @@ from requests.exceptions import (
     TooManyRedirects,
 )
 
+from aggregator.date_parser import parse_date
+from aggregator.html_extractor import html_to_text
+from aggregator.http_client import get_session
 from aggregator.image_fetcher import get_article_img
+from aggregator.profanity_filter import load_profanity_matcher
 from config import get_config
 
 logger = structlog.getLogger(__name__)
@@ -36,6 +37,14 @@ ua = UserAgent(
     os=["windows", "macos", "linux"],
     platforms=["pc"],
 )
+unshortener = unshortenit.UnshortenIt(
+    default_timeout=config.request_timeout,
+    default_headers={"User-Agent": ua.random},
+)
+# Built once at import, so that the workers of the process pool share the compiled matcher.
+profanity_matcher = load_profanity_matcher(
+    str(config.sources_file).replace("sources.", ""), config.profanity_wordlists_dir
+)
 
 
 def process_articles(article, _publisher, feed_info):  # noqa: C901
@@ -58,11 +67,11 @@ def process_articles(article, _publisher, feed_info):  # noqa: C901
         # No title. Skip.
         return None
 
-    out_article["title"] = BS(article["title"], features="html.parser").get_text()
+    out_article["title"] = html_to_text(article["title"])
     out_article["title"] = html.unescape(out_article["title"])
 
     # Filter the offensive articles
-    if profanity.contains_profanity(out_article.get("title").lower()):
+    if profanity_matcher.contains_profanity(out_article.get("title").lower()):
         return None
 
     # Process article URL
@@ -79,13 +88,21 @@ def process_articles(article, _publisher, feed_info):  # noqa: C901
 
     # Process published time
     if article.get("updated"):
-        out_article["publish_time"] = dateparser.parse(article.get("updated"))
+        out_article["publish_time"] = parse_date(
+            article["updated"], article.get("updated_parsed")
+        )
     elif article.get("published"):
-        out_article["publish_time"] = dateparser.parse(article.get("published"))
+        out_article["publish_time"] = parse_date(
+            article["published"], article.get("published_parsed")
+        )
     elif feed_info.get("updated"):
-        out_article["publish_time"] = dateparser.parse(feed_info.get("updated"))
+        out_article["publish_time"] = parse_date(
+            feed_info["updated"], feed_info.get("updated_parsed")
+        )
     elif feed_info.get("published"):
-        out_article["publish_time"] = dateparser.parse(feed_info.get("published"))
+        out_article["publish_time"] = parse_date(
+            feed_info["published"], feed_info.get("published_parsed")
+        )
     else:
         return None  # skip (no update field)
 
@@ -105,8 +122,9 @@ def process_articles(article, _publisher, feed_info):  # noqa: C901
         if out_article["publish_time"] < (now_utc - timedelta(days=60)):
             return None  # skip (newer than now() or older than 1 month)
 
-    out_article["publish_time"] = out_article["publish_time"].strftime(
-        "%Y-%m-%d %H:%M:%S"
+    # Like the stored articles, the publish time is a naive UTC datetime until the feed is written.
+    out_article["publish_time"] = out_article["publish_time"].replace(
+        tzinfo=None, microsecond=0
     )
 
     try:
@@ -128,9 +146,7 @@ def process_articles(article, _publisher, feed_info):  # noqa: C901
     # Add some fields
     out_article["category"] = _publisher.get("category")
     if article.get("description"):
-        out_article["description"] = BS(
-            article["description"], features="html.parser"
-        ).get_text()
+        out_article["description"] = html_to_text(article["description"])
     else:
         out_article["description"] = ""
 
@@ -148,6 +164,72 @@ def process_articles(article, _publisher, feed_info):  # noqa: C901
     return out_article
 
 
+def unshorten(link):
+    """
+    Resolves the final URL of a link. Links of the shorteners known to `unshortenit` are resolved by their
+    module, every other link follows its redirects through the shared pooled session.
+
+    Args:
+        link (str): The link to resolve.
+
+    Returns:
+        str: The final URL of the link.
+    """
+    for module in unshortener.modules.values():
+        if module.is_match(link):
+            return module.unshorten(link)
+
+    with get_session().get(
+        link, timeout=config.request_timeout, headers={"User-Agent": ua.random}
+    ) as response:
+        return response.url
+
+
+def is_publisher_link(link, destination_domains):
+    """
+    Checks if a link is an HTTPS link of a publisher domain, which is not resolved as it is not a short link.
+
+    Args:
+        link (str): The link of an article.
+        destination_domains (set): The domains of the publishers.
+
+    Returns:
+        bool: True if the host of the link is a publisher domain or one of its subdomains.
+    """
+    parts = urlparse(link)
+    if parts.scheme != "https" or not parts.hostname:
+        return False
+
+    labels = parts.hostname.split(".")
+    return any(
+        ".".join(labels[index:]) in destination_domains
+        for index in range(len(labels) - 1)
+    )
+
+
+def set_article_url(out_article, url):
+    """
+    Sets the final URL of an article, and its hash, in place of its link.
+
+    Args:
+        out_article (dict): The output article.
+        url (str): The final URL of the article.
+
+    Returns:
+        dict: The modified output article.
+    """
+    out_article.pop("link", None)
+
+    url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    parts = urlparse(url)
+    parts = parts._replace(path=quote(parts.path))
+    encoded_url = urlunparse(parts)
+    out_article["url"] = encoded_url
+    out_article["url_hash"] = url_hash
+
+    return out_article
+
+
 def unshorten_url(out_article):
     """
     Unshortens a URL in the given output article.
@@ -158,14 +240,8 @@ def unshorten_url(out_article):
     Returns:
         dict or None: The modified output article with the unshortened URL, or None if unshortening failed.
     """
-    unshortener = unshortenit.UnshortenIt(
-        default_timeout=config.request_timeout,
-        default_headers={"User-Agent": ua.random},
-    )
-
     try:
-        out_article["url"] = unshortener.unshorten(out_article["link"])
-        out_article.pop("link", None)
+        url = unshorten(out_article["link"])
     except (
         requests.exceptions.ConnectionError,
         ConnectTimeout,
@@ -179,14 +255,7 @@ def unshorten_url(out_article):
         logger.error(f"unshortener failed [{out_article.get('link')}]: {e}")
         return None  # skip (unshortener failed)
 
-    url_hash = hashlib.sha256(out_article["url"].encode("utf-8")).hexdigest()
-    parts = urlparse(out_article["url"])
-    parts = parts._replace(path=quote(parts.path))
-    encoded_url = urlunparse(parts)
-    out_article["url"] = encoded_url
-    out_article["url_hash"] = url_hash
-
-    return out_article
+    return set_article_url(out_article, url)
 
 
 def scrub_html(feed: dict):
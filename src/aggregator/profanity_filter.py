@@ -0,0 +1,150 @@
+# Copyright (c) 2023 The Brave Authors. All rights reserved.
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this file,
+# You can obtain one at https://mozilla.org/MPL/2.0/. */
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import structlog
+from better_profanity import profanity
+from better_profanity.constants import ALLOWED_CHARACTERS
+from better_profanity.utils import get_complete_path_of_file, read_wordlist
+
+logger = structlog.getLogger(__name__)
+
+# adding custom bad words for profanity check
+custom_badwords = ["vibrators", "hedonistic"]
+
+default_wordlist_file = get_complete_path_of_file("profanity_wordlist.txt")
+
+WORD_PATTERN = re.compile(
+    "[" + "".join(re.escape(char) for char in sorted(ALLOWED_CHARACTERS)) + "]+"
+)
+
+
+def _char_pattern(char: str) -> str:
+    variants = profanity.CHARS_MAPPING.get(char, (char,))
+    if len(variants) == 1:
+        return re.escape(char)
+    return "[" + "".join(re.escape(variant) for variant in variants) + "]"
+
+
+def _trie_pattern(trie: Dict[str, dict]) -> str:
+    branches = [
+        _char_pattern(char) + _trie_pattern(children)
+        for char, children in sorted(trie.items())
+        if char
+    ]
+    if not branches:
+        return ""
+
+    pattern = "(?:" + "|".join(branches) + ")"
+    # The words ending here are a prefix of the longer words of the branches.
+    return pattern + "?" if "" in trie else pattern
+
+
+class ProfanityMatcher:
+    """
+    Checks texts for profanity with the same result as `better_profanity.profanity.contains_profanity`, with
+    the leetspeak variants of the words compiled once into a regular expression trie instead of compared to every
+    word of the wordlist for every word of the text.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        trie: Dict[str, dict] = {}
+        self.max_word_length = 0
+        self.max_combinations = 1
+        for word in {word.lower() for word in words}:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[""] = {}
+
+            self.max_word_length = max(self.max_word_length, len(word))
+            # Like better_profanity, the words with separators are matched across that many words of the text.
+            self.max_combinations = max(
+                self.max_combinations,
+                sum(char not in ALLOWED_CHARACTERS for char in word),
+            )
+
+        self.pattern = re.compile(_trie_pattern(trie))
+
+    def _is_word(self, word: str) -> bool:
+        return self.pattern.fullmatch(word) is not None
+
+    def _next_words(
+        self, text: str, words: List[re.Match], index: int
+    ) -> List[Tuple[str, str]]:
+        # The words and the words with their separators following the word at `index`, a word starting at the
+        # last character of the text is ignored like by better_profanity.
+        next_words = []
+        for next_index in range(index + 1, index + 1 + self.max_combinations):
+            if next_index >= len(words) or words[next_index].start() >= len(text) - 1:
+                break
+            separator = text[words[next_index - 1].end() : words[next_index].start()]
+            next_words.append((words[next_index].group(), separator))
+        return next_words
+
+    def _forms_word(self, word: str, next_words: List[Tuple[str, str]]) -> bool:
+        full_word = full_word_with_separators = word
+        for next_word, separator in next_words:
+            full_word += next_word.lower()
+            full_word_with_separators += separator.lower() + next_word.lower()
+            if len(full_word) > self.max_word_length:
+                break
+            if self._is_word(full_word) or self._is_word(full_word_with_separators):
+                return True
+        return False
+
+    def contains_profanity(self, text: str) -> bool:
+        """
+        Checks if a text contains profanity.
+
+        Args:
+            text (str): The text to check.
+
+        Returns:
+            bool: True if a word of the text, or a combination of the word with the next words of the text, is a
+            word of the wordlist.
+        """
+        words = list(WORD_PATTERN.finditer(text))
+        if not words or words[0].start() >= len(text) - 1:
+            return False
+
+        for index, match in enumerate(words):
+            word = match.group().lower()
+            # The last word of the text is not combined with the next words.
+            if match.end() < len(text) and self._forms_word(
+                word, self._next_words(text, words, index)
+            ):
+                return True
+            if self._is_word(word):
+                return True
+
+        return False
+
+
+def load_profanity_matcher(
+    locale: str, wordlists_dir: Optional[Path] = None
+) -> ProfanityMatcher:
+    """
+    Builds the profanity matcher of a locale.
+
+    Args:
+        locale (str): The locale of the feeds.
+        wordlists_dir (Optional[Path]): The directory of the wordlists of the locales, the words of
+            `<locale>.txt` are checked in addition to the default wordlist.
+
+    Returns:
+        ProfanityMatcher: The profanity matcher of the locale.
+    """
+    words = list(read_wordlist(default_wordlist_file)) + custom_badwords
+
+    locale_wordlist_file = wordlists_dir and Path(wordlists_dir) / f"{locale}.txt"
+    if locale_wordlist_file and locale_wordlist_file.exists():
+        logger.info(f"Loading the profanity wordlist {locale_wordlist_file}")
+        words += list(read_wordlist(locale_wordlist_file))
+
+    return ProfanityMatcher(words)
@@ -49,6 +49,7 @@ feed_include_keys = {
     "feed_url": True,
     "site_url": True,
     "destination_domains": True,
+    "original_feed": True,
 }
 
 
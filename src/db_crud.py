@@ -1,10 +1,27 @@
+import base64
+import binascii
 import json
 import re
-from copy import deepcopy
-from datetime import datetime, time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
 
 import structlog
-from sqlalchemy import and_, func
+from sqlalchemy import (
+    ARRAY,
+    Boolean,
+    String,
+    and_,
+    any_,
+    case,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import joinedload
 
 from config import get_config
 from csv_to_json import csv_to_dict_db
@@ -12,7 +29,9 @@ from db.tables.aggregation_stats_entity import AggregationStatsEntity
 from db.tables.article_cache_record_entity import ArticleCacheRecordEntity
 from db.tables.articles_entity import ArticleEntity
 from db.tables.base import feed_locale_channel
+from db.tables.cache_hit_stats_entity import CacheHitStatsEntity
 from db.tables.channel_entity import ChannelEntity
+from db.tables.channel_prediction_entity import ChannelPredictionEntity
 from db.tables.external_article_classification_entity import (
     ExternalArticleClassificationEntity,
 )
@@ -20,7 +39,9 @@ from db.tables.feed_entity import FeedEntity
 from db.tables.feed_locales_entity import FeedLocaleEntity
 from db.tables.feed_update_record_entity import FeedUpdateRecordEntity
 from db.tables.locales_entity import LocaleEntity
+from db.tables.popularity_score_entity import PopularityScoreEntity
 from db.tables.publsiher_entity import PublisherEntity
+from db.tables.unshortened_url_entity import UnshortenedUrlEntity
 
 config = get_config()
 logger = structlog.getLogger(__name__)
@@ -210,97 +231,144 @@ def insert_or_update_all_publishers():
         logger.error(f"Error Connecting to database: {e}")
 
 
+def _publisher_feeds_query(publisher_url):
+    """
+    Build the query of the feeds of a publisher, one row per feed locale with the names of its channels.
+
+    Args:
+        publisher_url (str): The url of the publisher.
+
+    Returns:
+        Select: The query, it returns one row without locale for the feeds without locales.
+    """
+    channels = func.array_remove(
+        func.array_agg(ChannelEntity.name), literal(None, type_=String)
+    )
+
+    return (
+        select(
+            PublisherEntity.url.label("site_url"),
+            PublisherEntity.favicon_url,
+            PublisherEntity.cover_url,
+            PublisherEntity.background_color,
+            PublisherEntity.score,
+            FeedEntity.id.label("feed_id"),
+            FeedEntity.name,
+            FeedEntity.url,
+            FeedEntity.category,
+            FeedEntity.enabled,
+            FeedEntity.url_hash,
+            LocaleEntity.locale,
+            FeedLocaleEntity.rank,
+            channels.label("channels"),
+        )
+        .join(FeedEntity, FeedEntity.publisher_id == PublisherEntity.id)
+        .outerjoin(FeedLocaleEntity, FeedLocaleEntity.feed_id == FeedEntity.id)
+        .outerjoin(LocaleEntity, LocaleEntity.id == FeedLocaleEntity.locale_id)
+        .outerjoin(
+            feed_locale_channel,
+            feed_locale_channel.c.feed_locale_id == FeedLocaleEntity.id,
+        )
+        .outerjoin(ChannelEntity, ChannelEntity.id == feed_locale_channel.c.channel_id)
+        .where(PublisherEntity.url == publisher_url)
+        .group_by(
+            PublisherEntity.id,
+            FeedEntity.id,
+            FeedLocaleEntity.id,
+            LocaleEntity.locale,
+        )
+        .order_by(FeedEntity.id, FeedLocaleEntity.id)
+    )
+
+
+def _publisher_feeds_data(rows):
+    data = {}
+    for row in rows:
+        if row.feed_id not in data:
+            data[row.feed_id] = {
+                "enabled": row.enabled,
+                "site_url": row.site_url,
+                "feed_url": row.url,
+                "category": row.category,
+                "favicon_url": row.favicon_url,
+                "cover_url": row.cover_url,
+                "background_color": row.background_color,
+                "score": row.score,
+                "publisher_id": row.url_hash,
+                "locales": [],
+                "publisher_name": row.name,
+            }
+
+        if row.locale is not None:
+            data[row.feed_id]["locales"].append(
+                {"locale": row.locale, "channels": row.channels, "rank": row.rank}
+            )
+
+    return list(data.values())
+
+
 def get_publisher_with_locale(publisher_url):
     """
     Get a publisher from the database
     """
     try:
         with config.get_db_session() as session:
-            data = []
-            publisher = (
-                session.query(PublisherEntity).filter_by(url=publisher_url).first()
-            )
-            if publisher:
-                publisher_data = {
-                    "enabled": publisher.enabled,
-                    "site_url": publisher.url,
-                    "feed_url": "",
-                    "category": "",
-                    "favicon_url": publisher.favicon_url,
-                    "cover_url": publisher.cover_url,
-                    "background_color": publisher.background_color,
-                    "score": publisher.score,
-                    "publisher_id": "",
-                    "locales": [],
-                }
-
-                feeds = (
-                    session.query(FeedEntity).filter_by(publisher_id=publisher.id).all()
-                )
-                for feed in feeds:
-                    feed_publisher_data = deepcopy(publisher_data)
-                    feed_publisher_data["publisher_name"] = feed.name
-                    feed_publisher_data["feed_url"] = feed.url
-                    feed_publisher_data["category"] = feed.category
-                    feed_publisher_data["enabled"] = feed.enabled
-                    feed_publisher_data["publisher_id"] = feed.url_hash
-
-                    for feed_locale in feed.locales:
-                        locale_data = {
-                            "locale": feed_locale.locale.locale,
-                            "channels": [
-                                channel.name for channel in feed_locale.channels
-                            ],
-                            "rank": feed_locale.rank,
-                        }
-                        feed_publisher_data["locales"].append(locale_data)
-
-                    data.append(feed_publisher_data)
+            rows = session.execute(_publisher_feeds_query(publisher_url)).all()
 
-            return data
+            return _publisher_feeds_data(rows)
     except Exception as e:
         logger.error(f"Error Connecting to database: {e}")
         return []
 
 
+def _publishers_based_on_locale_query(locale):
+    """
+    Build the query of the feeds of a locale with their publisher and the names of their channels in the locale.
+
+    Args:
+        locale (str): The locale of the feeds.
+
+    Returns:
+        Select: The query, it returns one row per feed.
+    """
+    channels = func.array_remove(
+        func.array_agg(ChannelEntity.name.distinct()), literal(None, type_=String)
+    )
+
+    return (
+        select(
+            PublisherEntity.enabled,
+            FeedEntity.name.label("publisher_name"),
+            PublisherEntity.url.label("site_url"),
+            FeedEntity.url.label("feed_url"),
+            FeedEntity.category,
+            PublisherEntity.favicon_url,
+            PublisherEntity.cover_url,
+            PublisherEntity.background_color,
+            PublisherEntity.score,
+            FeedEntity.url_hash.label("publisher_id"),
+            channels.label("channels"),
+        )
+        .join(FeedLocaleEntity, FeedLocaleEntity.feed_id == FeedEntity.id)
+        .join(LocaleEntity, LocaleEntity.id == FeedLocaleEntity.locale_id)
+        .join(PublisherEntity, PublisherEntity.id == FeedEntity.publisher_id)
+        .outerjoin(
+            feed_locale_channel,
+            feed_locale_channel.c.feed_locale_id == FeedLocaleEntity.id,
+        )
+        .outerjoin(ChannelEntity, ChannelEntity.id == feed_locale_channel.c.channel_id)
+        .where(LocaleEntity.locale == locale)
+        .group_by(FeedEntity.id, PublisherEntity.id)
+    )
+
+
 def get_publishers_based_on_locale(locale):
     data = []
     try:
         with config.get_db_session() as session:
-            feeds = (
-                session.query(FeedEntity)
-                .filter(
-                    FeedEntity.locales.any(FeedLocaleEntity.locale.has(locale=locale))
-                )
-                .all()
-            )
-
-            for feed in feeds:
-                channels = []
-                for feed_locale in [
-                    locale_model
-                    for locale_model in feed.locales
-                    if locale_model.locale.name == locale
-                ]:
-                    channels = list(
-                        set([channel.name for channel in feed_locale.channels])
-                    )
+            rows = session.execute(_publishers_based_on_locale_query(locale))
 
-                publisher_data = {
-                    "enabled": feed.publisher.enabled,
-                    "publisher_name": feed.publisher.name,
-                    "site_url": feed.publisher.url,
-                    "feed_url": feed.url,
-                    "category": feed.category,
-                    "favicon_url": feed.publisher.favicon_url,
-                    "cover_url": feed.publisher.cover_url,
-                    "background_color": feed.publisher.background_color,
-                    "score": feed.publisher.score,
-                    "publisher_id": feed.url_hash,
-                    "channels": list(set(channels)),
-                }
-
-                data.append(publisher_data)
+            data = [dict(row) for row in rows.mappings()]
 
             return data
     except Exception as e:
@@ -389,6 +457,48 @@ def insert_article(article, locale_name, aggregation_id, db_session=None):
         logger.error(f"Error Connecting to database: {e}")
 
 
+def _article_data(article, channels):
+    return {
+        "title": article.title,
+        "publish_time": article.publish_time,
+        "img": article.img,
+        "category": article.category,
+        "description": article.description,
+        "content_type": article.content_type,
+        "publisher_id": article.feed.url_hash,
+        "publisher_name": article.feed.name,
+        "channels": channels,
+        "creative_instance_id": article.creative_instance_id,
+        "url": article.url,
+        "url_hash": article.url_hash,
+        "pop_score": article.pop_score,
+        "padded_img": article.padded_img,
+        "score": article.score,
+    }
+
+
+def _get_feed_channels(session, feed_url_hashes, locale_name):
+    feed_channels = defaultdict(set)
+    for url_hash, channel_name in (
+        session.query(FeedEntity.url_hash, ChannelEntity.name)
+        .join(FeedLocaleEntity, FeedLocaleEntity.feed_id == FeedEntity.id)
+        .join(LocaleEntity, FeedLocaleEntity.locale_id == LocaleEntity.id)
+        .join(
+            feed_locale_channel,
+            FeedLocaleEntity.id == feed_locale_channel.c.feed_locale_id,
+        )
+        .join(ChannelEntity, feed_locale_channel.c.channel_id == ChannelEntity.id)
+        .filter(
+            FeedEntity.url_hash.in_(feed_url_hashes),
+            LocaleEntity.locale == locale_name,
+        )
+        .all()
+    ):
+        feed_channels[url_hash].add(channel_name)
+
+    return feed_channels
+
+
 def get_article(url_hash, locale_name, db_session=None):
     try:
         with db_session or config.get_db_session() as session:
@@ -407,25 +517,7 @@ def get_article(url_hash, locale_name, db_session=None):
                     )
 
                 if article.img:
-                    article_data = {
-                        "title": article.title,
-                        "publish_time": article.publish_time.strftime(
-                            "%Y-%m-%d %H:%M:%S"
-                        ),
-                        "img": article.img,
-                        "category": article.category,
-                        "description": article.description,
-                        "content_type": article.content_type,
-                        "publisher_id": article.feed.url_hash,
-                        "publisher_name": article.feed.name,
-                        "channels": channels,
-                        "creative_instance_id": article.creative_instance_id,
-                        "url": article.url,
-                        "url_hash": article.url_hash,
-                        "pop_score": article.pop_score,
-                        "padded_img": article.padded_img,
-                        "score": article.score,
-                    }
+                    article_data = _article_data(article, channels)
 
                     locale = (
                         session.query(LocaleEntity)
@@ -454,6 +546,76 @@ def get_article(url_hash, locale_name, db_session=None):
         return None
 
 
+def get_articles_by_url_hashes(url_hashes, locale_name, db_session=None):
+    """
+    Bulk version of `get_article`: get the stored articles of the locale with an image among the given
+    url_hashes, and increment the cache hits of their cache records.
+
+    Args:
+        url_hashes (list): The url_hashes of the articles to look up.
+        locale_name (str): The locale of the articles.
+        db_session (Session, optional): The database session to use.
+
+    Returns:
+        dict: The article data, with its channels in the locale, keyed by the article url_hash.
+    """
+    if not url_hashes:
+        return {}
+
+    try:
+        with db_session or config.get_db_session() as session:
+            articles = (
+                session.query(ArticleEntity)
+                .join(FeedEntity, ArticleEntity.feed_id == FeedEntity.id)
+                .join(FeedLocaleEntity, FeedLocaleEntity.feed_id == FeedEntity.id)
+                .join(LocaleEntity, FeedLocaleEntity.locale_id == LocaleEntity.id)
+                .filter(
+                    ArticleEntity.url_hash
+                    == any_(literal(list(url_hashes), type_=ARRAY(String))),
+                    ArticleEntity.img != "",
+                    LocaleEntity.locale == locale_name,
+                )
+                .options(joinedload(ArticleEntity.feed))
+                .all()
+            )
+            if not articles:
+                return {}
+
+            feed_channels = _get_feed_channels(
+                session,
+                list({article.feed.url_hash for article in articles}),
+                locale_name,
+            )
+            data = {
+                article.url_hash: _article_data(
+                    article, list(feed_channels[article.feed.url_hash])
+                )
+                for article in articles
+            }
+
+            session.query(ArticleCacheRecordEntity).filter(
+                ArticleCacheRecordEntity.article_id.in_(
+                    [article.id for article in articles]
+                ),
+                ArticleCacheRecordEntity.locale_id
+                == session.query(LocaleEntity.id)
+                .filter(LocaleEntity.locale == locale_name)
+                .scalar_subquery(),
+            ).update(
+                {
+                    ArticleCacheRecordEntity.cache_hit: ArticleCacheRecordEntity.cache_hit
+                    + 1
+                },
+                synchronize_session=False,
+            )
+            session.commit()
+
+            return data
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return {}
+
+
 def update_or_insert_article(article_data, locale, aggregation_id, db_session=None):
     logger.info(f"update_or_insert_article")
     try:
@@ -485,6 +647,249 @@ def update_or_insert_article(article_data, locale, aggregation_id, db_session=No
         return None
 
 
+def _article_row(article, feed_id, aggregation_id):
+    return {
+        "title": article.get("title"),
+        "publish_time": article.get("publish_time"),
+        "img": article.get("img") or "",
+        "category": article.get("category"),
+        "description": article.get("description"),
+        "content_type": article.get("content_type"),
+        "creative_instance_id": article.get("creative_instance_id") or "",
+        "url": article.get("url"),
+        "url_hash": article.get("url_hash"),
+        "pop_score": article.get("pop_score") or 0.0,
+        "padded_img": article.get("padded_img") or "",
+        "score": article.get("score", 0),
+        "feed_id": feed_id,
+        "aggregation_id": aggregation_id,
+    }
+
+
+def _update_cache_hit_stats(
+    session, locale_id, day, new_article_feed_ids, cache_hit_count
+):
+    """
+    Add the articles created by an aggregation of a locale to the cache hit stats of the day.
+
+    Args:
+        session (Session): The database session, the stats are updated in its transaction.
+        locale_id (int): The id of the locale of the aggregation.
+        day (date): The day of the stats.
+        new_article_feed_ids (list): The feed ids of the articles created, one per article.
+        cache_hit_count (int): The number of articles created that day which got their cache record of the
+            locale.
+    """
+    if not new_article_feed_ids and not cache_hit_count:
+        return
+
+    feed_article_counts = Counter(new_article_feed_ids)
+    feed_locales = (
+        session.query(FeedLocaleEntity.feed_id, FeedLocaleEntity.locale_id)
+        .filter(FeedLocaleEntity.feed_id.in_(list(feed_article_counts)))
+        .distinct()
+        .all()
+    )
+
+    stats = defaultdict(
+        lambda: {"article_count": 0, "stored_article_count": 0, "cache_hit_count": 0}
+    )
+    for feed_id, feed_locale_id in feed_locales:
+        stats[feed_locale_id]["article_count"] += feed_article_counts[feed_id]
+    stats[locale_id]["stored_article_count"] += len(new_article_feed_ids)
+    stats[locale_id]["cache_hit_count"] += cache_hit_count
+
+    insert_stmt = insert(CacheHitStatsEntity).values(
+        [
+            {"locale_id": stats_locale_id, "day": day, **counts}
+            for stats_locale_id, counts in stats.items()
+        ]
+    )
+    counters = ("article_count", "stored_article_count", "cache_hit_count")
+    set_ = {
+        counter: getattr(CacheHitStatsEntity, counter)
+        + getattr(insert_stmt.excluded, counter)
+        for counter in counters
+    }
+    set_["modified"] = func.now()
+    session.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=[CacheHitStatsEntity.locale_id, CacheHitStatsEntity.day],
+            set_=set_,
+        )
+    )
+
+
+def _upsert_article_rows(session, rows, locale_id, aggregation_id):
+    """
+    Insert the article rows, or update the stored ones, and insert their cache records and cache hit stats in the
+    transaction of the session.
+    """
+    insert_stmt = insert(ArticleEntity).values(rows)
+    # Only replace the image when the new one is set and differs from the stored one.
+    new_img = and_(
+        insert_stmt.excluded.img != "",
+        insert_stmt.excluded.img != ArticleEntity.img,
+    )
+    upserted = session.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=[ArticleEntity.url_hash],
+            set_={
+                "title": insert_stmt.excluded.title,
+                "publish_time": insert_stmt.excluded.publish_time,
+                "description": insert_stmt.excluded.description,
+                "pop_score": insert_stmt.excluded.pop_score,
+                "score": insert_stmt.excluded.score,
+                "img": case(
+                    (new_img, insert_stmt.excluded.img),
+                    else_=ArticleEntity.img,
+                ),
+                "padded_img": case(
+                    (new_img, insert_stmt.excluded.padded_img),
+                    else_=ArticleEntity.padded_img,
+                ),
+                "modified": func.now(),
+            },
+        ).returning(
+            ArticleEntity.id,
+            ArticleEntity.feed_id,
+            ArticleEntity.created,
+            # Only the rows inserted by the statement have no xmax.
+            literal_column("xmax = 0", Boolean).label("inserted"),
+        )
+    ).all()
+
+    if locale_id is None:
+        return
+
+    cached_ids = session.scalars(
+        insert(ArticleCacheRecordEntity)
+        .values(
+            [
+                {
+                    "article_id": row.id,
+                    "locale_id": locale_id,
+                    "aggregation_id": aggregation_id,
+                }
+                for row in upserted
+            ]
+        )
+        .on_conflict_do_nothing(
+            index_elements=[
+                ArticleCacheRecordEntity.article_id,
+                ArticleCacheRecordEntity.locale_id,
+            ]
+        )
+        .returning(ArticleCacheRecordEntity.article_id)
+    ).all()
+    cached_ids = set(cached_ids)
+
+    day = datetime.utcnow().date()
+    _update_cache_hit_stats(
+        session,
+        locale_id,
+        day,
+        [row.feed_id for row in upserted if row.inserted],
+        # Also the articles of the day created by the aggregation of another locale of their feed.
+        sum(row.id in cached_ids and row.created.date() == day for row in upserted),
+    )
+
+
+def _upsert_article_rows_one_by_one(session, rows, locale_id, aggregation_id):
+    """
+    Fallback of a failed batch: store its rows one per transaction, so a bad article only loses itself.
+
+    Returns:
+        int: The number of articles stored.
+    """
+    stored = 0
+    for row in rows:
+        try:
+            _upsert_article_rows(session, [row], locale_id, aggregation_id)
+            session.commit()
+            stored += 1
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error saving article {row['url']}: {e}")
+    return stored
+
+
+def bulk_upsert_articles(
+    articles, locale_name, aggregation_id, db_session=None, batch_size=1000
+):
+    """
+    Bulk version of `update_or_insert_article`: insert the articles of the run, or update the stored ones, and
+    insert their cache records, with INSERT ... ON CONFLICT statements in batches. Every batch is committed in
+    its own transaction, and the articles of a failed batch are stored one by one.
+
+    Args:
+        articles (list): The articles to store.
+        locale_name (str): The locale of the articles.
+        aggregation_id (UUID): The id of the aggregation storing the articles.
+        db_session (Session, optional): The database session to use.
+        batch_size (int, optional): The number of articles per statement. Defaults to 1000.
+
+    Returns:
+        int: The number of articles stored.
+    """
+    if not articles:
+        return 0
+
+    try:
+        with db_session or config.get_db_session() as session:
+            feed_ids = dict(
+                session.query(FeedEntity.url_hash, FeedEntity.id)
+                .join(FeedLocaleEntity, FeedLocaleEntity.feed_id == FeedEntity.id)
+                .join(LocaleEntity, FeedLocaleEntity.locale_id == LocaleEntity.id)
+                .filter(
+                    FeedEntity.url_hash.in_(
+                        {article.get("publisher_id") for article in articles}
+                    ),
+                    LocaleEntity.locale == locale_name,
+                )
+                .all()
+            )
+            locale_id = (
+                session.query(LocaleEntity.id).filter_by(locale=locale_name).scalar()
+            )
+
+            # One row per url_hash, a statement can not update the same row twice.
+            rows = {}
+            for article in articles:
+                feed_id = feed_ids.get(article.get("publisher_id"))
+                if feed_id is None:
+                    logger.error(
+                        f"Error saving article {article.get('url')}: unknown feed"
+                    )
+                    continue
+                rows[article.get("url_hash")] = _article_row(
+                    article, feed_id, aggregation_id
+                )
+            rows = list(rows.values())
+
+            stored = 0
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start : start + batch_size]
+                try:
+                    _upsert_article_rows(session, batch, locale_id, aggregation_id)
+                    session.commit()
+                    stored += len(batch)
+                except Exception as e:
+                    session.rollback()
+                    logger.error(
+                        f"Error saving {len(batch)} articles to database, saving them one by one: {e}"
+                    )
+                    stored += _upsert_article_rows_one_by_one(
+                        session, batch, locale_id, aggregation_id
+                    )
+
+            logger.info(f"Saved {stored} articles to database")
+            return stored
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return 0
+
+
 def get_remaining_articles(feed_url_hashes):
     try:
         articles = []
@@ -582,90 +987,416 @@ def insert_feed_lastbuild(url_hash, last_build_time):
         logger.error(f"Error saving feed last build to database: {e}")
 
 
-def get_locale_average_cache_hits(locale_name):
+def get_feed_validators(feed_url_hashes, db_session=None):
+    """
+    Get the stored HTTP validators (ETag, Last-Modified and content hash) of the given feeds,
+    keyed by the feed url_hash.
+    """
     try:
-        one_day_ago = datetime.combine(datetime.utcnow(), time.min)
-        with config.get_db_session() as session:
-            locale = session.query(LocaleEntity).filter_by(locale=locale_name).first()
+        with db_session or config.get_db_session() as session:
+            records = (
+                session.query(FeedEntity.url_hash, FeedUpdateRecordEntity)
+                .join(
+                    FeedUpdateRecordEntity,
+                    FeedUpdateRecordEntity.feed_id == FeedEntity.id,
+                )
+                .filter(FeedEntity.url_hash.in_(feed_url_hashes))
+                .all()
+            )
+            return {
+                url_hash: {
+                    "etag": record.etag,
+                    "last_modified": record.last_modified,
+                    "content_hash": record.content_hash,
+                }
+                for url_hash, record in records
+            }
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return {}
+
+
+def update_feed_validators(feed_validators, db_session=None):
+    """
+    Store the HTTP validators of the downloaded feeds. `feed_validators` maps the feed url_hash to a dict
+    with the `etag`, `last_modified` and `content_hash` of the last downloaded feed body.
+    """
+    try:
+        with db_session or config.get_db_session() as session:
             feeds = (
                 session.query(FeedEntity)
-                .filter(
-                    FeedEntity.locales.any(
-                        FeedLocaleEntity.locale.has(locale=locale_name)
+                .filter(FeedEntity.url_hash.in_(list(feed_validators.keys())))
+                .all()
+            )
+            records = {
+                record.feed_id: record
+                for record in session.query(FeedUpdateRecordEntity)
+                .filter(FeedUpdateRecordEntity.feed_id.in_([feed.id for feed in feeds]))
+                .all()
+            }
+            now = datetime.utcnow()
+            for feed in feeds:
+                validators = feed_validators[feed.url_hash]
+                record = records.get(feed.id)
+                if not record:
+                    record = FeedUpdateRecordEntity(
+                        feed_id=feed.id, last_build_time=now
                     )
+                    session.add(record)
+                    records[feed.id] = record
+                elif record.content_hash != validators.get("content_hash"):
+                    record.last_build_time = now
+
+                record.etag = validators.get("etag")
+                record.last_modified = validators.get("last_modified")
+                record.content_hash = validators.get("content_hash")
+
+            session.commit()
+    except Exception as e:
+        logger.error(f"Error saving feed validators to database: {e}")
+
+
+def get_unshortened_urls(links, db_session=None):
+    """
+    Get the cached final URLs of the given article links. The URLs resolved more than
+    `config.unshortened_url_ttl` seconds ago, and the failures older than `config.unshortened_url_failure_ttl`
+    seconds, are expired.
+
+    Args:
+        links (list): The links of the articles.
+        db_session (Session, optional): The database session to use.
+
+    Returns:
+        dict: The final `url` and `url_hash` of the links, both None for the links that failed to resolve, keyed by
+        the link.
+    """
+    if not links:
+        return {}
+
+    now = datetime.utcnow()
+    try:
+        with db_session or config.get_db_session() as session:
+            rows = session.execute(
+                select(
+                    UnshortenedUrlEntity.link,
+                    UnshortenedUrlEntity.url,
+                    UnshortenedUrlEntity.url_hash,
+                ).where(
+                    UnshortenedUrlEntity.link
+                    == any_(literal(list(links), type_=ARRAY(String))),
+                    or_(
+                        and_(
+                            UnshortenedUrlEntity.url.isnot(None),
+                            UnshortenedUrlEntity.resolved_at
+                            > now - timedelta(seconds=config.unshortened_url_ttl),
+                        ),
+                        and_(
+                            UnshortenedUrlEntity.url.is_(None),
+                            UnshortenedUrlEntity.resolved_at
+                            > now
+                            - timedelta(seconds=config.unshortened_url_failure_ttl),
+                        ),
+                    ),
                 )
-                .all()
             )
+            return {
+                row.link: {"url": row.url, "url_hash": row.url_hash} for row in rows
+            }
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return {}
 
-            feed_articles = (
-                session.query(ArticleEntity)
-                .filter(
-                    ArticleEntity.created >= one_day_ago.strftime("%Y-%m-%d %H:%M:%S"),
-                    ArticleEntity.feed_id.in_([feed.id for feed in feeds]),
+
+def update_unshortened_urls(unshortened_urls, db_session=None):
+    """
+    Store the final URLs of the article links resolved by the aggregation. `unshortened_urls` maps the link to a
+    dict with its final `url` and `url_hash`, both None if the link failed to resolve.
+    """
+    if not unshortened_urls:
+        return
+
+    now = datetime.utcnow()
+    try:
+        with db_session or config.get_db_session() as session:
+            insert_stmt = insert(UnshortenedUrlEntity).values(
+                [
+                    {
+                        "link": link,
+                        "url": unshortened["url"],
+                        "url_hash": unshortened["url_hash"],
+                        "resolved_at": now,
+                    }
+                    for link, unshortened in unshortened_urls.items()
+                ]
+            )
+            session.execute(
+                insert_stmt.on_conflict_do_update(
+                    index_elements=[UnshortenedUrlEntity.link],
+                    set_={
+                        "url": insert_stmt.excluded.url,
+                        "url_hash": insert_stmt.excluded.url_hash,
+                        "resolved_at": insert_stmt.excluded.resolved_at,
+                        "modified": func.now(),
+                    },
                 )
-                .all()
             )
+            session.commit()
+    except Exception as e:
+        logger.error(f"Error saving unshortened URLs to database: {e}")
 
-            cache_hits = (
-                session.query(func.count(ArticleCacheRecordEntity.cache_hit))
-                .filter(
-                    ArticleCacheRecordEntity.article_id.in_(
-                        [article.id for article in feed_articles]
-                    ),
-                    ArticleCacheRecordEntity.locale_id.in_([locale.id]),
+
+def get_popularity_scores(url_hashes, db_session=None):
+    """
+    Get the popularity scores of the given articles fetched less than `config.pop_score_cache_ttl` seconds ago.
+
+    Args:
+        url_hashes (list): The URL hashes of the articles.
+        db_session (Session, optional): The database session to use.
+
+    Returns:
+        dict: The popularity scores, before normalization, keyed by the URL hash of the article.
+    """
+    if not url_hashes:
+        return {}
+
+    try:
+        with db_session or config.get_db_session() as session:
+            rows = session.execute(
+                select(
+                    PopularityScoreEntity.url_hash, PopularityScoreEntity.pop_score
+                ).where(
+                    PopularityScoreEntity.url_hash
+                    == any_(literal(list(url_hashes), type_=ARRAY(String))),
+                    PopularityScoreEntity.fetched_at
+                    > datetime.utcnow() - timedelta(seconds=config.pop_score_cache_ttl),
                 )
-                .first()
             )
+            return {row.url_hash: row.pop_score for row in rows}
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return {}
+
+
+def update_popularity_scores(pop_scores, db_session=None):
+    """
+    Store the popularity scores fetched by the aggregation. `pop_scores` maps the URL hash of the article to its
+    popularity score before normalization.
+    """
+    if not pop_scores:
+        return
 
-            cache_hits = cache_hits[0] if cache_hits[0] else 0
-            total_articles = len(feed_articles)
+    now = datetime.utcnow()
+    try:
+        with db_session or config.get_db_session() as session:
+            insert_stmt = insert(PopularityScoreEntity).values(
+                [
+                    {"url_hash": url_hash, "pop_score": pop_score, "fetched_at": now}
+                    for url_hash, pop_score in pop_scores.items()
+                ]
+            )
+            session.execute(
+                insert_stmt.on_conflict_do_update(
+                    index_elements=[PopularityScoreEntity.url_hash],
+                    set_={
+                        "pop_score": insert_stmt.excluded.pop_score,
+                        "fetched_at": insert_stmt.excluded.fetched_at,
+                        "modified": func.now(),
+                    },
+                )
+            )
+            session.commit()
+    except Exception as e:
+        logger.error(f"Error saving popularity scores to database: {e}")
 
-            logger.info(f"Total articles: {total_articles}")
-            logger.info(f"Cache hits: {cache_hits}")
 
-            cache_hit_percentage = (cache_hits / total_articles) * 100
+def get_channel_predictions(url_hashes, db_session=None):
+    """
+    Get the categories predicted by the NU-API for the given articles less than `config.nu_prediction_cache_ttl`
+    seconds ago.
 
-            logger.info(f"Average cache hits: {cache_hit_percentage}")
+    Args:
+        url_hashes (list): The URL hashes of the articles.
+        db_session (Session, optional): The database session to use.
 
-            return cache_hit_percentage
+    Returns:
+        dict: The predicted `name` and `confidence` of the category, None if no category was predicted, keyed by
+        the URL hash of the article.
+    """
+    if not url_hashes:
+        return {}
 
+    try:
+        with db_session or config.get_db_session() as session:
+            rows = session.execute(
+                select(
+                    ChannelPredictionEntity.url_hash,
+                    ChannelPredictionEntity.category,
+                    ChannelPredictionEntity.confidence,
+                ).where(
+                    ChannelPredictionEntity.url_hash
+                    == any_(literal(list(url_hashes), type_=ARRAY(String))),
+                    ChannelPredictionEntity.predicted_at
+                    > datetime.utcnow()
+                    - timedelta(seconds=config.nu_prediction_cache_ttl),
+                )
+            )
+            return {
+                row.url_hash: (
+                    {"name": row.category, "confidence": row.confidence}
+                    if row.category is not None
+                    else None
+                )
+                for row in rows
+            }
     except Exception as e:
         logger.error(f"Error Connecting to database: {e}")
+        return {}
 
 
-def get_global_average_cache_hits():
+def update_channel_predictions(predictions, db_session=None):
+    """
+    Store the categories predicted by the NU-API during the aggregation. `predictions` maps the URL hash of the
+    article to the predicted `name` and `confidence` of the category, None if no category was predicted.
+    """
+    if not predictions:
+        return
+
+    now = datetime.utcnow()
     try:
-        one_day_ago = datetime.combine(datetime.utcnow(), time.min)
-        with config.get_db_session() as session:
-            articles = (
-                session.query(ArticleEntity)
+        with db_session or config.get_db_session() as session:
+            insert_stmt = insert(ChannelPredictionEntity).values(
+                [
+                    {
+                        "url_hash": url_hash,
+                        "category": prediction and prediction["name"],
+                        "confidence": prediction and prediction["confidence"],
+                        "predicted_at": now,
+                    }
+                    for url_hash, prediction in predictions.items()
+                ]
+            )
+            session.execute(
+                insert_stmt.on_conflict_do_update(
+                    index_elements=[ChannelPredictionEntity.url_hash],
+                    set_={
+                        "category": insert_stmt.excluded.category,
+                        "confidence": insert_stmt.excluded.confidence,
+                        "predicted_at": insert_stmt.excluded.predicted_at,
+                        "modified": func.now(),
+                    },
+                )
+            )
+            session.commit()
+    except Exception as e:
+        logger.error(f"Error saving channel predictions to database: {e}")
+
+
+def get_latest_articles_for_feeds(feed_url_hashes, locale_name, db_session=None):
+    """
+    Get the latest stored articles (at most `max_entries` per feed, published in the last 60 days) of the
+    given feeds, keyed by the feed url_hash. Used in place of re-processing feeds that were not modified.
+    """
+    try:
+        with db_session or config.get_db_session() as session:
+            ranked_articles = (
+                session.query(
+                    ArticleEntity.id.label("article_id"),
+                    func.row_number()
+                    .over(
+                        partition_by=ArticleEntity.feed_id,
+                        order_by=ArticleEntity.publish_time.desc(),
+                    )
+                    .label("position"),
+                )
+                .join(FeedEntity)
                 .filter(
-                    ArticleEntity.created >= one_day_ago.strftime("%Y-%m-%d %H:%M:%S")
+                    FeedEntity.url_hash.in_(feed_url_hashes),
+                    ArticleEntity.publish_time
+                    >= datetime.utcnow() - timedelta(days=60),
                 )
+                .subquery()
+            )
+            articles = (
+                session.query(ArticleEntity)
+                .join(ranked_articles, ArticleEntity.id == ranked_articles.c.article_id)
+                .join(FeedEntity)
+                .filter(ranked_articles.c.position <= FeedEntity.max_entries)
+                .options(joinedload(ArticleEntity.feed))
                 .all()
             )
 
-            cache_hits = (
-                session.query(func.count(ArticleCacheRecordEntity.cache_hit))
+            feed_channels = _get_feed_channels(session, feed_url_hashes, locale_name)
+
+            data = defaultdict(list)
+            for article in articles:
+                if not article.img:
+                    continue
+                data[article.feed.url_hash].append(
+                    _article_data(article, list(feed_channels[article.feed.url_hash]))
+                )
+
+            return dict(data)
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return {}
+
+
+def _cache_hit_percentage(article_count, cache_hit_count):
+    logger.info(f"Total articles: {article_count}")
+    logger.info(f"Cache hits: {cache_hit_count}")
+
+    cache_hit_percentage = (cache_hit_count / article_count) * 100
+
+    logger.info(f"Average cache hits: {cache_hit_percentage}")
+
+    return cache_hit_percentage
+
+
+def get_locale_average_cache_hits(locale_name):
+    """
+    Get the percentage of the articles created today in the feeds of a locale that have a cache record for the
+    locale, from the cache hit stats maintained by `bulk_upsert_articles`.
+    """
+    try:
+        with config.get_db_session() as session:
+            stats = (
+                session.query(
+                    CacheHitStatsEntity.article_count,
+                    CacheHitStatsEntity.cache_hit_count,
+                )
+                .join(LocaleEntity, CacheHitStatsEntity.locale_id == LocaleEntity.id)
                 .filter(
-                    ArticleCacheRecordEntity.article_id.in_(
-                        [article.id for article in articles]
-                    )
+                    LocaleEntity.locale == locale_name,
+                    CacheHitStatsEntity.day == datetime.utcnow().date(),
                 )
                 .first()
             )
 
-            cache_hits = cache_hits[0] if cache_hits[0] else 0
-            total_articles = len(articles)
+            return _cache_hit_percentage(*(stats or (0, 0)))
 
-            logger.info(f"Total articles: {total_articles}")
-            logger.info(f"Cache hits: {cache_hits}")
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
 
-            cache_hit_percentage = (cache_hits / total_articles) * 100
 
-            logger.info(f"Average cache hits: {cache_hit_percentage}")
+def get_global_average_cache_hits():
+    """
+    Get the percentage of the articles created today that have a cache record, from the cache hit stats
+    maintained by `bulk_upsert_articles`.
+    """
+    try:
+        with config.get_db_session() as session:
+            article_count, cache_hit_count = (
+                session.query(
+                    func.coalesce(
+                        func.sum(CacheHitStatsEntity.stored_article_count), 0
+                    ),
+                    func.coalesce(func.sum(CacheHitStatsEntity.cache_hit_count), 0),
+                )
+                .filter(CacheHitStatsEntity.day == datetime.utcnow().date())
+                .one()
+            )
 
-            return cache_hit_percentage
+            return _cache_hit_percentage(article_count, cache_hit_count)
 
     except Exception as e:
         logger.error(f"Error Connecting to database: {e}")
@@ -691,6 +1422,40 @@ def insert_external_channels(url_hash, external_channels, raw_data, db_session=N
         logger.error(f"Error Connecting to database: {e}")
 
 
+def get_classified_url_hashes(url_hashes, db_session=None):
+    """
+    Get the URL hashes of the given articles that already have external channels.
+
+    Args:
+        url_hashes (list): The URL hashes of the articles.
+        db_session (Session, optional): The database session to use.
+
+    Returns:
+        set: The URL hashes of the articles with a stored classification.
+    """
+    if not url_hashes:
+        return set()
+
+    try:
+        with db_session or config.get_db_session() as session:
+            rows = session.execute(
+                select(ArticleEntity.url_hash)
+                .join(
+                    ExternalArticleClassificationEntity,
+                    ArticleEntity.id == ExternalArticleClassificationEntity.article_id,
+                )
+                .where(
+                    ArticleEntity.url_hash
+                    == any_(literal(list(url_hashes), type_=ARRAY(String)))
+                )
+                .distinct()
+            )
+            return {row.url_hash for row in rows}
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return set()
+
+
 def get_article_with_external_channels(url_hash, locale):
     try:
         with config.get_db_session() as session:
@@ -851,57 +1616,260 @@ def get_locales():
         return []
 
 
-def get_articles_with_locale(
-    locale, start_datetime, page: int = 1, page_size: int = 100
-):
+_locale_article_columns = (
+    ArticleEntity.id,
+    ArticleEntity.created,
+    ArticleEntity.title,
+    ArticleEntity.publish_time,
+    ArticleEntity.img,
+    ArticleEntity.category,
+    ArticleEntity.description,
+    ArticleEntity.content_type,
+    FeedEntity.url_hash.label("publisher_id"),
+    FeedEntity.name.label("publisher_name"),
+    ArticleEntity.creative_instance_id,
+    ArticleEntity.url,
+    ArticleEntity.url_hash,
+    ArticleEntity.pop_score,
+    ArticleEntity.padded_img,
+    ArticleEntity.score,
+)
+
+
+def _locale_article_data(row):
+    return {
+        "title": row.title,
+        "publish_time": row.publish_time.strftime("%Y-%m-%d %H:%M:%S"),
+        "img": row.img,
+        "category": row.category,
+        "description": row.description,
+        "content_type": row.content_type,
+        "publisher_id": row.publisher_id,
+        "publisher_name": row.publisher_name,
+        "creative_instance_id": row.creative_instance_id,
+        "url": row.url,
+        "url_hash": row.url_hash,
+        "pop_score": row.pop_score,
+        "padded_img": row.padded_img,
+        "score": row.score,
+    }
+
+
+def encode_article_cursor(row):
+    """
+    Encode the position of an article in the articles ordered by creation time as an opaque cursor.
+
+    Args:
+        row: The article row, with its created and id columns.
+
+    Returns:
+        str: The cursor of the articles after this one.
+    """
+    position = f"{row.created.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_article_cursor(cursor):
+    """
+    Decode a cursor created by `encode_article_cursor`.
+
+    Args:
+        cursor (str): The cursor.
+
+    Returns:
+        tuple: The creation time and the id of the last article of the previous page.
+
+    Raises:
+        ValueError: If the cursor is not valid.
+    """
     try:
-        with config.get_db_session() as session:
-            locale_entity = session.query(LocaleEntity).filter_by(locale=locale).first()
-            if not locale_entity:
-                raise ValueError(f"Locale {locale} not found in the database.")
+        created, article_id = base64.urlsafe_b64decode(cursor).decode().split("|")
+        return datetime.fromisoformat(created), int(article_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor {cursor}.")
 
-            offset = (page - 1) * page_size
 
-            articles = (
-                session.query(ArticleEntity)
-                .join(FeedEntity)
-                .join(FeedLocaleEntity)
-                .filter(
-                    FeedLocaleEntity.locale_id == locale_entity.id,
-                    ArticleEntity.created >= start_datetime,
-                )
-                .distinct()
-                .order_by(ArticleEntity.created.desc())
-                .offset(offset)
-                .limit(page_size)
-                .all()
-            )
+def _articles_with_locale_query(locale, start_datetime, cursor=None):
+    """
+    Build the query of the articles of a locale created since `start_datetime`, newest first.
 
-            data = []
-            for article in articles:
-                article_data = {
-                    "title": article.title,
-                    "publish_time": article.publish_time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "img": article.img,
-                    "category": article.category,
-                    "description": article.description,
-                    "content_type": article.content_type,
-                    "publisher_id": article.feed.url_hash,
-                    "publisher_name": article.feed.publisher.name,
-                    "creative_instance_id": article.creative_instance_id,
-                    "url": article.url,
-                    "url_hash": article.url_hash,
-                    "pop_score": article.pop_score,
-                    "padded_img": article.padded_img,
-                    "score": article.score,
-                }
+    The articles are ordered by (created, id) so that a page starts right after the last article of the previous
+    page, instead of skipping all the previous pages with an OFFSET.
 
-                data.append(article_data)
+    Args:
+        locale (str): The locale of the articles.
+        start_datetime (datetime): The creation time of the oldest articles.
+        cursor (str): The cursor of the last article of the previous page.
 
-            return data
+    Returns:
+        Select: The query.
+    """
+    locale_feeds = (
+        select(FeedLocaleEntity.feed_id)
+        .join(LocaleEntity, LocaleEntity.id == FeedLocaleEntity.locale_id)
+        .where(LocaleEntity.locale == locale)
+    )
+
+    query = (
+        select(*_locale_article_columns)
+        .join(FeedEntity, FeedEntity.id == ArticleEntity.feed_id)
+        .where(
+            ArticleEntity.feed_id.in_(locale_feeds),
+            ArticleEntity.created >= start_datetime,
+        )
+    )
+
+    return _after_cursor(query, cursor)
+
+
+def _after_cursor(query, cursor):
+    query = query.order_by(ArticleEntity.created.desc(), ArticleEntity.id.desc())
+    if not cursor:
+        return query
+
+    created, article_id = decode_article_cursor(cursor)
+    return query.where(
+        tuple_(ArticleEntity.created, ArticleEntity.id) < (created, article_id)
+    )
+
+
+def _articles_page(rows, page_size, article_data=_locale_article_data):
+    next_cursor = (
+        encode_article_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    )
+    return [article_data(row) for row in rows[:page_size]], next_cursor
+
+
+# The fields of the articles that can be selected in the articles query.
+article_fields = {
+    "id": ArticleEntity.id,
+    "title": ArticleEntity.title,
+    "publish_time": ArticleEntity.publish_time,
+    "img": ArticleEntity.img,
+    "category": ArticleEntity.category,
+    "description": ArticleEntity.description,
+    "content_type": ArticleEntity.content_type,
+    "publisher_id": FeedEntity.url_hash,
+    "publisher_name": FeedEntity.name,
+    "creative_instance_id": ArticleEntity.creative_instance_id,
+    "url": ArticleEntity.url,
+    "url_hash": ArticleEntity.url_hash,
+    "pop_score": ArticleEntity.pop_score,
+    "padded_img": ArticleEntity.padded_img,
+    "score": ArticleEntity.score,
+    "created": ArticleEntity.created,
+    "cache_hit": ArticleCacheRecordEntity.cache_hit,
+    "locale": LocaleEntity.locale,
+}
+
+
+def _articles_filters(
+    start_datetime, end_datetime, locale, cache_hits, external_channels
+):
+    filters = [ArticleEntity.created >= start_datetime]
+    if end_datetime:
+        filters.append(ArticleEntity.created < end_datetime)
+    if locale:
+        filters.append(
+            ArticleCacheRecordEntity.locale_id
+            == select(LocaleEntity.id)
+            .where(LocaleEntity.locale == locale)
+            .correlate(None)
+            .scalar_subquery()
+        )
+    if cache_hits is not None:
+        cache_hit = func.coalesce(ArticleCacheRecordEntity.cache_hit, 0)
+        filters.append(cache_hit > 0 if cache_hits else cache_hit == 0)
+    if external_channels is not None:
+        classified = (
+            select(ExternalArticleClassificationEntity.id)
+            .where(ExternalArticleClassificationEntity.article_id == ArticleEntity.id)
+            .exists()
+        )
+        filters.append(classified if external_channels else ~classified)
+
+    return filters
+
+
+def _articles_query(
+    fields,
+    start_datetime,
+    end_datetime=None,
+    locale=None,
+    cache_hits=None,
+    external_channels=None,
+    cursor=None,
+):
+    """
+    Build the query of the articles created between `start_datetime` and `end_datetime`, newest first.
+
+    Only the requested fields are selected, and the feed, cache record and locale tables are only joined when a
+    field or a filter needs them. The articles are ordered by (created, id) like `_articles_with_locale_query`.
+
+    Args:
+        fields (list): The names of the fields of the articles, keys of `article_fields`.
+        start_datetime (datetime): The creation time of the oldest articles.
+        end_datetime (datetime): The creation time the articles are created before, None for no limit.
+        locale (str): The locale the articles are cached for, None for all the locales.
+        cache_hits (bool): Whether the articles were served from the cache, None for all the articles.
+        external_channels (bool): Whether the articles have external channels, None for all the articles.
+        cursor (str): The cursor of the last article of the previous page.
+
+    Returns:
+        Select: The query, its rows have the requested fields and the id and created of the article.
+    """
+    columns = [article_fields[field].label(field) for field in fields]
+    for field in ("id", "created"):
+        if field not in fields:
+            columns.append(article_fields[field].label(field))
+
+    query = select(*columns).select_from(ArticleEntity)
+    query = query.where(
+        *_articles_filters(
+            start_datetime, end_datetime, locale, cache_hits, external_channels
+        )
+    )
+
+    if {"publisher_id", "publisher_name"} & set(fields):
+        query = query.join(FeedEntity, FeedEntity.id == ArticleEntity.feed_id)
+    if {"cache_hit", "locale"} & set(fields) or locale or cache_hits is not None:
+        query = query.outerjoin(
+            ArticleCacheRecordEntity,
+            ArticleCacheRecordEntity.article_id == ArticleEntity.id,
+        )
+    if "locale" in fields:
+        query = query.outerjoin(
+            LocaleEntity, LocaleEntity.id == ArticleCacheRecordEntity.locale_id
+        )
+
+    return _after_cursor(query, cursor)
+
+
+def get_articles_with_locale(locale, start_datetime, cursor=None, page_size: int = 100):
+    """
+    Get a page of the articles of a locale created since `start_datetime`, newest first.
+
+    Args:
+        locale (str): The locale of the articles.
+        start_datetime (datetime): The creation time of the oldest articles.
+        cursor (str): The cursor returned with the previous page, None for the first page.
+        page_size (int): The maximum number of articles of the page.
+
+    Returns:
+        tuple: The articles of the page and the cursor of the next page, None for the last page.
+    """
+    try:
+        with config.get_db_session() as session:
+            rows = session.execute(
+                _articles_with_locale_query(locale, start_datetime, cursor).limit(
+                    page_size + 1
+                )
+            ).all()
+
+            return _articles_page(rows, page_size)
     except Exception as e:
         logger.error(f"Error Connecting to database: {e}")
-        return []
+        return [], None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,177 @@
+from datetime import datetime, timezone
+
+import structlog
+from sqlalchemy import select
+
+from config import get_config
+from db.tables.channel_entity import ChannelEntity
+from db.tables.locales_entity import LocaleEntity
+from db_crud import (
+    _articles_page,
+    _articles_query,
+    _articles_with_locale_query,
+    _locale_article_data,
+    _publisher_feeds_data,
+    _publisher_feeds_query,
+    _publishers_based_on_locale_query,
+)
+
+config = get_config()
+logger = structlog.getLogger(__name__)
+
+
+def _to_datetime(value):
+    # asyncpg does not cast strings to timestamps, nor aware datetimes to the naive timestamps of the tables.
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value and value.tzinfo:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+async def get_publisher_with_locale(publisher_url):
+    """
+    Get a publisher from the database, see `db_crud.get_publisher_with_locale`.
+    """
+    try:
+        async with config.get_async_db_session() as session:
+            rows = await session.execute(_publisher_feeds_query(publisher_url))
+
+            return _publisher_feeds_data(rows.all())
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return []
+
+
+async def get_publishers_based_on_locale(locale):
+    """
+    Get the publishers of the feeds of a locale, see `db_crud.get_publishers_based_on_locale`.
+    """
+    try:
+        async with config.get_async_db_session() as session:
+            rows = await session.execute(_publishers_based_on_locale_query(locale))
+
+            return [dict(row) for row in rows.mappings()]
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return []
+
+
+async def get_channels():
+    try:
+        async with config.get_async_db_session() as session:
+            channels = await session.scalars(select(ChannelEntity.name).distinct())
+
+            return sorted(channels.all())
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return []
+
+
+async def get_locales():
+    try:
+        async with config.get_async_db_session() as session:
+            locales = await session.scalars(select(LocaleEntity.locale).distinct())
+
+            return sorted(locales.all())
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return []
+
+
+async def get_articles_with_locale(
+    locale, start_datetime, cursor=None, page_size: int = 100
+):
+    """
+    Get a page of the articles of a locale created since `start_datetime`, see `db_crud.get_articles_with_locale`.
+    """
+    try:
+        async with config.get_async_db_session() as session:
+            rows = await session.execute(
+                _articles_with_locale_query(
+                    locale, _to_datetime(start_datetime), cursor
+                ).limit(page_size + 1)
+            )
+
+            return _articles_page(rows.all(), page_size)
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return [], None
+
+
+async def stream_articles_with_locale(locale, start_datetime, batch_size: int = 1000):
+    """
+    Stream all the articles of a locale created since `start_datetime`, newest first.
+
+    The rows are read from a server side cursor `batch_size` at a time, so the memory used does not grow with the
+    number of articles.
+
+    Args:
+        locale (str): The locale of the articles.
+        start_datetime (datetime): The creation time of the oldest articles.
+        batch_size (int): The number of rows fetched from the cursor at a time.
+
+    Yields:
+        dict: The articles.
+    """
+    try:
+        async with config.get_async_db_session() as session:
+            rows = await session.stream(
+                _articles_with_locale_query(
+                    locale, _to_datetime(start_datetime)
+                ).execution_options(yield_per=batch_size)
+            )
+            async for row in rows:
+                yield _locale_article_data(row)
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+
+
+async def get_articles(
+    fields,
+    start_datetime,
+    end_datetime=None,
+    locale=None,
+    cache_hits=None,
+    external_channels=None,
+    cursor=None,
+    page_size: int = 100,
+):
+    """
+    Get a page of the articles created between `start_datetime` and `end_datetime`, newest first.
+
+    Args:
+        fields (list): The names of the fields of the articles, keys of `db_crud.article_fields`.
+        start_datetime (datetime): The creation time of the oldest articles.
+        end_datetime (datetime): The creation time the articles are created before, None for no limit.
+        locale (str): The locale the articles are cached for, None for all the locales.
+        cache_hits (bool): Whether the articles were served from the cache, None for all the articles.
+        external_channels (bool): Whether the articles have external channels, None for all the articles.
+        cursor (str): The cursor returned with the previous page, None for the first page.
+        page_size (int): The maximum number of articles of the page.
+
+    Returns:
+        tuple: The articles of the page with the requested fields and the cursor of the next page, None for the
+        last page.
+    """
+    try:
+        async with config.get_async_db_session() as session:
+            query = _articles_query(
+                fields,
+                _to_datetime(start_datetime),
+                _to_datetime(end_datetime),
+                locale,
+                cache_hits,
+                external_channels,
+                cursor,
+            )
+            rows = await session.execute(query.limit(page_size + 1))
+
+            return _articles_page(
+                rows.all(),
+                page_size,
+                lambda row: {field: row._mapping[field] for field in fields},
+            )
+    except Exception as e:
+        logger.error(f"Error Connecting to database: {e}")
+        return [], None
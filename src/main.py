@@ -7,7 +7,7 @@ import structlog
 
 from aggregator.aggregate import Aggregator
 from config import get_config
-from db_crud import get_channels, insert_article, update_aggregation_stats
+from db_crud import get_channels, update_aggregation_stats
 from utils import upload_file
 
 config = get_config()
@@ -50,21 +50,12 @@ if __name__ == "__main__":
             f"brave-today/{config.channel_file}",
         )
 
+    # The articles and their cache records are already stored in bulk by the aggregation.
     articles = []
     db_session = config.get_db_session()
     with open(config.output_feed_path / f"{config.feed_path}.json", "r") as f:
         articles = orjson.loads(f.read())
-        locale_name = str(config.sources_file).replace("sources.", "")
-        aggregation_id = fp.aggregation_id
-        logger.info(f"Feed has {len(articles)} items to insert.")
-        # for each article, insert into the database, do not use threads
-        for article in articles:
-            insert_article(
-                article,
-                locale_name=locale_name,
-                aggregation_id=aggregation_id,
-                db_session=db_session,
-            )
+        logger.info(f"Feed has {len(articles)} items.")
 
     with open(config.output_path / "report.json", "w") as f:
         f.write(json.dumps(fp.report))
@@ -83,3 +74,4 @@ if __name__ == "__main__":
     )
     logger.info(f"\nCompleted in {processing_time_in_seconds} seconds")
     logger.info(f"DB sessions created {config.db_connections_created}")
+    logger.info(f"DB connection pool {config.db_pool_stats()}")
@@ -3,8 +3,11 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this file,
 # You can obtain one at https://mozilla.org/MPL/2.0/. */
 
+import asyncio
+import ctypes
 import logging
 import mimetypes
+import multiprocessing
 import re
 import threading
 import time
@@ -223,6 +226,36 @@ def retry(retries: int, delays: list[int]) -> Callable:
     return decorator
 
 
+def async_retry(retries: int, delays: list[int]) -> Callable:
+    """
+    The `retry` decorator for coroutine functions, waiting between the attempts without blocking the event loop.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            for attempt in range(retries):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    if attempt == retries - 1:
+                        logger.error(
+                            f"Attempt {attempt + 1} failed. No more retries left. Error: {e}"
+                        )
+                        raise HTTPError(
+                            f"Failed to make request after {retries} attempts: {e}"
+                        )
+                    else:
+                        logger.warning(
+                            f"Attempt {attempt + 1} failed. Retrying in {delays[attempt]} seconds. Error: {e}"
+                        )
+                        await asyncio.sleep(delays[attempt])
+
+        return wrapper
+
+    return decorator
+
+
 def push_metrics_to_pushgateway(metric, metric_value, label_value, registry):
     """
     Pushes the given metric value to the Pushgateway for monitoring purposes.
@@ -260,20 +293,155 @@ def dict_in_list(target_dict, dict_list):
 
 
 class RateLimiter:
-    def __init__(self, max_per_second):
-        self.lock = threading.Lock()
-        self.min_interval = 1.0 / float(max_per_second)
-        self.last_time_called = 0.0
+    """
+    A token bucket rate limiter: up to `burst` calls can be made at once, and the bucket refills at
+    `max_per_second` calls per second.
+
+    The calls reserve their slot under a short lock and wait for it outside of the lock, so the threads and the
+    coroutines waiting for the limiter do not hold each other back. With `shared`, the state of the bucket is
+    kept in shared memory, and the processes forked after the limiter is created share its budget.
+    """
+
+    def __init__(self, max_per_second: float, burst: int = 1, shared: bool = False):
+        self.interval = 1.0 / float(max_per_second)
+        self.burst = max(1, int(burst))
+        # The time the bucket is full again, on the monotonic clock of the system.
+        if shared:
+            self._full_at = multiprocessing.Value("d", 0.0)
+            self.lock = self._full_at.get_lock()
+        else:
+            self._full_at = ctypes.c_double(0.0)
+            self.lock = threading.Lock()
+
+    def _reserve(self, block: bool = True) -> Optional[float]:
+        """
+        Takes a token and returns the number of seconds to wait for it, or None if `block` is False and there
+        is no token left.
+        """
+        with self.lock:
+            now = time.monotonic()
+            full_at = max(self._full_at.value, now) + self.interval
+            left_to_wait = full_at - self.burst * self.interval - now
+            if left_to_wait > 0 and not block:
+                return None
+            self._full_at.value = full_at
+            return max(left_to_wait, 0.0)
+
+    def acquire(self):
+        """
+        Waits for a token.
+        """
+        left_to_wait = self._reserve()
+        if left_to_wait > 0:
+            time.sleep(left_to_wait)
+
+    async def acquire_async(self):
+        """
+        Waits for a token without blocking the event loop.
+        """
+        left_to_wait = self._reserve()
+        if left_to_wait > 0:
+            await asyncio.sleep(left_to_wait)
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a token if one is left, without waiting.
+
+        Returns:
+            bool: True if a token was taken.
+        """
+        return self._reserve(block=False) is not None
 
     def __call__(self, func):
+        if asyncio.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                await self.acquire_async()
+                return await func(*args, **kwargs)
+
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            with self.lock:
-                elapsed = time.perf_counter() - self.last_time_called
-                left_to_wait = self.min_interval - elapsed
-                if left_to_wait > 0:
-                    time.sleep(left_to_wait)
-                self.last_time_called = time.perf_counter()
+            self.acquire()
             return func(*args, **kwargs)
 
         return wrapper
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str) -> RateLimiter:
+    """
+    Gets the rate limiter of an API or a host, created on first use with its budget in `config.rate_limits`.
+
+    Args:
+        key (str): The name of the API, or the host.
+
+    Returns:
+        RateLimiter: The rate limiter of the key, `config.rate_limit` calls per second with a burst of
+        `config.rate_limit_burst` calls if the key has no budget.
+    """
+    with _rate_limiters_lock:
+        if key not in _rate_limiters:
+            budget = config.rate_limits.get(key, {})
+            _rate_limiters[key] = RateLimiter(
+                budget.get("rate", config.rate_limit),
+                burst=budget.get("burst", config.rate_limit_burst),
+                shared=budget.get("shared", False),
+            )
+        return _rate_limiters[key]
+
+
+class ResponseCache:
+    """
+    A versioned in-memory cache with a TTL.
+
+    `invalidate` bumps the version of the cache: the entries stored before, and the values computed by the
+    lookups that started before, are never served. It only affects the cache of the calling process, the caches
+    of the other processes only drop their entries when they expire.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self.entries: Dict[Any, tuple] = {}
+
+    def get(self, key: Any) -> Any:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        version, expires_at, value = entry
+        if version != self.version or expires_at < time.monotonic():
+            self.entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Any, value: Any, version: Optional[int] = None):
+        if version is None:
+            version = self.version
+        if version == self.version:
+            self.entries[key] = (version, time.monotonic() + self.ttl, value)
+
+    async def get_or_set(self, key: Any, factory: Callable) -> Any:
+        """
+        Get the cached value of the key, or compute it with the coroutine function `factory` and cache it.
+        Empty values are not cached, the database lookups return them on errors.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        version = self.version
+        value = await factory()
+        if value:
+            self.set(key, value, version)
+        return value
+
+    def invalidate(self):
+        self.version += 1
+        self.entries.clear()
@@ -0,0 +1,32 @@
+import httpx
+import pytest
+
+from aggregator.fetch_engine import FetchEngine
+
+
+@pytest.fixture
+def engine(stub_api):
+    """
+    A fetch engine whose requests are answered by the `stub_api` fixture of the test module.
+    """
+    engine = FetchEngine()
+    engine._client = httpx.AsyncClient(transport=httpx.MockTransport(stub_api))
+    yield engine
+    engine.close()
+
+
+@pytest.fixture
+def cached_lookup(mocker):
+    """
+    Replaces a database lookup of cached values, called with a list of keys, by a lookup in the returned dict.
+    """
+
+    def patch(target):
+        cache = {}
+        mocker.patch(
+            target,
+            side_effect=lambda keys: {key: cache[key] for key in keys if key in cache},
+        )
+        return cache
+
+    return patch
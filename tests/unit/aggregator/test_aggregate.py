@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+
+import httpx
+import pytest
+
+from aggregator.aggregate import Aggregator
+from config import get_config
+
+config = get_config()
+
+FEED_URL = "https://example.com/feed.xml"
+PUBLISHER_ID = hashlib.sha256(FEED_URL.encode("utf-8")).hexdigest()
+FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0">
+  <channel>
+    <title>Example Feed</title>
+    <item><title>Article 1</title><link>https://example.com/articles/1</link></item>
+    <item><title>Article 2</title><link>https://example.com/articles/2</link></item>
+  </channel>
+</rss>"""
+
+
+def publisher():
+    return {
+        "publisher_id": PUBLISHER_ID,
+        "publisher_name": "Example",
+        "content_type": "article",
+        "site_url": "https://example.com/",
+        "channels": ["Top News"],
+        "creative_instance_id": "",
+        "max_entries": 20,
+        "og_images": False,
+        "destination_domains": ["example.com"],
+    }
+
+
+def feed_server(request):
+    # Not modified since the last aggregation for the conditional requests.
+    if request.headers.get("If-None-Match") == '"etag1"':
+        return httpx.Response(304)
+    return httpx.Response(200, content=FEED, headers={"ETag": '"etag2"'})
+
+
+@pytest.fixture
+def aggregator(mocker):
+    mocker.patch("aggregator.aggregate.insert_aggregation_stats")
+    mocker.patch("aggregator.aggregate.update_aggregation_stats")
+    mocker.patch.object(config.__class__, "get_db_session", lambda self: None)
+
+    aggregator = Aggregator({FEED_URL: publisher()}, None)
+    aggregator.fetch_engine._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(feed_server)
+    )
+    yield aggregator
+    aggregator.close()
+
+
+class TestStreamRss:
+    # Downloads again, and processes, the not modified feeds without stored articles.
+    def test_unchanged_feed_without_articles(self, aggregator, mocker, monkeypatch):
+        monkeypatch.setattr(config, "conditional_feed_fetch", True)
+        mocker.patch(
+            "aggregator.aggregate.get_feed_validators",
+            return_value={
+                PUBLISHER_ID: {
+                    "etag": '"etag1"',
+                    "last_modified": None,
+                    "content_hash": None,
+                }
+            },
+        )
+        mocker.patch(
+            "aggregator.aggregate.get_latest_articles_for_feeds", return_value={}
+        )
+        update_feed_validators = mocker.patch(
+            "aggregator.aggregate.update_feed_validators"
+        )
+
+        async def run_inline(func, *args):
+            return func(*args)
+
+        processed_entries = []
+
+        async def process(feed_entry):
+            processed_entries.append(feed_entry)
+            return None
+
+        mocker.patch.object(aggregator, "_run_in_process", run_inline)
+        mocker.patch.object(aggregator, "_stream_process", process)
+
+        aggregator.stream_rss()
+
+        assert [entry["title"] for _, _, entry in processed_entries] == [
+            "Article 1",
+            "Article 2",
+        ]
+        assert aggregator.report["feed_stats"][FEED_URL]["size_after_get"] == 2
+        assert (
+            update_feed_validators.call_args.args[0][PUBLISHER_ID]["etag"] == '"etag2"'
+        )
+
+
+class TestStreamUnshortenLookup:
+    # Looks up the links of the articles streamed concurrently with one query.
+    def test_batches_lookups(self, aggregator, mocker):
+        cached_url = {"url": "https://example.com/final", "url_hash": "hash"}
+        get_unshortened_urls = mocker.patch(
+            "aggregator.aggregate.get_unshortened_urls",
+            return_value={"https://example.com/articles/1": cached_url},
+        )
+        articles = [{"link": f"https://example.com/articles/{i}"} for i in range(3)]
+
+        async def lookup_all():
+            return await asyncio.gather(
+                *[aggregator._stream_unshorten_lookup(article) for article in articles]
+            )
+
+        results = aggregator.fetch_engine.loop.run_until_complete(lookup_all())
+
+        get_unshortened_urls.assert_called_once()
+        assert sorted(get_unshortened_urls.call_args.args[0]) == [
+            article["link"] for article in articles
+        ]
+        assert [article for article, _ in results] == articles
+        assert results[1][1]["https://example.com/articles/1"] == cached_url
+
+
+class TestUnshortenUrl:
+    SHORT_LINK = "https://bit.ly/3i2QJgA"
+
+    # Reuses the cached final URL of the link instead of following its redirects.
+    def test_cached_url(self, aggregator, mocker):
+        unshorten_url = mocker.patch("aggregator.aggregate.unshorten_url")
+        cached_urls = {
+            self.SHORT_LINK: {"url": "https://example.com/final", "url_hash": "hash"}
+        }
+
+        result = aggregator._unshorten_url({"link": self.SHORT_LINK}, cached_urls)
+
+        assert result == {"url": "https://example.com/final", "url_hash": "hash"}
+        unshorten_url.assert_not_called()
+        assert aggregator.unshortened_urls == {}
+
+    # Skips the article of a link that failed to resolve recently.
+    def test_cached_failure(self, aggregator, mocker):
+        unshorten_url = mocker.patch("aggregator.aggregate.unshorten_url")
+        cached_urls = {self.SHORT_LINK: {"url": None, "url_hash": None}}
+
+        result = aggregator._unshorten_url({"link": self.SHORT_LINK}, cached_urls)
+
+        assert result is None
+        unshorten_url.assert_not_called()
+
+    # Does not follow the redirects of the publisher links.
+    def test_publisher_link(self, aggregator, mocker):
+        unshorten_url = mocker.patch("aggregator.aggregate.unshorten_url")
+
+        result = aggregator._unshorten_url(
+            {"link": "https://example.com/articles/1"}, {}
+        )
+
+        assert result["url"] == "https://example.com/articles/1"
+        unshorten_url.assert_not_called()
+        assert aggregator.unshortened_urls == {}
+
+    # Records the final URLs of the resolved links, and the links that failed to resolve.
+    def test_records_resolved_links(self, aggregator, mocker):
+        failed_link = "https://bit.ly/failed"
+        mocker.patch(
+            "aggregator.aggregate.unshorten_url",
+            side_effect=lambda article: None
+            if article["link"] == failed_link
+            else {"url": "https://example.com/final", "url_hash": "hash"},
+        )
+
+        assert aggregator._unshorten_url({"link": self.SHORT_LINK}, {})
+        assert aggregator._unshorten_url({"link": failed_link}, {}) is None
+
+        assert aggregator.unshortened_urls == {
+            self.SHORT_LINK: {"url": "https://example.com/final", "url_hash": "hash"},
+            failed_link: {"url": None, "url_hash": None},
+        }
@@ -0,0 +1,148 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from aggregator.channel_predictor import ChannelPredictor
+from config import get_config
+
+config = get_config()
+
+
+def article(index, channels=("Top News",)):
+    return {
+        "url": f"https://example.com/{index}",
+        "url_hash": f"hash{index}",
+        "title": f"This is the title of article {index}",
+        "description": "This is an article description",
+        "channels": list(channels),
+    }
+
+
+def category(name):
+    return {"name": name, "confidence": config.nu_confidence_threshold}
+
+
+class StubNuApi:
+    """
+    Predicts the "Sports" category for all the articles, except for the last `drop_last` articles of the first
+    request.
+    """
+
+    def __init__(self, drop_last=0):
+        self.requests = []
+        self.drop_last = drop_last
+
+    def __call__(self, request):
+        items = orjson.loads(request.content)
+        self.requests.append(items)
+        if len(self.requests) == 1 and self.drop_last:
+            items = items[: -self.drop_last]
+        return httpx.Response(
+            200,
+            content=orjson.dumps(
+                {"results": [{"categories": [category("Sports")]} for _ in items]}
+            ),
+        )
+
+
+@pytest.fixture
+def stub_api():
+    return StubNuApi()
+
+
+@pytest.fixture
+def cached_predictions(cached_lookup):
+    return cached_lookup("aggregator.channel_predictor.get_channel_predictions")
+
+
+@pytest.fixture(autouse=True)
+def nu_config(monkeypatch):
+    monkeypatch.setattr(config, "nu_api_url", "https://nu.example.com/predict")
+    monkeypatch.setattr(config, "nu_batch_size", 2)
+
+
+class TestChannelPredictor:
+    # Sends the eligible articles in batches and maps the results back by index.
+    def test_batches(self, engine, stub_api, cached_predictions):
+        predictor = ChannelPredictor(engine)
+        articles = [article(1), article(2), article(3, channels=["Fun"]), article(4)]
+
+        result = engine.loop.run_until_complete(predictor.predict_articles(articles))
+
+        assert [item["channels"] for item in result] == [
+            ["Sports", "Top News"],
+            ["Sports", "Top News"],
+            ["Fun"],
+            ["Sports", "Top News"],
+        ]
+        assert [[item["url"] for item in items] for items in stub_api.requests] == [
+            [article(1)["url"], article(2)["url"]],
+            [article(4)["url"]],
+        ]
+        assert set(predictor.new_predictions) == {"hash1", "hash2", "hash4"}
+
+    # Sends the articles missing from the results again.
+    def test_retries_partial_failure(self, engine, stub_api, cached_predictions):
+        stub_api.drop_last = 1
+        predictor = ChannelPredictor(engine)
+
+        result = engine.loop.run_until_complete(
+            predictor.predict_articles([article(1), article(2)])
+        )
+
+        assert [item["channels"] for item in result] == [
+            ["Sports", "Top News"],
+            ["Sports", "Top News"],
+        ]
+        assert [len(items) for items in stub_api.requests] == [2, 1]
+
+    # Reuses the cached predictions, including the articles without a predicted category.
+    def test_cached_predictions(self, engine, stub_api, cached_predictions):
+        cached_predictions["hash1"] = category("Politics")
+        cached_predictions["hash2"] = None
+        predictor = ChannelPredictor(engine)
+
+        result = engine.loop.run_until_complete(
+            predictor.predict_articles([article(1), article(2), article(3)])
+        )
+
+        assert [item["channels"] for item in result] == [
+            ["Politics", "Top News"],
+            ["Top News"],
+            ["Sports", "Top News"],
+        ]
+        assert [[item["url"] for item in items] for items in stub_api.requests] == [
+            [article(3)["url"]]
+        ]
+        assert predictor.new_predictions == {"hash3": category("Sports")}
+
+    # Batches the articles predicted one at a time.
+    def test_predict_article(self, engine, stub_api, cached_predictions):
+        predictor = ChannelPredictor(engine)
+
+        async def predict_all():
+            return await asyncio.gather(
+                *[predictor.predict_article(article(index)) for index in range(1, 4)]
+            )
+
+        result = engine.loop.run_until_complete(predict_all())
+
+        assert [item["url_hash"] for item in result] == ["hash1", "hash2", "hash3"]
+        assert [len(items) for items in stub_api.requests] == [2, 1]
+
+    # Stores the new predictions in the cache.
+    def test_save(self, engine, cached_predictions, mocker):
+        update_channel_predictions = mocker.patch(
+            "aggregator.channel_predictor.update_channel_predictions"
+        )
+        predictor = ChannelPredictor(engine)
+        engine.loop.run_until_complete(predictor.predict_articles([article(1)]))
+
+        predictor.save()
+
+        update_channel_predictions.assert_called_once_with(
+            {"hash1": category("Sports")}
+        )
+        assert predictor.new_predictions == {}
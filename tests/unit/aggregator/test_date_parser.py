@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+
+import dateparser
+import pytest
+
+from aggregator.date_parser import format_publish_time, parse_date
+
+
+class TestParseDate:
+    # Parses the RFC 822 and ISO 8601 dates like dateparser.
+    @pytest.mark.parametrize(
+        "value",
+        [
+            "Mon, 01 Jan 2024 10:00:00 GMT",
+            "Mon, 01 Jan 2024 10:00:00 +0200",
+            "Mon, 01 Jan 2024 10:00:00 -0000",
+            "Mon, 01 Jan 2024 10:00:00",
+            "2024-01-01T10:00:00Z",
+            "2024-01-01T10:00:00.123+05:30",
+            "Mon, 01 Jan 2024 10:00:00 CEST",
+        ],
+    )
+    def test_same_as_dateparser(self, value):
+        assert parse_date(value) == dateparser.parse(value)
+
+    # Uses the date parsed by feedparser before falling back to dateparser.
+    def test_feedparser_date(self, mocker):
+        mock_dateparser = mocker.patch("aggregator.date_parser.dateparser.parse")
+
+        date = parse_date("Monday 1st of January 2024", (2024, 1, 1, 10, 0, 0, 0, 1, 0))
+
+        assert date == datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+        mock_dateparser.assert_not_called()
+
+    # Falls back to dateparser for the other dates.
+    def test_dateparser_fallback(self):
+        assert parse_date("January 1, 2024 10:00") == datetime(2024, 1, 1, 10)
+
+    # Returns None for the missing dates.
+    def test_no_date(self):
+        assert parse_date(None) is None
+
+
+class TestFormatPublishTime:
+    # Formats the publish time of the feed files.
+    def test_format(self):
+        assert format_publish_time(datetime(2024, 1, 1, 10)) == "2024-01-01 10:00:00"
@@ -1,66 +1,116 @@
+import httpx
+import orjson
+import pytest
 import structlog
 
-from aggregator.external_services import get_popularity_score, get_predicted_channels
+from aggregator.aggregate import Aggregator
+from aggregator.channel_predictor import ChannelPredictor
+from aggregator.external_services import get_external_channels_for_article
+from aggregator.popularity_client import PopularityClient
 from config import get_config
 
 logger = structlog.get_logger()
 config = get_config()
 
 
+class StubNuApi:
+    """
+    Predicts the `categories` for all the articles.
+    """
+
+    def __init__(self):
+        self.categories = []
+
+    def __call__(self, request):
+        items = orjson.loads(request.content)
+        return httpx.Response(
+            200, json={"results": [{"categories": self.categories} for _ in items]}
+        )
+
+
 class TestGetPopularityScore:
+    @pytest.fixture
+    def stub_api(self):
+        return lambda request: httpx.Response(
+            200, content=b'{"popularity": {"popularity": {"score1": 1, "score2": 2}}}'
+        )
+
+    @pytest.fixture(autouse=True)
+    def uncached(self, mocker, monkeypatch):
+        mocker.patch(
+            "aggregator.popularity_client.get_popularity_scores", return_value={}
+        )
+        monkeypatch.setattr(config, "pop_score_batch_enabled", False)
+
+    @staticmethod
+    def score_article(engine, out_article):
+        client = PopularityClient(engine, "en_US")
+        return engine.loop.run_until_complete(client.score_articles([out_article]))[0]
+
     # Successfully retrieves popularity score for an article.
-    def test_retrieves_popularity_score(self, mocker):
+    def test_retrieves_popularity_score(self, engine):
         logger.info("\n--- test_retrieves_popularity_score ---")
-        # Mock the get_with_max_size function to return a sample response
-        mock_get = mocker.patch("requests.request")
-        mock_get.return_value.content = (
-            b'{"popularity": {"popularity": {"score1": 1, "score2": 2}}}'
-        )
-        mocker.patch("structlog.getLogger")
 
         # Create a sample article
         out_article = {
             "url": "https://example.com/article",
+            "url_hash": "hash",
             "title": "Example Article",
             "author": "John Doe",
             "publish_time": "2022-01-01T12:00:00Z",
         }
 
-        # Call the get_popularity_score function
-        result = get_popularity_score(out_article)
+        result = self.score_article(engine, out_article)
 
-        # Assert that the popularity score is None
+        # Assert that the popularity score is the sum of the scores
         assert result["pop_score"] == 3
 
     # URL is invalid or empty.
-    def test_invalid_or_empty_url(self, mocker):
+    def test_invalid_or_empty_url(self, engine):
         logger.info("\n--- test_invalid_or_empty_url ---")
-        # Mock the get_with_max_size function to raise an exception
-        mocker.patch(
-            "aggregator.external_services.requests.get",
-            side_effect=ValueError("Content-Length too large"),
-        )
 
         # Create a sample article with an invalid URL
         out_article = {
             "url": "",
+            "url_hash": "hash",
             "title": "Example Article",
             "author": "John Doe",
             "publish_time": "2022-01-01T12:00:00Z",
         }
 
-        # Call the get_popularity_score function
-        result = get_popularity_score(out_article)
+        result = self.score_article(engine, out_article)
 
         # Assert that the popularity score is 1.0
         assert result["pop_score"] == 1.0
 
 
 class TestGetPredictedChannel:
-    def test_article_default_channel_or_short_text(self, mocker):
+    @pytest.fixture
+    def stub_api(self):
+        return StubNuApi()
+
+    @pytest.fixture(autouse=True)
+    def uncached(self, mocker, monkeypatch):
+        mocker.patch(
+            "aggregator.channel_predictor.get_channel_predictions", return_value={}
+        )
+        monkeypatch.setattr(config, "nu_api_url", "https://nu.example.com/predict")
+
+    @staticmethod
+    def predict(engine, articles):
+        articles = [
+            {
+                "url": f"https://example.com/{index}",
+                "url_hash": f"hash{index}",
+                **article,
+            }
+            for index, article in enumerate(articles)
+        ]
+        predictor = ChannelPredictor(engine)
+        return engine.loop.run_until_complete(predictor.predict_articles(articles))
+
+    def test_article_default_channel_or_short_text(self, engine, stub_api):
         logger.info("\n--- test_article_default_channel_or_short_text ---")
-        mocker.patch("requests.post")
-        mocker.patch("structlog.getLogger")
 
         channels_1_default = ["Fun"]
         channels_2 = ["Sports"]
@@ -77,19 +127,16 @@ class TestGetPredictedChannel:
             "description": "",
         }
 
-        result_1 = get_predicted_channels(article_1)
-        result_2 = get_predicted_channels(article_2)
+        stub_api.categories = [
+            {"name": "Sports", "confidence": config.nu_confidence_threshold}
+        ]
+        result_1, result_2 = self.predict(engine, [article_1, article_2])
 
         assert result_1["channels"] == channels_1_default
         assert result_2["channels"] == channels_2
 
-    def test_article_api_response_no_categories(self, mocker):
+    def test_article_api_response_no_categories(self, engine, stub_api):
         logger.info("\n--- test_article_api_response_no_categories ---")
-        # Mock the necessary dependencies
-        mock_post = mocker.patch("requests.post")
-        mock_post.return_value.raise_for_status.return_value = None
-        mock_post.return_value.json.return_value = {"results": [{"categories": []}]}
-        mocker.patch("structlog.getLogger")
 
         channels = ["channel1", "channel2"]
 
@@ -99,29 +146,14 @@ class TestGetPredictedChannel:
             "description": "This is an article description",
         }
 
-        result = get_predicted_channels(article)
+        stub_api.categories = []
+        (result,) = self.predict(engine, [article])
 
         assert result["channels"] == channels
 
-    def test_article_if_predicted_category_excluded(self, mocker):
+    def test_article_if_predicted_category_excluded(self, engine, stub_api):
         logger.info("\n--- test_article_if_predicted_category_excluded ---")
-        # Mock the necessary dependencies
-        mock_post = mocker.patch("requests.post")
-        mock_post.return_value.raise_for_status.return_value = None
         excluded_category = "Crime"
-        mock_post.return_value.json.return_value = {
-            "results": [
-                {
-                    "categories": [
-                        {
-                            "name": excluded_category,
-                            "confidence": config.nu_confidence_threshold,
-                        }
-                    ]
-                }
-            ]
-        }
-        mocker.patch("structlog.getLogger")
 
         article = {
             "channels": ["channel1", "channel2"],
@@ -129,29 +161,16 @@ class TestGetPredictedChannel:
             "description": "This is an article description",
         }
 
-        result = get_predicted_channels(article)
+        stub_api.categories = [
+            {"name": excluded_category, "confidence": config.nu_confidence_threshold}
+        ]
+        (result,) = self.predict(engine, [article])
 
         assert excluded_category not in result["channels"]
 
-    def test_article_if_predicted_category_below_threshold(self, mocker):
+    def test_article_if_predicted_category_below_threshold(self, engine, stub_api):
         logger.info("\n--- test_article_if_predicted_category_below_threshold ---")
-        # Mock the necessary dependencies
-        mock_post = mocker.patch("requests.post")
-        mock_post.return_value.raise_for_status.return_value = None
         valid_category = "Sports"
-        mock_post.return_value.json.return_value = {
-            "results": [
-                {
-                    "categories": [
-                        {
-                            "name": valid_category,
-                            "confidence": config.nu_confidence_threshold / 2,
-                        }
-                    ]
-                }
-            ]
-        }
-        mocker.patch("structlog.getLogger")
 
         article = {
             "channels": ["channel1", "channel2"],
@@ -159,28 +178,19 @@ class TestGetPredictedChannel:
             "description": "This is an article description",
         }
 
-        result = get_predicted_channels(article)
+        stub_api.categories = [
+            {
+                "name": valid_category,
+                "confidence": config.nu_confidence_threshold / 2,
+            }
+        ]
+        (result,) = self.predict(engine, [article])
 
         assert valid_category not in result["channels"]
 
-    def test_predict_channel(self, mocker):
+    def test_predict_channel(self, engine, stub_api):
         logger.info("\n--- test_predict_channel ---")
-        mock_post = mocker.patch("requests.post")
-        mock_post.return_value.raise_for_status.return_value = None
         valid_category = "Sports"
-        mock_post.return_value.json.return_value = {
-            "results": [
-                {
-                    "categories": [
-                        {
-                            "name": valid_category,
-                            "confidence": config.nu_confidence_threshold,
-                        }
-                    ]
-                }
-            ]
-        }
-        mocker.patch("structlog.getLogger")
 
         article = {
             "channels": ["channel1", "channel2"],
@@ -188,28 +198,16 @@ class TestGetPredictedChannel:
             "description": "This is an article description",
         }
 
-        result = get_predicted_channels(article)
+        stub_api.categories = [
+            {"name": valid_category, "confidence": config.nu_confidence_threshold}
+        ]
+        (result,) = self.predict(engine, [article])
 
         assert result["channels"] == [valid_category]
 
-    def test_predict_channel_with_augment_channel(self, mocker):
+    def test_predict_channel_with_augment_channel(self, engine, stub_api):
         logger.info("\n--- test_predict_channel_with_augment_channel ---")
-        mock_post = mocker.patch("requests.post")
-        mock_post.return_value.raise_for_status.return_value = None
         valid_category = "Sports"
-        mock_post.return_value.json.return_value = {
-            "results": [
-                {
-                    "categories": [
-                        {
-                            "name": valid_category,
-                            "confidence": config.nu_confidence_threshold,
-                        }
-                    ]
-                }
-            ]
-        }
-        mocker.patch("structlog.getLogger")
 
         article_1 = {
             "channels": ["Politics", "Top Sources"],
@@ -223,30 +221,17 @@ class TestGetPredictedChannel:
             "description": "This is an article description",
         }
 
-        result_1 = get_predicted_channels(article_1)
-        result_2 = get_predicted_channels(article_2)
+        stub_api.categories = [
+            {"name": valid_category, "confidence": config.nu_confidence_threshold}
+        ]
+        result_1, result_2 = self.predict(engine, [article_1, article_2])
 
         assert set(result_1["channels"]) == set(["Top Sources", valid_category])
         assert set(result_2["channels"]) == {"Top News", "Top Sources", valid_category}
 
-    def test_predict_channel_with_default_channel(self, mocker):
+    def test_predict_channel_with_default_channel(self, engine, stub_api):
         logger.info("\n--- test_predict_channel_with_default_channel ---")
-        mock_post = mocker.patch("requests.post")
-        mock_post.return_value.raise_for_status.return_value = None
         valid_category = "Sports"
-        mock_post.return_value.json.return_value = {
-            "results": [
-                {
-                    "categories": [
-                        {
-                            "name": valid_category,
-                            "confidence": config.nu_confidence_threshold,
-                        }
-                    ]
-                }
-            ]
-        }
-        mocker.patch("structlog.getLogger")
 
         article_1 = {
             "channels": ["Fun", "Top Sources"],
@@ -260,8 +245,77 @@ class TestGetPredictedChannel:
             "description": "This is an article description",
         }
 
-        result_1 = get_predicted_channels(article_1)
-        result_2 = get_predicted_channels(article_2)
+        stub_api.categories = [
+            {"name": valid_category, "confidence": config.nu_confidence_threshold}
+        ]
+        result_1, result_2 = self.predict(engine, [article_1, article_2])
 
         assert set(result_1["channels"]) == set(["Top Sources", "Fun"])
         assert set(result_2["channels"]) == set(["Fun"])
+
+
+class TestExternalChannels:
+    # Creates one Natural Language client per process.
+    def test_shared_gcp_client(self, mocker):
+        mocker.patch("config.language_v1.LanguageServiceClient")
+        mocker.patch.object(config, "_gcp_client", None)
+
+        assert config.gcp_client() is config.gcp_client()
+
+    # Does not classify again an article whose classification is given.
+    def test_given_classification(self, mocker):
+        classify = mocker.patch(
+            "aggregator.external_services.get_external_predicted_channels"
+        )
+        article = {
+            "channels": ["Top News"],
+            "title": "This is an article title",
+            "description": "This is an article description",
+        }
+
+        result = get_external_channels_for_article(article, [])
+
+        assert result == (article, ["Top News"], [])
+        classify.assert_not_called()
+
+    # Classifies the texts shared by several articles once, skips the classified articles, and does not
+    # store the failed classifications.
+    def test_classify_articles(self, mocker):
+        mocker.patch("aggregator.aggregate.insert_aggregation_stats")
+        mocker.patch(
+            "aggregator.aggregate.get_classified_url_hashes", return_value={"hash1"}
+        )
+        classify = mocker.patch(
+            "aggregator.aggregate.get_external_predicted_channels",
+            side_effect=lambda text: None if "failing" in text else [],
+        )
+        insert_external_channels = mocker.patch(
+            "aggregator.aggregate.insert_external_channels"
+        )
+        articles = [
+            {
+                "url_hash": f"hash{index}",
+                "channels": ["Top News"],
+                "title": title,
+                "description": "This is an article description",
+            }
+            for index, title in enumerate(
+                ["Classified article", "Shared title", "Shared title", "failing title"],
+                start=1,
+            )
+        ]
+
+        aggregator = Aggregator({}, None)
+        try:
+            aggregator.classify_articles(articles, None)
+        finally:
+            aggregator.close()
+
+        assert sorted(call.args[0] for call in classify.call_args_list) == [
+            "Shared title This is an article description",
+            "failing title This is an article description",
+        ]
+        assert [call.args[0] for call in insert_external_channels.call_args_list] == [
+            "hash2",
+            "hash3",
+        ]
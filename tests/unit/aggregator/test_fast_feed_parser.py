@@ -0,0 +1,72 @@
+import feedparser
+import pytest
+
+from aggregator.fast_feed_parser import parse_feed
+from aggregator.parser import parse_rss
+from config import get_config
+
+config = get_config()
+
+ENTRY_FIELDS = ["title", "link", "summary", "published", "updated", "category"]
+
+ATOM_FEED = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example Feed</title>
+  <updated>2024-01-01T00:00:00Z</updated>
+  <entry>
+    <title type="html">Article &lt;b&gt;1&lt;/b&gt;</title>
+    <link rel="alternate" href="https://example.com/articles/1"/>
+    <link rel="enclosure" href="https://example.com/1.mp3" type="audio/mpeg" length="3"/>
+    <published>2023-12-31T00:00:00Z</published>
+    <summary>Summary of the article</summary>
+    <content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml"><p>Content</p></div></content>
+  </entry>
+</feed>"""
+
+
+class TestParseFeed:
+    # Extracts the same fields as feedparser from an RSS feed.
+    def test_rss(self):
+        data = open(config.tests_data_dir / "test.rss", "rb").read()
+
+        expected = feedparser.parse(data)
+        result = parse_feed(data)
+
+        assert result["feed"]["updated"] == expected["feed"]["updated"]
+        assert len(result["entries"]) == len(expected["entries"])
+        for entry, expected_entry in zip(result["entries"], expected["entries"]):
+            for field in ENTRY_FIELDS:
+                assert entry.get(field) == expected_entry.get(field)
+            assert entry.get("media_content") == expected_entry.get("media_content")
+
+    # Extracts the same fields as feedparser from an Atom feed.
+    def test_atom(self):
+        expected = feedparser.parse(ATOM_FEED)["entries"][0]
+        entry = parse_feed(ATOM_FEED)["entries"][0]
+
+        for field in ENTRY_FIELDS:
+            assert entry.get(field) == expected.get(field)
+        assert entry["content"][0]["value"] == expected["content"][0]["value"]
+        assert entry["enclosures"] == expected["enclosures"]
+
+    # Rejects the feeds that are neither RSS 2.0 nor Atom.
+    def test_unsupported_format(self):
+        with pytest.raises(ValueError):
+            parse_feed(
+                b'<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"/>'
+            )
+
+
+class TestParseRssFastParser:
+    # Falls back to feedparser for the feeds the fast parser can not parse.
+    def test_fallback(self, monkeypatch):
+        monkeypatch.setattr(config, "fast_feed_parser", True)
+        downloaded_feed = {
+            "key": "https://example.com/rss_feed",
+            "feed_cache": "<rss version='2.0'><channel><item><title>Article&nbsp;1</title>"
+            "<link>https://example.com/articles/1</link></item></channel></rss>",
+        }
+
+        result = parse_rss(downloaded_feed)
+
+        assert result["feed_cache"]["entries"][0]["title"] == "Article\xa01"
@@ -0,0 +1,62 @@
+import asyncio
+
+import httpx
+
+from aggregator.fetch_engine import FetchEngine
+
+
+def mock_engine(handler, **kwargs):
+    engine = FetchEngine(**kwargs)
+    engine._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return engine
+
+
+class TestFetchEngine:
+    # Runs the coroutine function on all the items and returns the results in order.
+    def test_map(self):
+        async def double(item, engine):
+            await asyncio.sleep(0)
+            return item * 2
+
+        engine = FetchEngine()
+        try:
+            assert engine.map(double, [1, 2, 3]) == [2, 4, 6]
+        finally:
+            engine.close()
+
+    # Returns None for the items that raised an exception.
+    def test_map_exception(self):
+        def fail_on_two(item):
+            if item == 2:
+                raise ValueError("failed")
+            return item
+
+        engine = FetchEngine()
+        try:
+            assert engine.map_sync(fail_on_two, [1, 2, 3]) == [1, None, 3]
+        finally:
+            engine.close()
+
+    # Does not send more requests to a host than the per host limit.
+    def test_per_host_concurrency(self):
+        in_flight = {"current": 0, "max": 0}
+
+        async def fetch(item, engine):
+            return await engine.request("GET", f"https://example.com/{item}")
+
+        async def slow_request(method, url, **kwargs):
+            in_flight["current"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["current"])
+            await asyncio.sleep(0.01)
+            in_flight["current"] -= 1
+            return httpx.Response(200, content=b"ok")
+
+        engine = mock_engine(lambda request: None, per_host_concurrency=2)
+        engine._client.request = slow_request
+        try:
+            results = engine.map(fetch, range(10))
+        finally:
+            engine.close()
+
+        assert all(result.status_code == 200 for result in results)
+        assert in_flight["max"] == 2
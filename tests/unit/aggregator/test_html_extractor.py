@@ -0,0 +1,51 @@
+import pytest
+from bs4 import BeautifulSoup as BS
+
+from aggregator.html_extractor import extract_html, first_img_src, html_to_text
+
+DOCUMENTS = [
+    "",
+    "Plain title",
+    "\r\n",
+    "Tom &amp; Jerry &amp &foo; &#147;quoted&#148; &#x2019;",
+    "<p>First <b>bold</b></p>\n<p>Second</p>",
+    "<script>var a = '<b>';</script><style>p {}</style>Text",
+    "<!-- comment --><![CDATA[data]]><template>hidden</template>",
+    "<pre>\n</pre><div>\n</div>",
+    "a < b </div> c > d",
+]
+
+
+class TestHtmlToText:
+    # Gets the same text as BeautifulSoup.
+    @pytest.mark.parametrize("html", DOCUMENTS)
+    def test_same_as_beautiful_soup(self, html):
+        assert html_to_text(html) == BS(html, features="html.parser").get_text()
+
+    # Returns the documents without markup as they are.
+    def test_no_markup(self, mocker):
+        mock_extractor = mocker.patch("aggregator.html_extractor._HtmlExtractor")
+
+        assert html_to_text("No markup in this title") == "No markup in this title"
+        mock_extractor.assert_not_called()
+
+
+class TestFirstImgSrc:
+    # Gets the src of the first image with a src attribute.
+    def test_first_img(self):
+        html = "<p><img alt='no src'><IMG SRC='first.jpg'><img src='second.jpg'></p>"
+
+        assert first_img_src(html) == "first.jpg"
+
+    # Returns None when there is no image.
+    def test_no_img(self):
+        assert first_img_src("<p>No image</p>") is None
+
+    # Gets the text and the image in one scan.
+    def test_single_scan(self):
+        extract_html.cache_clear()
+        html = "<p>Text <img src='image.jpg'></p>"
+
+        assert html_to_text(html) == "Text "
+        assert first_img_src(html) == "image.jpg"
+        assert extract_html.cache_info().misses == 1
@@ -126,18 +126,18 @@ class TestCheckImagesInItem:
 class TestGetArticleImg:
     def test_returns_image_url_from_image_key(self, mocker):
         article = {"image": "https://example.com/image.jpg"}
-        mocker.patch("src.aggregator.image_fetcher.BS")
+        mocker.patch("src.aggregator.image_fetcher.first_img_src")
         result = get_article_img(article)
         assert result == "https://example.com/image.jpg"
 
     def test_returns_empty_string_if_image_key_is_empty(self, mocker):
         article = {"image": ""}
-        mocker.patch("src.aggregator.image_fetcher.BS")
+        mocker.patch("src.aggregator.image_fetcher.first_img_src")
         result = get_article_img(article)
         assert result == ""
 
     def test_returns_empty_string_if_urlToImage_key_is_empty(self, mocker):
         article = {"urlToImage": ""}
-        mocker.patch("src.aggregator.image_fetcher.BS")
+        mocker.patch("src.aggregator.image_fetcher.first_img_src")
         result = get_article_img(article)
         assert result == ""
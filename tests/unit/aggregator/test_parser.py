@@ -1,47 +1,175 @@
+import feedparser
+import httpx
 import pytest
 from requests import HTTPError
 
-from aggregator.parser import download_feed, get_with_max_size, parse_rss
+from aggregator.fetch_engine import FetchEngine
+from aggregator.parser import (
+    download_feed_async,
+    feed_urls,
+    get_with_validators_async,
+    parse_rss,
+)
 
 
-class TestGetWithMaxSize:
+def mock_engine(handler):
+    engine = FetchEngine()
+    engine._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return engine
+
+
+def run(engine, coroutine):
+    try:
+        return engine.loop.run_until_complete(coroutine)
+    finally:
+        engine.close()
+
+
+class TestGetWithValidators:
     # Successfully retrieves content from a URL
     def test_retrieves_content(self):
-        # Arrange
-        url = "http://example.com"
+        engine = FetchEngine()
 
-        # Act
-        result = get_with_max_size(url)
+        result = run(
+            engine, get_with_validators_async("http://example.com", engine=engine)
+        )
 
-        # Assert
-        assert result is not None
-        assert isinstance(result, bytes)
+        assert isinstance(result["content"], bytes)
 
     # Raises HTTPError for non-200 status codes
     def test_raises_http_error(self):
-        # Arrange
-        url = "http://example.com/nonexistent"
+        engine = mock_engine(lambda request: httpx.Response(404))
 
-        # Act & Assert
-        with pytest.raises(HTTPError):
-            get_with_max_size(url)
+        with pytest.raises(httpx.HTTPStatusError):
+            run(
+                engine,
+                get_with_validators_async.__wrapped__(
+                    "http://example.com/nonexistent", engine=engine
+                ),
+            )
 
 
 class TestDownloadFeed:
     # Downloading a feed with a valid URL and default max_feed_size.
     def test_valid_url_default_max_feed_size(self):
-        feed_url = "https://brave.com/blog/index.xml"
-        result = download_feed(feed_url)
+        engine = FetchEngine()
+
+        result = run(
+            engine, download_feed_async("https://brave.com/blog/index.xml", engine)
+        )
+
         assert result is not None
         assert "feed_cache" in result
         assert "key" in result
 
     # Downloading a feed with an invalid URL.
-    def test_invalid_url(self):
-        feed_url = "https://example.com/invalid_feed"
-        result = download_feed(feed_url)
+    def test_invalid_url(self, mocker):
+        mocker.patch("utils.asyncio.sleep")
+        engine = mock_engine(lambda request: httpx.Response(404))
+
+        result = run(
+            engine, download_feed_async("https://example.com/invalid_feed", engine)
+        )
+
         assert result is None
 
+    # Downloads a feed with its validators.
+    def test_download_feed(self):
+        def handler(request):
+            return httpx.Response(200, content=b"<rss></rss>", headers={"ETag": '"v1"'})
+
+        engine = mock_engine(handler)
+
+        result = run(
+            engine, download_feed_async("https://example.com/rss_feed", engine)
+        )
+
+        assert result["feed_cache"] == b"<rss></rss>"
+        assert result["validators"]["etag"] == '"v1"'
+
+    # Downloading a feed that was not modified since the last download.
+    def test_not_modified_feed(self):
+        def handler(request):
+            assert request.headers["If-None-Match"] == '"v1"'
+            return httpx.Response(304)
+
+        validators = {"etag": '"v1"', "last_modified": None, "content_hash": "hash"}
+        engine = mock_engine(handler)
+
+        result = run(
+            engine,
+            download_feed_async(
+                "https://example.com/rss_feed", engine, validators=validators
+            ),
+        )
+
+        assert result["not_modified"] is True
+        assert "feed_cache" not in result
+
+    # Downloading a feed with the same content as the last download.
+    def test_unchanged_feed_content(self):
+        engine = mock_engine(
+            lambda request: httpx.Response(200, content=b"<rss></rss>")
+        )
+
+        async def download_twice():
+            first = await download_feed_async("https://example.com/rss_feed", engine)
+            second = await download_feed_async(
+                "https://example.com/rss_feed", engine, validators=first["validators"]
+            )
+            return first, second
+
+        first, second = run(engine, download_twice())
+
+        assert first["feed_cache"] == b"<rss></rss>"
+        assert second["not_modified"] is True
+
+    # Downloading a feed larger than the maximum size without a Content-Length.
+    def test_chunked_feed_too_large(self):
+        async def body():
+            for _ in range(3):
+                yield b"x" * 8
+
+        engine = mock_engine(lambda request: httpx.Response(200, content=body()))
+
+        with pytest.raises(ValueError):
+            run(
+                engine,
+                get_with_validators_async.__wrapped__(
+                    "https://example.com/rss_feed", max_bytes=10, engine=engine
+                ),
+            )
+
+    # Downloading a feed from its original URL when the feed URL fails.
+    def test_fallback_urls(self, mocker):
+        response = {
+            "not_modified": False,
+            "content": b"<rss></rss>",
+            "etag": None,
+            "last_modified": None,
+        }
+        mock_get = mocker.patch(
+            "aggregator.parser.get_with_validators_async",
+            side_effect=[HTTPError(), HTTPError(), response],
+        )
+        engine = FetchEngine()
+
+        urls = feed_urls(
+            "https://example.com/rss_feed", "https://example.org/original_feed"
+        )
+        result = run(
+            engine,
+            download_feed_async("https://example.com/rss_feed", engine, urls=urls),
+        )
+
+        assert [call.args[0] for call in mock_get.call_args_list] == [
+            "https://example.com/rss_feed",
+            "http://example.com/rss_feed",
+            "https://example.org/original_feed",
+        ]
+        assert result["key"] == "https://example.com/rss_feed"
+        assert result["url"] == "https://example.org/original_feed"
+
 
 class TestParseRss:
     # Successfully parse a downloaded RSS feed with at least one article.
@@ -57,10 +185,13 @@ class TestParseRss:
         assert result is not None
 
     # Fail to parse a downloaded RSS feed with no articles.
-    def test_parse_rss_failure(self):
+    def test_parse_rss_failure(self, mocker):
+        mock_parse = mocker.spy(feedparser, "parse")
         downloaded_feed = {
             "key": "https://example.com/rss_feed",
             "feed_cache": "<rss version='2.0'><channel><title>Example Feed</title></channel></rss>",
         }
 
         assert parse_rss(downloaded_feed) is None
+        # The feed is not downloaded again by URL while parsing.
+        assert mock_parse.call_count == 1
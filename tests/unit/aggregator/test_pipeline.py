@@ -0,0 +1,80 @@
+import asyncio
+
+from aggregator.pipeline import Pipeline
+
+
+async def double(item):
+    await asyncio.sleep(0)
+    return item * 2
+
+
+async def drop_odd(item):
+    return item if item % 2 == 0 else None
+
+
+async def split(item):
+    return [item, item + 1]
+
+
+async def fail_on_four(item):
+    if item == 4:
+        raise ValueError("failed")
+    return item
+
+
+class TestPipeline:
+    # Runs all the items through all the stages.
+    def test_run(self):
+        pipeline = Pipeline(queue_size=2).add_stage("double", double, workers=3)
+        pipeline.add_stage("drop_odd", drop_odd, workers=2)
+
+        results = asyncio.run(pipeline.run(range(10)))
+
+        assert sorted(results) == [0, 2, 4, 6, 8, 10, 12, 14, 16, 18]
+
+    # Passes every item of the list returned by a fan out stage to the next stage.
+    def test_fan_out(self):
+        pipeline = Pipeline(queue_size=1).add_stage("split", split, 2, fan_out=True)
+        pipeline.add_stage("drop_odd", drop_odd, workers=2)
+
+        results = asyncio.run(pipeline.run([1, 3, 5]))
+
+        assert sorted(results) == [2, 4, 6]
+
+    # Runs a stage given no workers with a single worker instead of dropping all the items.
+    def test_no_workers(self):
+        pipeline = Pipeline(queue_size=1).add_stage("double", double, workers=0)
+        pipeline.add_stage("drop_odd", drop_odd, workers=1)
+
+        results = asyncio.run(pipeline.run(range(5)))
+
+        assert sorted(results) == [0, 2, 4, 6, 8]
+
+    # Drops the items for which a stage failed.
+    def test_stage_exception(self):
+        pipeline = Pipeline(queue_size=1).add_stage("fail", fail_on_four, workers=1)
+        pipeline.add_stage("double", double, workers=1)
+
+        results = asyncio.run(pipeline.run(range(6)))
+
+        assert sorted(results) == [0, 2, 4, 6, 10]
+
+    # Starts the next stage before the previous stage is done with all the items.
+    def test_streaming(self):
+        events = []
+
+        async def first(item):
+            events.append(("first", item))
+            await asyncio.sleep(0.01)
+            return item
+
+        async def second(item):
+            events.append(("second", item))
+            return item
+
+        pipeline = Pipeline(queue_size=1).add_stage("first", first, workers=1)
+        pipeline.add_stage("second", second, workers=1)
+
+        asyncio.run(pipeline.run(range(3)))
+
+        assert events.index(("second", 0)) < events.index(("first", 2))
@@ -0,0 +1,158 @@
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from aggregator.popularity_client import PopularityClient
+from config import get_config
+
+config = get_config()
+
+BATCH_ENDPOINT = "https://pop.example.com/batch"
+
+
+def article(index):
+    return {"url": f"https://example.com/{index}", "url_hash": f"hash{index}"}
+
+
+def pop_response(score):
+    return {"popularity": {"popularity": {"score": score}}}
+
+
+class StubPopularityApi:
+    """
+    Answers the batch and the single URL requests of the popularity API with the index of the article as score.
+    """
+
+    def __init__(self, fail_batches=False):
+        self.requests = []
+        self.fail_batches = fail_batches
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if request.method == "POST":
+            if self.fail_batches:
+                return httpx.Response(503)
+            urls = orjson.loads(request.content)["urls"]
+            return httpx.Response(
+                200,
+                content=orjson.dumps(
+                    {url: pop_response(int(url.rsplit("/", 1)[1])) for url in urls}
+                ),
+            )
+        url = str(request.url)
+        return httpx.Response(
+            200, content=orjson.dumps(pop_response(int(url.rsplit("/", 1)[1])))
+        )
+
+
+@pytest.fixture
+def stub_api():
+    return StubPopularityApi()
+
+
+@pytest.fixture
+def cached_scores(cached_lookup):
+    return cached_lookup("aggregator.popularity_client.get_popularity_scores")
+
+
+@pytest.fixture(autouse=True)
+def pop_config(monkeypatch):
+    monkeypatch.setattr(config, "bs_pop_endpoint", "https://pop.example.com/?url=")
+    monkeypatch.setattr(config, "pop_score_batch_enabled", True)
+    monkeypatch.setattr(config, "bs_pop_batch_endpoint", BATCH_ENDPOINT)
+    monkeypatch.setattr(config, "pop_score_batch_size", 2)
+
+
+class TestPopularityClient:
+    # Sends the URLs to the batch endpoint in batches of the configured size.
+    def test_batches(self, engine, stub_api, cached_scores):
+        client = PopularityClient(engine, "en_US")
+
+        result = engine.loop.run_until_complete(
+            client.score_articles([article(index) for index in range(1, 4)])
+        )
+
+        assert [item["pop_score"] for item in result] == [1, 2, 3]
+        assert [request.method for request in stub_api.requests] == ["POST", "POST"]
+        assert client.fetched_scores == {"hash1": 1, "hash2": 2, "hash3": 3}
+
+    # Sends a request per URL when the batches are not enabled, even with a batch endpoint.
+    def test_batches_disabled(self, engine, stub_api, cached_scores, monkeypatch):
+        monkeypatch.setattr(config, "pop_score_batch_enabled", False)
+        client = PopularityClient(engine, "en_US")
+
+        result = engine.loop.run_until_complete(
+            client.score_articles([article(1), article(2)])
+        )
+
+        assert [item["pop_score"] for item in result] == [1, 2]
+        assert [request.method for request in stub_api.requests] == ["GET", "GET"]
+
+    # Reuses the cached scores and the scores fetched before, and counts the cache hits.
+    def test_cache_hits(self, engine, stub_api, cached_scores):
+        cached_scores["hash1"] = 10.0
+        client = PopularityClient(engine, "en_US")
+
+        engine.loop.run_until_complete(client.score_articles([article(1), article(2)]))
+        result = engine.loop.run_until_complete(
+            client.score_articles([article(1), article(2)])
+        )
+
+        assert [item["pop_score"] for item in result] == [10.0, 2]
+        assert len(stub_api.requests) == 1
+        assert orjson.loads(stub_api.requests[0].content) == {
+            "urls": [article(2)["url"]]
+        }
+        assert (client.hits, client.misses) == (3, 1)
+        assert client.hit_rate == 0.75
+        assert client.fetched_scores == {"hash2": 2}
+
+    # Falls back to a request per URL when a batch request fails.
+    def test_batch_failure(self, engine, stub_api, cached_scores):
+        stub_api.fail_batches = True
+        client = PopularityClient(engine, "en_US")
+
+        result = engine.loop.run_until_complete(client.score_articles([article(1)]))
+
+        assert result[0]["pop_score"] == 1
+        assert [request.method for request in stub_api.requests] == ["POST", "GET"]
+
+    # Does not cache the scores that could not be fetched.
+    @pytest.mark.parametrize("stub_api", [lambda request: httpx.Response(500)])
+    def test_failure_not_cached(self, engine, cached_scores, monkeypatch):
+        monkeypatch.setattr(config, "bs_pop_batch_endpoint", None)
+        client = PopularityClient(engine, "en_US")
+
+        result = engine.loop.run_until_complete(client.score_articles([article(1)]))
+
+        assert result[0]["pop_score"] == 1.0
+        assert client.fetched_scores == {}
+
+    # Batches the articles scored one at a time.
+    def test_score_article(self, engine, stub_api, cached_scores):
+        client = PopularityClient(engine, "en_US")
+
+        async def score_all():
+            return await asyncio.gather(
+                *[client.score_article(article(index)) for index in range(1, 4)]
+            )
+
+        result = engine.loop.run_until_complete(score_all())
+
+        assert [item["pop_score"] for item in result] == [1, 2, 3]
+        assert [request.method for request in stub_api.requests] == ["POST", "POST"]
+
+    # Stores the fetched scores in the cache.
+    def test_save(self, engine, cached_scores, mocker):
+        update_popularity_scores = mocker.patch(
+            "aggregator.popularity_client.update_popularity_scores"
+        )
+        client = PopularityClient(engine, "en_US")
+        engine.loop.run_until_complete(client.score_articles([article(1)]))
+
+        client.save()
+
+        update_popularity_scores.assert_called_once_with({"hash1": 1})
+        assert client.fetched_scores == {}
@@ -1,14 +1,10 @@
 import hashlib
-import sys
 from datetime import datetime
-from unittest.mock import MagicMock
 
 import pytz
 
-sys.modules["db_crud"] = MagicMock()
-sys.modules["db_crud"].get_article = MagicMock(return_value=None)
-
-from aggregator.processor import (  # noqa: E402
+from aggregator.processor import (
+    is_publisher_link,
     process_articles,
     scrub_html,
     unshorten_url,
@@ -87,7 +83,10 @@ class TestProcessArticles:
 
     # Skip processing an article with a profanity in the title.
     def test_skip_article_with_profanity_in_title(self, mocker):
-        mocker.patch("better_profanity.profanity.contains_profanity", return_value=True)
+        mocker.patch(
+            "aggregator.processor.profanity_matcher.contains_profanity",
+            return_value=True,
+        )
 
         article = {
             "title": "Example Article with profanity",
@@ -118,10 +117,8 @@ class TestProcessArticles:
 class TestUnshortenUrl:
     # Unshortens a valid URL.
     def test_unshorten_valid_url(self, mocker):
-        mock_unshortener = mocker.Mock()
-        mocker.patch("unshortenit.UnshortenIt", return_value=mock_unshortener)
-
-        mock_unshortener.unshorten.return_value = "https://example.com"
+        mock_get = mocker.patch("aggregator.processor.get_session").return_value.get
+        mock_get.return_value.__enter__.return_value.url = "https://example.com"
 
         # Create the input article
         out_article = {
@@ -160,6 +157,23 @@ class TestUnshortenUrl:
         assert result is None
 
 
+class TestIsPublisherLink:
+    # Matches the HTTPS links of the publisher domains and their subdomains.
+    def test_publisher_link(self):
+        domains = {"example.com"}
+
+        assert is_publisher_link("https://example.com/article", domains)
+        assert is_publisher_link("https://www.example.com/article", domains)
+
+    # Does not match the other links, nor the plain HTTP links that may redirect to HTTPS.
+    def test_other_link(self):
+        domains = {"example.com"}
+
+        assert not is_publisher_link("https://bit.ly/3i2QJgA", domains)
+        assert not is_publisher_link("https://notexample.com/article", domains)
+        assert not is_publisher_link("http://example.com/article", domains)
+
+
 class TestScrubHtml:
     # Scrubs HTML content in a dictionary with valid HTML tags and attributes.
     def test_valid_html_tags_and_attributes(self):
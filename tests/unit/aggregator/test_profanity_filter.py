@@ -0,0 +1,45 @@
+import pytest
+from better_profanity import Profanity
+
+from aggregator.profanity_filter import custom_badwords, load_profanity_matcher
+
+TITLES = [
+    "",
+    "a",
+    "breaking news: markets rally",
+    "the assessment of the class",
+    "what the fuck",
+    "what the f*ck happened",
+    "sh1t happens",
+    "s.h.i.t. happens",
+    "a hand job offer",
+    "hand  job",
+    "blue waffle recipes",
+    "as s",
+    "new vibrators on sale",
+    "scunthorpe united wins",
+    "…bitch!",
+]
+
+
+class TestProfanityMatcher:
+    # Gives the same result as better_profanity with the custom words.
+    @pytest.mark.parametrize("title", TITLES)
+    def test_same_as_better_profanity(self, title):
+        profanity = Profanity()
+        profanity.add_censor_words(custom_badwords)
+
+        matcher = load_profanity_matcher("en_US")
+
+        assert matcher.contains_profanity(title) == profanity.contains_profanity(title)
+
+    # Filters the words of the wordlist of the locale.
+    def test_locale_wordlist(self, tmp_path):
+        (tmp_path / "de_DE.txt").write_text("scheisse\n")
+
+        assert load_profanity_matcher("de_DE", tmp_path).contains_profanity(
+            "so eine scheisse"
+        )
+        assert not load_profanity_matcher("en_US", tmp_path).contains_profanity(
+            "so eine scheisse"
+        )
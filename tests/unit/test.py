@@ -9,7 +9,8 @@ import os
 import feedparser
 
 from aggregator.aggregate import Aggregator
-from aggregator.parser import download_feed, score_entries
+from aggregator.fetch_engine import FetchEngine
+from aggregator.parser import download_feed_async, score_entries
 from aggregator.processor import scrub_html
 from config import get_config
 
@@ -17,7 +18,13 @@ config = get_config()
 
 
 def test_feed_processor_download():
-    result = download_feed("https://brave.com/blog/index.xml")
+    engine = FetchEngine()
+    try:
+        result = engine.loop.run_until_complete(
+            download_feed_async("https://brave.com/blog/index.xml", engine)
+        )
+    finally:
+        engine.close()
     assert result
 
 
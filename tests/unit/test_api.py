@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import article
+from config import get_config
+from db_crud import article_fields, encode_article_cursor
+
+config = get_config()
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(article.router)
+    return TestClient(
+        app, headers={"Authorization": f"Bearer {config.news_data_api_token}"}
+    )
+
+
+class TestArticles:
+    # Returns the requested fields of a page of the articles, with the cursor of the next page in a header.
+    def test_fields(self, client, mocker):
+        get_articles = mocker.patch(
+            "api.article.get_articles", return_value=([{"title": "Title"}], "next")
+        )
+
+        response = client.get(
+            "/api/articles",
+            params={
+                "start_datetime": "2023-01-01T00:00:00",
+                "fields": ["title", "url"],
+                "page_size": 1000,
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.json() == [{"title": "Title"}]
+        assert response.headers["X-Next-Cursor"] == "next"
+        args = get_articles.call_args.args
+        assert (args[0], args[-1]) == (["title", "url"], 1000)
+
+    # Returns all the fields by default.
+    def test_default_fields(self, client, mocker):
+        get_articles = mocker.patch("api.article.get_articles", return_value=([], None))
+
+        response = client.get(
+            "/api/articles", params={"start_datetime": "2023-01-01T00:00:00"}
+        )
+
+        assert response.status_code == 200
+        assert get_articles.call_args.args[0] == list(article_fields)
+
+    # Rejects the unknown fields and the pages of more than 1000 articles.
+    @pytest.mark.parametrize(
+        "params, status_code",
+        [
+            ({"fields": ["title", "password"]}, 400),
+            ({"page_size": 1001}, 422),
+            ({"page_size": 0}, 422),
+            ({"cursor": "invalid"}, 400),
+        ],
+    )
+    def test_invalid(self, client, mocker, params, status_code):
+        get_articles = mocker.patch("api.article.get_articles", return_value=([], None))
+
+        response = client.get(
+            "/api/articles", params={"start_datetime": "2023-01-01T00:00:00", **params}
+        )
+
+        assert response.status_code == status_code
+        get_articles.assert_not_called()
+
+
+class TestArticlesWithLocale:
+    # Returns a page of the articles with the cursor of the next page in a header.
+    def test_page(self, client, mocker):
+        get_articles_with_locale = mocker.patch(
+            "api.article.get_articles_with_locale",
+            return_value=([{"url_hash": "hash1"}], "next"),
+        )
+
+        response = client.post(
+            "/api/articles_with_locale",
+            json={"locale": "en_US", "cursor": None, "page_size": 1},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == [{"url_hash": "hash1"}]
+        assert response.headers["X-Next-Cursor"] == "next"
+        assert get_articles_with_locale.call_args.args[2:] == (None, 1)
+
+    # Passes a valid cursor, and rejects an invalid one.
+    def test_cursor(self, client, mocker):
+        get_articles_with_locale = mocker.patch(
+            "api.article.get_articles_with_locale", return_value=([], None)
+        )
+        cursor = encode_article_cursor(mocker.Mock(created=datetime(2023, 1, 1), id=1))
+
+        response = client.post(
+            "/api/articles_with_locale", json={"locale": "en_US", "cursor": cursor}
+        )
+        assert response.status_code == 200
+        assert "X-Next-Cursor" not in response.headers
+        assert get_articles_with_locale.call_args.args[2] == cursor
+
+        response = client.post(
+            "/api/articles_with_locale", json={"locale": "en_US", "cursor": "invalid"}
+        )
+        assert response.status_code == 400
+
+    # Streams all the articles as newline delimited JSON.
+    def test_stream(self, client, mocker):
+        async def stream(locale, start_datetime):
+            for index in range(3):
+                yield {"url_hash": f"hash{index}", "locale": locale}
+
+        mocker.patch("api.article.stream_articles_with_locale", stream)
+
+        response = client.post(
+            "/api/articles_with_locale", json={"locale": "en_US", "stream": True}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.text.splitlines() == [
+            f'{{"url_hash":"hash{index}","locale":"en_US"}}' for index in range(3)
+        ]
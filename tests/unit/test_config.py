@@ -0,0 +1,68 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Configuration
+
+
+def configuration():
+    return Configuration(database_url="postgres://localhost:5432/news", db_pool_size=3)
+
+
+class TestDbEngine:
+    # Creates the engine once, with the pool of the config, and binds all the sessions to it.
+    def test_shared_engine(self):
+        config = configuration()
+
+        engine = config.get_db_engine()
+
+        assert config.get_db_engine() is engine
+        assert engine.pool.size() == 3
+        assert config.get_db_session().get_bind() is engine
+        assert config.get_db_session().get_bind() is engine
+
+    # Creates a single engine when the threads of a process get it concurrently.
+    def test_threads(self):
+        config = configuration()
+
+        with ThreadPoolExecutor(8) as executor:
+            engines = list(executor.map(lambda _: config.get_db_engine(), range(32)))
+
+        assert all(engine is engines[0] for engine in engines)
+
+    # Creates a new engine in a forked process, without closing the connections of the parent process.
+    def test_forked_process(self, mocker):
+        config = configuration()
+        parent_engine = config.get_db_engine()
+        dispose = mocker.spy(parent_engine, "dispose")
+
+        mocker.patch("config.os.getpid", return_value=os.getpid() + 1)
+        engine = config.get_db_engine()
+
+        assert engine is not parent_engine
+        dispose.assert_called_once_with(close=False)
+        assert config.get_db_session().get_bind() is engine
+
+
+class TestAsyncDbEngine:
+    # Creates the asyncio engine once, with the asyncpg driver and the pool of the config.
+    def test_shared_engine(self):
+        config = configuration()
+
+        engine = config.get_async_db_engine()
+
+        assert config.get_async_db_engine() is engine
+        assert engine.url.drivername == "postgresql+asyncpg"
+        assert engine.pool.size() == 3
+        session = config.get_async_db_session()
+        assert session.bind is engine
+        # The rows returned by the API are read after the session is closed.
+        assert session.sync_session.expire_on_commit is False
+
+    # Creates a new asyncio engine in a forked process.
+    def test_forked_process(self, mocker):
+        config = configuration()
+        parent_engine = config.get_async_db_engine()
+
+        mocker.patch("config.os.getpid", return_value=os.getpid() + 1)
+
+        assert config.get_async_db_engine() is not parent_engine
@@ -0,0 +1,420 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import literal
+from sqlalchemy.dialects import postgresql
+
+from config import Configuration, get_config
+from db.tables.article_cache_record_entity import ArticleCacheRecordEntity
+from db.tables.articles_entity import ArticleEntity
+from db.tables.feed_entity import FeedEntity
+from db.tables.locales_entity import LocaleEntity
+from db_crud import (
+    _articles_query,
+    bulk_upsert_articles,
+    decode_article_cursor,
+    encode_article_cursor,
+    get_articles_by_url_hashes,
+    get_articles_with_locale,
+    get_publisher_with_locale,
+    get_publishers_based_on_locale,
+    get_unshortened_urls,
+)
+
+ARTICLES = [
+    {
+        "publisher_id": "publisher",
+        "url": f"https://example.com/{index}",
+        "url_hash": f"hash{index}",
+    }
+    for index in range(1, 4)
+]
+
+config = get_config()
+
+NOW = datetime(2023, 1, 1, 12, 0, 0)
+
+
+class StubSession:
+    """
+    Records the executed statements and returns the given rows.
+    """
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return self.rows
+
+
+class TestGetUnshortenedUrls:
+    # Only returns the final URLs resolved less than the TTL ago, and the recent failures.
+    def test_ttl(self, mocker):
+        mocker.patch("db_crud.datetime").utcnow.return_value = NOW
+        row = mocker.Mock(link="https://bit.ly/1", url=None, url_hash=None)
+        session = StubSession([row])
+
+        result = get_unshortened_urls(["https://bit.ly/1"], db_session=session)
+
+        assert result == {"https://bit.ly/1": {"url": None, "url_hash": None}}
+        params = session.statements[0].compile(dialect=postgresql.dialect()).params
+        cutoffs = {value for value in params.values() if isinstance(value, datetime)}
+        assert cutoffs == {
+            NOW - timedelta(seconds=config.unshortened_url_ttl),
+            NOW - timedelta(seconds=config.unshortened_url_failure_ttl),
+        }
+
+    # Does not query the database without links.
+    def test_no_links(self):
+        session = StubSession()
+
+        assert get_unshortened_urls([], db_session=session) == {}
+        assert session.statements == []
+
+
+class TestBulkUpsertArticles:
+    @staticmethod
+    def session(mocker):
+        session = mocker.MagicMock()
+        session.__enter__.return_value = session
+        query = session.query.return_value
+        query.join.return_value.join.return_value.filter.return_value.all.return_value = [
+            ("publisher", 1)
+        ]
+        query.filter_by.return_value.scalar.return_value = 2
+        return session
+
+    @staticmethod
+    def compiled_statements(session):
+        statements = [call.args[0] for call in session.execute.call_args_list]
+        statements += [call.args[0] for call in session.scalars.call_args_list]
+        return [
+            str(statement.compile(dialect=postgresql.dialect()))
+            for statement in statements
+        ]
+
+    # Upserts the articles on their url_hash and their cache records on the article and the locale.
+    def test_conflict_targets(self, mocker):
+        session = self.session(mocker)
+        session.execute.return_value.all.return_value = [
+            SimpleNamespace(id=1, feed_id=1, inserted=True, created=NOW)
+        ]
+        session.scalars.return_value.all.return_value = [1]
+
+        assert bulk_upsert_articles(ARTICLES, "en_US", None, db_session=session) == 3
+
+        statements = self.compiled_statements(session)
+        article_upsert, cache_record_insert = statements[0], statements[-1]
+        assert article_upsert.startswith("INSERT INTO news.article ")
+        assert "ON CONFLICT (url_hash) DO UPDATE" in article_upsert
+        assert cache_record_insert.startswith("INSERT INTO news.article_cache_record ")
+        assert "ON CONFLICT (article_id, locale_id) DO NOTHING" in cache_record_insert
+
+    # Adds the new articles, and the cache records of the articles of the day, to the cache hit stats.
+    def test_cache_hit_stats(self, mocker):
+        today = datetime.utcnow()
+        session = self.session(mocker)
+        # The feed of the articles is in the locale of the aggregation (2) and in another locale (5).
+        feed_locales = session.query.return_value.filter.return_value.distinct
+        feed_locales.return_value.all.return_value = [(1, 2), (1, 5)]
+        session.execute.return_value.all.return_value = [
+            # Created by this aggregation.
+            SimpleNamespace(id=1, feed_id=1, inserted=True, created=today),
+            # Created today by the aggregation of the other locale.
+            SimpleNamespace(id=2, feed_id=1, inserted=False, created=today),
+            # Created on a previous day.
+            SimpleNamespace(
+                id=3, feed_id=1, inserted=False, created=today - timedelta(days=1)
+            ),
+        ]
+        session.scalars.return_value.all.return_value = [1, 2, 3]
+
+        bulk_upsert_articles(ARTICLES, "en_US", None, db_session=session)
+
+        stats_upsert = session.execute.call_args_list[1].args[0]
+        params = stats_upsert.compile(dialect=postgresql.dialect()).params
+        stats = {
+            params[f"locale_id_m{index}"]: (
+                params[f"article_count_m{index}"],
+                params[f"stored_article_count_m{index}"],
+                params[f"cache_hit_count_m{index}"],
+            )
+            for index in range(2)
+        }
+        assert stats == {2: (1, 1, 2), 5: (1, 0, 0)}
+        assert params["day_m0"] == today.date()
+
+    # Commits every batch, and stores the articles of a failed batch one by one.
+    def test_failed_batch(self, mocker):
+        def upsert(session, rows, locale_id, aggregation_id):
+            if any(row["url_hash"] == "hash2" for row in rows):
+                raise ValueError("bad article")
+
+        upsert_article_rows = mocker.patch(
+            "db_crud._upsert_article_rows", side_effect=upsert
+        )
+        session = self.session(mocker)
+
+        stored = bulk_upsert_articles(
+            ARTICLES, "en_US", "aggregation", db_session=session, batch_size=2
+        )
+
+        assert stored == 2
+        assert [
+            [row["url_hash"] for row in call.args[1]]
+            for call in upsert_article_rows.call_args_list
+        ] == [["hash1", "hash2"], ["hash1"], ["hash2"], ["hash3"]]
+        assert session.commit.call_count == 2
+        assert session.rollback.call_count == 2
+
+
+class TestGetArticlesByUrlHashes:
+    @staticmethod
+    def session(mocker, articles, channel_rows):
+        session = mocker.MagicMock()
+        session.__enter__.return_value = session
+        queries = {
+            ArticleEntity: mocker.MagicMock(),
+            FeedEntity.url_hash: mocker.MagicMock(),
+            LocaleEntity.id: mocker.MagicMock(),
+            ArticleCacheRecordEntity: mocker.MagicMock(),
+        }
+        session.query.side_effect = lambda entity, *args: queries[entity]
+        article_query = queries[ArticleEntity].join.return_value.join.return_value
+        article_query.join.return_value.filter.return_value.options.return_value.all.return_value = (
+            articles
+        )
+        channel_query = queries[FeedEntity.url_hash].join.return_value.join.return_value
+        channel_query.join.return_value.join.return_value.filter.return_value.all.return_value = (
+            channel_rows
+        )
+        locale_query = queries[LocaleEntity.id].filter.return_value
+        locale_query.scalar_subquery.return_value = literal(2)
+        return session, queries[ArticleCacheRecordEntity].filter.return_value
+
+    # Returns the articles with the channels of their feed in the locale, and counts a cache hit for each.
+    def test_lookup(self, mocker):
+        feed = SimpleNamespace(url_hash="feed", name="Feed")
+        articles = [
+            SimpleNamespace(
+                id=index,
+                url_hash=f"hash{index}",
+                url=f"https://example.com/{index}",
+                feed=feed,
+                img="https://example.com/img.jpg",
+                **dict.fromkeys(
+                    ["title", "publish_time", "category", "description", "content_type"]
+                    + ["creative_instance_id", "pop_score", "padded_img", "score"]
+                ),
+            )
+            for index in (1, 2)
+        ]
+        session, cache_records = self.session(
+            mocker, articles, [("feed", "Top News"), ("feed", "Top News")]
+        )
+
+        result = get_articles_by_url_hashes(
+            ["hash1", "hash2", "hash3"], "en_US", db_session=session
+        )
+
+        assert set(result) == {"hash1", "hash2"}
+        assert result["hash1"]["channels"] == ["Top News"]
+        assert result["hash2"]["publisher_id"] == "feed"
+        (values,), _ = cache_records.update.call_args
+        assert str(values[ArticleCacheRecordEntity.cache_hit]) == (
+            "news.article_cache_record.cache_hit + :cache_hit_1"
+        )
+        session.commit.assert_called_once()
+
+    # Does not query the database without url_hashes.
+    def test_no_url_hashes(self, mocker):
+        session = mocker.MagicMock()
+
+        assert get_articles_by_url_hashes([], "en_US", db_session=session) == {}
+        session.query.assert_not_called()
+
+
+class TestGetPublishers:
+    @staticmethod
+    def session(mocker, rows):
+        session = mocker.MagicMock()
+        session.__enter__.return_value = session
+        session.execute.return_value.all.return_value = rows
+        session.execute.return_value.mappings.return_value = rows
+        mocker.patch.object(Configuration, "get_db_session", return_value=session)
+        return session
+
+    @staticmethod
+    def compiled_query(session):
+        session.execute.assert_called_once()
+        (query,), _ = session.execute.call_args
+        return str(query.compile(dialect=postgresql.dialect()))
+
+    # Loads the feeds of the publisher with their locales and channels in one query.
+    def test_publisher_with_locale(self, mocker):
+        feed = dict(
+            site_url="https://example.com",
+            favicon_url=None,
+            cover_url=None,
+            background_color=None,
+            score=0,
+            name="Example",
+            url="https://example.com/feed",
+            category="News",
+            enabled=True,
+            url_hash="feed",
+        )
+        session = self.session(
+            mocker,
+            [
+                SimpleNamespace(
+                    feed_id=1, locale="en_US", channels=["Top News"], rank=1, **feed
+                ),
+                SimpleNamespace(feed_id=1, locale="en_GB", channels=[], rank=2, **feed),
+                SimpleNamespace(
+                    feed_id=2,
+                    locale=None,
+                    channels=[],
+                    rank=None,
+                    **{**feed, "url_hash": "other"},
+                ),
+            ],
+        )
+
+        publishers = get_publisher_with_locale("https://example.com")
+
+        assert [publisher["publisher_id"] for publisher in publishers] == [
+            "feed",
+            "other",
+        ]
+        assert publishers[0]["locales"] == [
+            {"locale": "en_US", "channels": ["Top News"], "rank": 1},
+            {"locale": "en_GB", "channels": [], "rank": 2},
+        ]
+        assert publishers[1]["locales"] == []
+        query = self.compiled_query(session)
+        assert "LEFT OUTER JOIN news.feed_locale " in query
+        assert "array_agg(news.channel.name)" in query
+
+    # Loads the feeds of the locale with their publisher and channels in one query.
+    def test_publishers_based_on_locale(self, mocker):
+        row = {"publisher_id": "feed", "channels": ["Top News"]}
+        session = self.session(mocker, [row])
+
+        assert get_publishers_based_on_locale("en_US") == [row]
+        query = self.compiled_query(session)
+        assert "array_agg(DISTINCT news.channel.name)" in query
+        assert query.endswith("GROUP BY news.feed.id, news.publisher.id")
+
+
+def locale_article_row(article_id, created):
+    return SimpleNamespace(
+        id=article_id,
+        created=created,
+        publish_time=created,
+        url_hash=f"hash{article_id}",
+        **dict.fromkeys(
+            ["title", "img", "category", "description", "content_type", "publisher_id"]
+            + ["publisher_name", "creative_instance_id", "url", "pop_score"]
+            + ["padded_img", "score"]
+        ),
+    )
+
+
+class TestGetArticlesWithLocale:
+    @staticmethod
+    def session(mocker, rows):
+        session = mocker.MagicMock()
+        session.__enter__.return_value = session
+        session.execute.return_value.all.return_value = rows
+        mocker.patch.object(Configuration, "get_db_session", return_value=session)
+        return session
+
+    # Decodes the position of the article the cursor was encoded from.
+    def test_cursor(self):
+        cursor = encode_article_cursor(locale_article_row(7, NOW))
+
+        assert decode_article_cursor(cursor) == (NOW, 7)
+        with pytest.raises(ValueError):
+            decode_article_cursor("not a cursor")
+
+    # Returns the cursor of the last article of a page followed by more articles.
+    def test_pages(self, mocker):
+        rows = [
+            locale_article_row(index, NOW - timedelta(minutes=index))
+            for index in range(1, 4)
+        ]
+        self.session(mocker, rows)
+
+        articles, cursor = get_articles_with_locale(
+            "en_US", NOW - timedelta(days=1), page_size=2
+        )
+
+        assert [article["url_hash"] for article in articles] == ["hash1", "hash2"]
+        assert decode_article_cursor(cursor) == (rows[1].created, 2)
+
+        self.session(mocker, rows[2:])
+        articles, cursor = get_articles_with_locale(
+            "en_US", NOW - timedelta(days=1), cursor, page_size=2
+        )
+
+        assert [article["url_hash"] for article in articles] == ["hash3"]
+        assert cursor is None
+
+    # Starts the page after the article of the cursor, instead of skipping the previous pages with an OFFSET.
+    def test_keyset(self, mocker):
+        session = self.session(mocker, [])
+        cursor = encode_article_cursor(locale_article_row(7, NOW))
+
+        get_articles_with_locale("en_US", NOW - timedelta(days=1), cursor, page_size=2)
+
+        (query,), _ = session.execute.call_args
+        compiled = query.compile(dialect=postgresql.dialect())
+        assert "(news.article.created, news.article.id) < (" in str(compiled)
+        assert "OFFSET" not in str(compiled)
+        assert {NOW, 7, 3} <= set(compiled.params.values())
+
+
+class TestArticlesQuery:
+    @staticmethod
+    def compiled(query):
+        return str(query.compile(dialect=postgresql.dialect()))
+
+    # Only selects the requested fields, with the id and created of the cursor, from the article table.
+    def test_projection(self):
+        query = self.compiled(_articles_query(["title"], NOW))
+
+        assert query.startswith(
+            "SELECT news.article.title AS title, news.article.id AS id, news.article.created AS created \n"
+            "FROM news.article \nWHERE"
+        )
+
+    # Joins the tables of the requested fields and filters.
+    def test_filters(self):
+        query = self.compiled(
+            _articles_query(
+                ["publisher_id", "locale"],
+                NOW,
+                NOW + timedelta(days=1),
+                locale="en_US",
+                cache_hits=True,
+                external_channels=False,
+            )
+        )
+
+        assert "JOIN news.feed ON" in query
+        assert "LEFT OUTER JOIN news.article_cache_record ON" in query
+        assert "LEFT OUTER JOIN news.locale ON" in query
+        assert "news.article.created < " in query
+        assert "news.article_cache_record.locale_id = (SELECT news.locale.id" in query
+        assert "coalesce(news.article_cache_record.cache_hit, " in query
+        assert "NOT (EXISTS (SELECT news.external_article_classification.id" in query
@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from config import Configuration
+from db_crud_async import get_articles_with_locale, get_channels
+
+
+@pytest.fixture
+def session(mocker):
+    session = mocker.MagicMock()
+    session.__aenter__.return_value = session
+    mocker.patch.object(Configuration, "get_async_db_session", return_value=session)
+    return session
+
+
+class TestGetChannels:
+    # Returns the sorted names of the channels.
+    def test_channels(self, session, mocker):
+        channels = mocker.Mock(**{"all.return_value": ["Top News", "Business"]})
+        session.scalars = mocker.AsyncMock(return_value=channels)
+
+        assert asyncio.run(get_channels()) == ["Business", "Top News"]
+
+    # Returns no channels when the database cannot be queried.
+    def test_error(self, session, mocker):
+        session.scalars = mocker.AsyncMock(side_effect=OSError("connection refused"))
+
+        assert asyncio.run(get_channels()) == []
+
+
+class TestGetArticlesWithLocale:
+    # Queries the articles created since the start time in UTC, asyncpg does not convert aware datetimes.
+    def test_start_datetime(self, session, mocker):
+        session.execute = mocker.AsyncMock(
+            return_value=mocker.Mock(**{"all.return_value": []})
+        )
+
+        articles, cursor = asyncio.run(
+            get_articles_with_locale("en_US", "2023-01-01T12:00:00+02:00", page_size=10)
+        )
+
+        assert (articles, cursor) == ([], None)
+        (query,), _ = session.execute.call_args
+        params = query.compile(dialect=postgresql.dialect()).params
+        assert datetime(2023, 1, 1, 10, 0, 0) in params.values()
+        assert params["param_1"] == 11
@@ -0,0 +1,113 @@
+import asyncio
+import multiprocessing
+import time
+
+from config import get_config
+from utils import RateLimiter, ResponseCache, get_rate_limiter
+
+config = get_config()
+
+
+class TestResponseCache:
+    # Computes a missing value once and serves it from the cache afterward.
+    def test_get_or_set(self):
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            return b"[]"
+
+        cache = ResponseCache(ttl=60)
+        assert asyncio.run(cache.get_or_set("key", factory)) == b"[]"
+        assert asyncio.run(cache.get_or_set("key", factory)) == b"[]"
+        assert len(calls) == 1
+
+    # Does not serve expired values.
+    def test_ttl(self):
+        cache = ResponseCache(ttl=-1)
+        cache.set("key", b"[]")
+        assert cache.get("key") is None
+
+    # Computes the value again once the cached value expired.
+    def test_refresh(self, mocker):
+        values = iter([b"old", b"new"])
+
+        async def factory():
+            return next(values)
+
+        monotonic = mocker.patch("utils.time.monotonic", return_value=0)
+        cache = ResponseCache(ttl=60)
+        assert asyncio.run(cache.get_or_set("key", factory)) == b"old"
+        monotonic.return_value = 59
+        assert asyncio.run(cache.get_or_set("key", factory)) == b"old"
+        monotonic.return_value = 61
+        assert asyncio.run(cache.get_or_set("key", factory)) == b"new"
+
+    # Drops the cached values and the values computed before the invalidation.
+    def test_invalidate(self):
+        cache = ResponseCache(ttl=60)
+        cache.set("key", b"[]")
+
+        async def factory():
+            cache.invalidate()
+            return b"stale"
+
+        assert asyncio.run(cache.get_or_set("other", factory)) == b"stale"
+        assert cache.get("key") is None
+        assert cache.get("other") is None
+
+
+class TestRateLimiter:
+    # Allows a burst of calls, then no call until the bucket refills.
+    def test_burst(self):
+        limiter = RateLimiter(1, burst=3)
+        assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    # Spaces the calls beyond the burst by the interval of the rate.
+    def test_rate(self):
+        limiter = RateLimiter(50, burst=2)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        assert time.monotonic() - start >= 4 / 50 - 0.01
+
+    # Waits for the tokens without blocking the event loop.
+    def test_acquire_async(self):
+        limiter = RateLimiter(50)
+        ticks = []
+
+        async def tick():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(tick(), *[limiter.acquire_async() for _ in range(5)])
+
+        start = time.monotonic()
+        asyncio.run(run())
+        assert time.monotonic() - start >= 4 / 50 - 0.01
+        assert len(ticks) == 5
+
+    # Shares the budget with the processes forked after the limiter is created.
+    def test_shared(self):
+        limiter = RateLimiter(0.1, burst=2, shared=True)
+        process = multiprocessing.get_context("fork").Process(
+            target=limiter.try_acquire
+        )
+        process.start()
+        process.join()
+
+        assert limiter.try_acquire() is True
+        assert limiter.try_acquire() is False
+
+    # Creates a limiter per key with the budget of the key.
+    def test_get_rate_limiter(self, monkeypatch):
+        monkeypatch.setattr(
+            config, "rate_limits", {"test_budget": {"rate": 2, "burst": 5}}
+        )
+        limiter = get_rate_limiter("test_budget")
+
+        assert get_rate_limiter("test_budget") is limiter
+        assert (limiter.interval, limiter.burst) == (0.5, 5)
+        assert get_rate_limiter("test_default").interval == 1 / config.rate_limit